@@ -1,14 +1,21 @@
 import math
+import pickle
 
 from functools import partial
 from itertools import chain
+from operator import attrgetter
 from typing import Sequence, Iterable, Callable, Tuple
 
+from twilight_actions import ActionSpace
 from twilight_map import GameMap, CountryInfo, Country
 from twilight_enums import Side, MapRegion, InputType, CardAction
 from twilight_cards import GameCards, Card
-from twilight_input_output import Input, Output
+from twilight_input_output import Input, Decision, Output, PrintSink, NullSink
 from twilight_playerview import PlayerView
+from twilight_journal import Journal, Pile
+from twilight_stages import StageEncoder, StageDecoder
+from twilight_rng import GameRNG
+from twilight_zobrist import Zobrist, ZobristHash, PileHash
 
 
 class Game:
@@ -19,6 +26,19 @@ class Game:
         SPACE_ROLL_MAX = (3, 4, 3, 4, 3, 4, 3, 2)
         SPACE_VPS = ((2, 1), (0, 0), (2, 0), (0, 0),
                      (3, 1), (0, 0), (4, 2), (2, 0))
+        DICE = {
+            # (two_dice, reroll_ties): (prompt, outcomes, probabilities)
+            (False, False): ('1d6 roll',
+                             tuple(str(i) for i in range(1, 7)),
+                             (1 / 6,) * 6),
+            (True, False): ('2d6 roll (USSR roll, US roll)',
+                            tuple((i, j) for i in range(1, 7) for j in range(1, 7)),
+                            (1 / 36,) * 36),
+            (True, True): ('2d6 roll (Sponsor roll, Participant roll), no ties',
+                           tuple((i + 2, j) for i in range(1, 7)
+                                 for j in range(1, 7) if i + 2 != j),
+                           (1 / 32,) * 32),
+        }
         SCORING = {
             MapRegion.ASIA: (3, 7, 9),
             MapRegion.EUROPE: (3, 7, 120),
@@ -28,34 +48,69 @@ class Game:
             MapRegion.AFRICA: (1, 4, 6)
         }
 
-    def __init__(self):
+    def __init__(self, sink=None, seed=None, manual_rng=False):
+        '''
+        Parameters
+        ----------
+        sink : optional
+            Receives the messages of the game engine through its emit method.
+            Defaults to a PrintSink. Pass a NullSink for headless runs.
+        seed : optional
+            Root seed for self.rng, a GameRNG whose streams shuffle the draw pile,
+            roll dice and select random discards. By default a random seed,
+            which is kept in self.rng.seed.
+        manual_rng : bool
+            If True, chance events are resolved by Side.NEUTRAL inputs, so they
+            can be logged and replayed: the draw pile is shuffled one card at a
+            time, and dice are rolled by selecting an outcome. By default False.
+        '''
+        self.sink = PrintSink() if sink is None else sink
+        self.rng = GameRNG(seed)
+        self.manual_rng = manual_rng
+        self.journal = Journal()
+        self.undo_tokens = []
+        pile = self._pile
 
         self.vp_track = 0
         self.turn_track = 0
         self.ar_track = 0
         self.ar_side = None
-        self.ars_by_turn: Tuple[Sequence[int], Sequence[int]] = ([], [])
-        self.ar_side_done: Sequence[bool] = [False, False]
+        self.ars_by_turn: Tuple[Sequence[int], Sequence[int]] = (pile(), pile())
+        self.ar_side_done: Sequence[bool] = pile([False, False])
         self.defcon_track = 0
-        self.milops_track = [0, 0]
-        self.space_track = [0, 0]  # 0 is start, 1 is earth satellite etc
-        self.spaced_turns = [0, 0]
+        self.milops_track = pile([0, 0])
+        self.space_track = pile([0, 0])  # 0 is start, 1 is earth satellite etc
+        self.spaced_turns = pile([0, 0])
 
         self.map = None
         self.cards = None
         self.players = None
 
         self.input_state = None
+        self.decision = None  # set in the rollout mode of playout
         self.output_queue = [[], []]
 
-        self.hand = [[], [], []]  # neutral hand necessary
-        self.removed_pile = []
-        self.discard_pile = []
-        self.draw_pile = []
-        self.limbo = []  # strictly for shuttle_diplomacy
-        self.basket = [[], []]
-        self.headline_bin = ['', '']
-        self.end_turn_stage_list = []
+        self.hand = pile([pile(), pile(), pile()])  # neutral hand necessary
+        self.removed_pile = pile()
+        self.discard_pile = pile()
+        self.draw_pile = pile()
+        self.limbo = pile()  # strictly for shuttle_diplomacy
+        self.basket = pile([pile(), pile()])
+        self.headline_bin = pile(['', ''])
+        self.end_turn_stage_list = pile()
+
+        self.started = False
+        self.winner = None
+        self.handicap = 0
+        self.stage_list = pile()
+
+        self.zobrist = ZobristHash()
+        for name, hashed in zip(Game._zobrist_pile_names, self._zobrist_piles()):
+            hashed.zobrist = PileHash(self.zobrist, name)
+
+    def _pile(self, iterable=()):
+        '''Returns a new Pile recording to this game's journal.'''
+        return Pile(self.journal, iterable)
 
     '''
     Starts a new game.
@@ -68,34 +123,642 @@ class Game:
         self.turn_track = 1
         self.ar_track = 0
         self.ar_side = Side.USSR
-        self.ars_by_turn = [list(Game.Default.ARS_BY_TURN),
-                            list(Game.Default.ARS_BY_TURN)]
-        self.ar_side_done: Sequence[bool] = [False, False]
+        self.ar_side_done: Sequence[bool] = self._pile([False, False])
         self.defcon_track = 5
-        self.milops_track = [0, 0]  # ussr first
-        self.space_track = [0, 0]  # 0 is start, 1 is earth satellite etc
-        self.spaced_turns = [0, 0]
-        self.map = GameMap()
-        self.cards = GameCards()
-        self.players = [PlayerView(Side.USSR), PlayerView(Side.US)]
+        self.milops_track = self._pile([0, 0])  # ussr first
+        self.space_track = self._pile([0, 0])  # 0 is start, 1 is earth satellite etc
+        self.spaced_turns = self._pile([0, 0])
+        self._build()
         self.handicap = handicap  # positive in favour of ussr
 
-        self.stage_list = [
+        self.stage_list = self._pile([
             self.expand_deck,
             self.deal,
             self.put_start_USSR,
             self.put_start_US,
             self.put_start_extra,
             self.process_headline,
-        ]
+        ])
         self.stage_list.reverse()
 
         self.map.build_standard()
 
+    def _build(self):
+        '''
+        Creates the parts of a started game which a new Game lacks: the turn
+        order, map, cards and player views, with an empty board.
+        '''
+        self.ars_by_turn = self._pile([self._pile(Game.Default.ARS_BY_TURN),
+                                       self._pile(Game.Default.ARS_BY_TURN)])
+        self.map = GameMap(self.journal)
+        self.cards = GameCards(self.journal)
+        self.players = [PlayerView(Side.USSR), PlayerView(Side.US)]
+
     def stage_complete(self):
         self.input_state = None
         self.stage_list.pop()()
 
+    def request_input(self, *args, **kwargs):
+        '''
+        Sets the input which the current stage waits for, with the arguments of
+        Input. In the rollout mode of playout, self.decision is set to it
+        instead, and no Input is made.
+        '''
+        if self.decision is None:
+            self.input_state = Input(*args, **kwargs)
+        else:
+            self.input_state = self.decision.set(*args, **kwargs)
+
+    '''
+    Snapshots of the game state, used in place of deepcopy.
+    '''
+
+    _snapshot_attributes = attrgetter(
+        'started', 'winner', 'vp_track', 'turn_track', 'ar_track', 'ar_side',
+        'ars_by_turn', 'ar_side_done', 'defcon_track', 'milops_track', 'space_track',
+        'spaced_turns', 'handicap', 'map', 'cards', 'players', 'input_state', 'hand',
+        'removed_pile', 'discard_pile', 'draw_pile', 'limbo', 'basket', 'headline_bin',
+        'end_turn_stage_list', 'stage_list')
+
+    _snapshot_card_attributes = attrgetter('early_war', 'mid_war', 'late_war')
+
+    def _snapshot_lists(self):
+        '''Returns every mutable list which forms part of the game state.'''
+        lists = [self.ar_side_done, self.milops_track, self.space_track,
+                 self.spaced_turns, self.hand, *self.hand, self.removed_pile,
+                 self.discard_pile, self.draw_pile, self.limbo, self.basket,
+                 *self.basket, self.headline_bin, self.end_turn_stage_list,
+                 self.stage_list, *self.ars_by_turn]
+        if isinstance(self.ars_by_turn, list):
+            lists.append(self.ars_by_turn)
+        if self.cards is not None:
+            lists.extend(Game._snapshot_card_attributes(self.cards))
+        return lists
+
+    def snapshot(self):
+        '''
+        Returns a GameSnapshot of the current state, which can be passed to restore
+        any number of times.
+
+        Only the mutable containers of the game are copied, and only one level deep.
+        Everything else is shared with the live game, including the country and card
+        definitions and the bound callbacks held in stage_list and input_state.
+        '''
+        snapshot = GameSnapshot()
+        snapshot.game = self
+        snapshot.values = Game._snapshot_attributes(self)
+        snapshot.lists = tuple((l, tuple(l)) for l in self._snapshot_lists())
+        snapshot.board = None if self.map is None else self.map.get_state()
+        snapshot.rng_state = self.rng.getstate()
+
+        if self.cards is None:
+            snapshot.card_values = None
+            snapshot.card_states = ()
+        else:
+            snapshot.card_values = Game._snapshot_card_attributes(self.cards)
+            snapshot.card_states = tuple(
+                (card, vars(card).copy()) for card in self.cards.ALL.values())
+
+        snapshot.player_states = () if self.players is None else tuple(
+            (p, vars(p).copy(), tuple(p.draw_pile)) for p in self.players)
+
+        if self.input_state is None:
+            snapshot.input_values = None
+        else:
+            snapshot.input_values = (vars(self.input_state).copy(),
+                                     tuple(self.input_state.selection.items()),
+                                     tuple(self.input_state.discarded_options))
+        return snapshot
+
+    def restore(self, snapshot):
+        '''
+        Restores the state saved by snapshot. Containers are restored in place, so
+        references held elsewhere (e.g. partials bound to a basket) remain valid.
+        Any outstanding undo tokens are discarded.
+
+        Parameters
+        ----------
+        snapshot : GameSnapshot
+            A snapshot previously returned by self.snapshot().
+        '''
+        if snapshot.game is not self:
+            raise ValueError('Snapshot was taken from a different game.')
+
+        self.clear_undo()
+        self._set_snapshot_attributes(snapshot.values)
+
+        if snapshot.card_values is not None:
+            (self.cards.early_war, self.cards.mid_war,
+             self.cards.late_war) = snapshot.card_values
+
+        for l, contents in snapshot.lists:
+            l[:] = contents
+
+        if snapshot.board is not None:
+            self.map.set_state(snapshot.board)
+        self.rng.setstate(snapshot.rng_state)
+
+        for card, state in snapshot.card_states:
+            card_vars = vars(card)
+            card_vars.clear()
+            card_vars.update(state)
+
+        for player, state, draw_pile in snapshot.player_states:
+            player_vars = vars(player)
+            player_vars.clear()
+            player_vars.update(state)
+            player.draw_pile = list(draw_pile)
+
+        if snapshot.input_values is not None:
+            state, selection, discarded_options = snapshot.input_values
+            input_vars = vars(self.input_state)
+            input_vars.clear()
+            input_vars.update(state)
+            self.input_state.selection = dict(selection)
+            self.input_state.discarded_options = set(discarded_options)
+
+    def _set_snapshot_attributes(self, values):
+        (self.started, self.winner, self.vp_track, self.turn_track, self.ar_track,
+         self.ar_side, self.ars_by_turn, self.ar_side_done, self.defcon_track,
+         self.milops_track, self.space_track, self.spaced_turns, self.handicap,
+         self.map, self.cards, self.players, self.input_state, self.hand,
+         self.removed_pile, self.discard_pile, self.draw_pile, self.limbo,
+         self.basket, self.headline_bin, self.end_turn_stage_list,
+         self.stage_list) = values
+
+    '''
+    Checkpoints, for saving games and sending them to other processes.
+    '''
+
+    # version of the format written by to_bytes
+    BYTES_VERSION = 1
+
+    def to_bytes(self):
+        '''
+        Returns the state of the game as bytes, which from_bytes turns back into
+        a game, e.g. in a worker process, and load_bytes writes into an existing
+        game.
+
+        Unlike a pickle of the game, the bytes hold data alone: stages, end of
+        turn effects and input callbacks are written in their data-only form,
+        see twilight_stages.StageOp, and the engine's objects as references
+        into the game which loads them. The sink and undo tokens are not saved.
+        '''
+        encode = StageEncoder(self)
+        input_state = self.input_state
+        payload = (
+            Game.BYTES_VERSION,
+            (self.started, self.winner, self.vp_track, self.turn_track,
+             self.ar_track, self.ar_side, self.defcon_track, self.handicap,
+             self.manual_rng),
+            self.rng.seed, self.rng.getstate(),
+            tuple(encode(tuple(l)) for l in self._snapshot_lists()),
+            None if self.map is None else self.map.get_state(),
+            None if self.cards is None else tuple(
+                map(encode.attributes, self.cards.ALL.values())),
+            None if self.players is None else tuple(
+                map(encode.attributes, self.players)),
+            None if input_state is None else encode.attributes(input_state))
+        return pickle.dumps(payload, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def from_bytes(data: bytes, sink=None):
+        '''
+        Returns a new game with the state saved by to_bytes. The game is built
+        directly from the saved state, without running start.
+
+        Parameters
+        ----------
+        data : bytes
+            As returned by Game.to_bytes.
+        sink : optional
+            Receives the messages of the new game. Defaults to a NullSink, as
+            the sink of the saved game is not saved.
+        '''
+        payload = pickle.loads(data)
+        game = Game(NullSink() if sink is None else sink, seed=payload[2])
+        if payload[5] is not None:
+            game._build()
+        game._load_payload(payload)
+        return game
+
+    def load_bytes(self, data: bytes):
+        '''
+        Writes the state saved by to_bytes into this game in place, as restore
+        does for a snapshot. This game must have been started, or built by
+        from_bytes, if the saved game was, so that its lists match. Any
+        outstanding undo tokens are discarded.
+
+        Parameters
+        ----------
+        data : bytes
+            As returned by Game.to_bytes.
+        '''
+        self._load_payload(pickle.loads(data))
+
+    def _load_payload(self, payload):
+        (version, values, seed, rng_state, lists, board, card_states,
+         player_states, input_values) = payload
+        if version != Game.BYTES_VERSION:
+            raise ValueError(f'Cannot load version {version} of Game.to_bytes.')
+        targets = self._snapshot_lists()
+        if len(targets) != len(lists) or (board is None) != (self.map is None):
+            raise ValueError('The saved game does not have the lists of this game.')
+
+        self.clear_undo()
+        (self.started, self.winner, self.vp_track, self.turn_track,
+         self.ar_track, self.ar_side, self.defcon_track, self.handicap,
+         self.manual_rng) = values
+        self.rng.seed = seed
+        self.rng.setstate(rng_state)
+
+        decode = StageDecoder(self)
+        for l, contents in zip(targets, lists):
+            l[:] = decode(contents)
+        if board is not None:
+            self.map.set_state(board)
+
+        if card_states is not None:
+            for card, state in zip(self.cards.ALL.values(), card_states):
+                decode.attributes(card, state)
+        if player_states is not None:
+            for player, state in zip(self.players, player_states):
+                decode.attributes(player, state)
+
+        if input_values is None:
+            self.input_state = None
+        else:
+            self.input_state = Input.__new__(Input)
+            decode.attributes(self.input_state, input_values)
+
+    '''
+    Reversible moves, for search. Changes made while a move is applied are
+    recorded to self.journal, and undone in reverse order.
+    '''
+
+    def advance(self):
+        '''
+        Runs stages until the game requires input. Returns False if the game has
+        ended instead.
+        '''
+        while self.input_state is None or self.input_state.complete:
+            if not self.stage_list:
+                return False
+            self.stage_complete()
+        return True
+
+    # rejected moves in a row after which drive gives up on an input
+    MAX_REJECTED = 100
+
+    def drive(self, choose: Callable[['Game', list], str], max_moves: int = None):
+        '''
+        Plays the game on, calling choose(game, moves) at each decision with the
+        legal moves of the current input as a list, from Input.legal_moves, for
+        the move to make. Chance inputs are resolved with sample_chance. Stops
+        when the game ends, with self.winner set or advance returning False, or
+        after max_moves decisions. Returns the number of decisions made, which
+        does not count chance outcomes.
+
+        A move the input rejects, e.g. a country the remaining operations cannot
+        pay for, counts as a decision. Raises RuntimeError if an input has no
+        legal moves, or rejects MAX_REJECTED moves in a row.
+
+        Parameters
+        ----------
+        choose : Callable[[Game, list], str]
+            Returns one of moves.
+        max_moves : int, optional
+            Stop after this many decisions.
+        '''
+        made = rejected = 0
+        while self.winner is None and self.advance():
+            input_state = self.input_state
+            if input_state.side == Side.NEUTRAL:
+                input_state.recv(self.sample_chance())
+                continue
+            if made == max_moves:
+                break
+            moves = input_state.legal_moves()
+            if not moves:
+                raise RuntimeError(f'No options available for input: {input_state.prompt}')
+            made += 1
+            if input_state.recv(choose(self, moves)):
+                rejected = 0
+            else:
+                rejected += 1
+                if rejected == Game.MAX_REJECTED:
+                    raise RuntimeError(
+                        f'{rejected} moves in a row rejected by input: {input_state.prompt}')
+        return made
+
+    def playout(self, policy: Callable[['Game', Sequence[int]], int], max_moves: int = None,
+                seed=None):
+        '''
+        Rollout mode. Plays the game on, asking policy(game, moves) directly for
+        each decision, where moves is an int array of the ActionSpace ids of the
+        legal moves, with ActionSpace.STOP last for an early stopping option, and
+        policy returns the index in moves of the move to make.
+
+        No Input is made: stages set self.decision, one Decision reused for the
+        whole playout, which is also self.input_state while the playout runs, so
+        a policy may still read e.g. its legal_moves. A decision left pending at
+        the end is turned back into an Input. Dice and shuffles are drawn from
+        self.rng inside the moves, as if manual_rng were off, and other chance
+        inputs are resolved as by sample_chance. The playout stops, or raises
+        RuntimeError, as drive does.
+
+        Returns one UndoToken which reverses the whole playout, as for apply. If
+        an engine error is raised, the token is left as the last of
+        self.undo_tokens.
+
+        Parameters
+        ----------
+        policy : Callable[[Game, Sequence[int]], int]
+            Returns the index in moves of the move to make.
+        max_moves : int, optional
+            Stop after this many decisions.
+        seed : optional
+            If given, the streams of self.rng are first reseeded from seed, so
+            that playouts from the same position differ.
+        '''
+        token = self._begin_move()
+        if seed is not None:
+            self.journal.record(self.rng.setstate, self.rng.getstate())
+            self.rng.reseed(seed)
+
+        manual_rng = self.manual_rng
+        self.manual_rng = False
+        decision = self.decision = Decision()
+        try:
+            # the current input is read into the decision, and left as it is
+            if self.input_state is not None:
+                self.input_state = decision.load(self.input_state)
+            self._rollout(policy, max_moves)
+        finally:
+            self.manual_rng = manual_rng
+            self.decision = None
+            if self.input_state is decision:
+                self.input_state = decision.to_input()
+        return token
+
+    def _rollout(self, policy: Callable[['Game', Sequence[int]], int], max_moves: int = None):
+        '''The loop of drive, over self.decision and with moves as action ids.'''
+        decision = self.decision
+        made = rejected = 0
+        while self.winner is None and self.advance():
+            if decision.side == Side.NEUTRAL:
+                decision.recv(self.sample_chance())
+                continue
+            if made == max_moves:
+                break
+            indices = decision.available_indices()
+            moves = ActionSpace.move_ids(decision.state, decision.options, indices,
+                                         decision.option_stop_early)
+            if not len(moves):
+                raise RuntimeError(f'No options available for input: {decision.prompt}')
+            made += 1
+            i = policy(self, moves)
+            if i < len(indices):
+                accepted = decision.pick(indices[i])
+            else:
+                accepted = decision.recv(decision.option_stop_early)
+            if accepted:
+                rejected = 0
+            else:
+                rejected += 1
+                if rejected == Game.MAX_REJECTED:
+                    raise RuntimeError(
+                        f'{rejected} moves in a row rejected by input: {decision.prompt}')
+        return made
+
+    def apply(self, move: str):
+        '''
+        Sends move to the current input, then advances the game until input is
+        next required. Returns an UndoToken which reverses the move when passed
+        to undo. Tokens must be undone in the reverse order they were applied.
+
+        Parameters
+        ----------
+        move : str
+            One of the available options of the current input, or its early
+            stopping option. A move which the input's callback rejects leaves the
+            game unchanged, but still returns a token.
+        '''
+        if not move or (move != self.input_state.option_stop_early
+                        and not self.input_state.is_available(move)):
+            raise ValueError(f'{move} is not an available option.')
+
+        token = self._begin_move()
+        self.input_state.recv(move)
+        self.advance()
+        return token
+
+    def apply_multiset(self, moves: Sequence[str]):
+        '''
+        Sends every move in moves to the current input as a single step, then
+        advances the game until input is next required. Returns one UndoToken
+        for all of the moves.
+
+        Parameters
+        ----------
+        moves : Sequence[str]
+            Picks of the current input, e.g. one of the multisets returned by
+            input_multisets. The early stopping option may only come last. Raises
+            ValueError, leaving the game unchanged, if a pick is not available,
+            is rejected by the input's callback, or comes after the input has
+            handed over to another input.
+        '''
+        if not moves:
+            raise ValueError('A multiset needs at least one move.')
+
+        input_state = self.input_state
+        token = self._begin_move()
+        for i, move in enumerate(moves):
+            if (self.input_state is not input_state or input_state.complete
+                    or not self._recv_pick(input_state, move)):
+                self.undo(token)
+                raise ValueError(f'{move} is not an available pick at position {i}.')
+        self.advance()
+        return token
+
+    def _begin_move(self):
+        token = UndoToken()
+        token.game = self
+        token.values = Game._snapshot_attributes(self)
+        token.player_states = () if self.players is None else tuple(
+            (p, vars(p).copy()) for p in self.players)
+
+        self.journal.begin()
+        self.undo_tokens.append(token)
+        if self.input_state is not None and self.input_state.journal is not self.journal:
+            self.input_state.journal = self.journal
+        return token
+
+    @staticmethod
+    def _recv_pick(input_state, move: str):
+        '''Sends move to input_state and returns True if it was taken as a pick.'''
+        if move == input_state.option_stop_early:
+            return input_state.recv(move)
+        if not input_state.is_available(move):
+            return False
+        picked = input_state.selection[move]
+        return input_state.recv(move) and input_state.selection[move] > picked
+
+    def input_multisets(self, limit: int = None):
+        '''
+        Returns the distinct multisets of picks which resolve the current input,
+        for inputs with several reps, e.g. placing influence. Each multiset is a
+        tuple of moves in an order in which the input accepts them, the order of
+        the input's options where possible, and can be passed to apply_multiset.
+        No two multisets are permutations of one another.
+
+        The picks are tried on the game itself and undone, so the input's own
+        callbacks apply the rules: max_per_option, discarded options, the cost of
+        2 operations in opponent-controlled countries, and the bonus operation of
+        the China Card and Vietnam Revolts. The bonus makes the order of picks
+        matter, since it removes options once it is earned, so every order is
+        tried, and the picks so far are extended only once from each state.
+
+        A multiset ends when the input is complete, when it hands over to another
+        input, e.g. the dice of a realignment, or with the early stopping option.
+
+        Parameters
+        ----------
+        limit : int
+            Stop after this many multisets. By default all are returned, which
+            may be many: 77520 for the starting influence of the US.
+        '''
+        input_state = self.input_state
+        order = input_state.option_index
+        bonus_cards = [self.cards[name] for name in ('The_China_Card', 'Vietnam_Revolts')]
+        multisets = {}
+        extended = set()
+        picks = []
+
+        def canonical(picks):
+            return tuple(sorted(picks, key=order.__getitem__))
+
+        def add(*stop):
+            multisets.setdefault(canonical(picks) + stop, (*picks, *stop))
+
+        def extend():
+            # the influence placed depends on the picks alone, the rest on their order
+            key = (canonical(picks), self.zobrist_hash(), input_state.available,
+                   input_state.max_per_option, input_state.option_stop_early,
+                   *((card.all_points_in_region, card.extra_point_given,
+                      card.extra_point_taken) for card in bonus_cards))
+            if key in extended:
+                return
+            extended.add(key)
+
+            # callbacks may rewrite the early stopping option after each pick
+            stop = input_state.option_stop_early
+            if stop:
+                add(stop)
+            for move in list(input_state.available_options):
+                if limit is not None and len(multisets) >= limit:
+                    return
+                token = self._begin_move()
+                try:
+                    if self._recv_pick(input_state, move):
+                        picks.append(move)
+                        if self.input_state is input_state and not input_state.complete:
+                            extend()
+                        else:
+                            add()
+                        picks.pop()
+                finally:
+                    self.undo(token)
+
+        extend()
+        multisets = list(multisets.values())
+        return multisets if limit is None else multisets[:limit]
+
+    def undo(self, token):
+        '''
+        Restores the state from before the move that returned token was applied.
+
+        Parameters
+        ----------
+        token : UndoToken
+            The token returned by the most recent outstanding call to apply.
+        '''
+        if not self.undo_tokens or self.undo_tokens[-1] is not token:
+            raise ValueError('Only the most recently applied move can be undone.')
+
+        self.undo_tokens.pop()
+        self.journal.rollback()
+        self._set_snapshot_attributes(token.values)
+        for player, state in token.player_states:
+            player_vars = vars(player)
+            player_vars.clear()
+            player_vars.update(state)
+
+    def clear_undo(self):
+        '''Discards all outstanding undo tokens, keeping the current state.'''
+        self.undo_tokens.clear()
+        self.journal.clear()
+
+    '''
+    Zobrist hashing. The influence board and the card piles are hashed as they
+    change, by Country.set_influence and the Pile methods. The fixed-size part of
+    the state is folded in when the hash is read.
+    '''
+
+    _zobrist_pile_names = ('ussr_hand', 'us_hand', 'neutral_hand', 'discard_pile',
+                           'removed_pile', 'draw_pile', 'limbo', 'ussr_basket',
+                           'us_basket')
+    _zobrist_keys = Zobrist.table('game')
+
+    def _zobrist_piles(self):
+        '''Returns the piles whose membership is hashed, in _zobrist_pile_names order.'''
+        return (*self.hand, self.discard_pile, self.removed_pile, self.draw_pile,
+                self.limbo, *self.basket)
+
+    def zobrist_hash(self):
+        '''
+        Returns a 64-bit Zobrist hash of the game state, which is stable between
+        runs. It covers the influence in each country, the tracks, the
+        membership of the hands, piles and baskets, the headlines, the China
+        Card's playability, the action round, and the kind of the current input.
+        The order of the draw pile is not covered, and the pending stages only by
+        their number.
+        '''
+        keys = Game._zobrist_keys
+        value = self.zobrist.value
+        if self.map is not None:
+            value ^= self.map.zobrist
+        if self.cards is not None:
+            value ^= keys['china', self.cards['The_China_Card'].is_playable]
+
+        input_state = self.input_state
+        if input_state is not None:
+            value ^= keys['input', input_state.side, input_state.state,
+                          input_state.reps]
+        return (value
+                ^ keys['vp', self.vp_track] ^ keys['defcon', self.defcon_track]
+                ^ keys['turn', self.turn_track]
+                ^ keys['ar', self.ar_side, self.ar_track, *self.ar_side_done]
+                ^ keys['milops', *self.milops_track]
+                ^ keys['space', *self.space_track, *self.spaced_turns]
+                ^ keys['ars_by_turn', *map(tuple, self.ars_by_turn)]
+                ^ keys['headline', *self.headline_bin]
+                ^ keys['stages', len(self.stage_list)])
+
+    def rehash(self):
+        '''
+        Recomputes the running hashes from the state, e.g. after piles have been
+        written without the Pile methods.
+        '''
+        value = 0
+        for name, hashed in zip(Game._zobrist_pile_names, self._zobrist_piles()):
+            keys = Zobrist.table(name)
+            for item in hashed:
+                value ^= keys[item]
+        self.zobrist.value = value
+        if self.map is not None:
+            self.map.recount()
+
     def terminate(self, side: Side = Side.NEUTRAL):
         '''
         Terminates the game prematurely, due to DEFCON 1, held scoring cards, or Wargames.
@@ -105,13 +768,14 @@ class Game:
         side : Side, optional
             Side of the winner - used only when holding scoring cards, by default Side.NEUTRAL
             If side is Side.NEUTRAL, determine winner as the player with more VPs.
+            The winner is stored in self.winner.
         '''
         self.stage_list.clear()
         if side != Side.NEUTRAL:
-            winner = side.toStr()
+            self.winner = side
         else:
-            winner = 'USSR' if self.vp_track > 0 else 'US'
-        print(f'{winner} victory!')
+            self.winner = Side.USSR if self.vp_track > 0 else Side.US
+        self.sink.emit('{} victory!', self.winner.toStr())
 
     '''Here are functions used to manipulate the various tracks.'''
 
@@ -153,7 +817,7 @@ class Game:
         self.vp_track += n
         if self.vp_track >= 20 or self.vp_track <= -20:
             self.terminate()
-        print(f'Current VP: {self.vp_track}')
+        self.sink.emit('Current VP: {}', self.vp_track)
 
     def change_defcon(self, n: int):
         '''
@@ -168,13 +832,13 @@ class Game:
         previous_defcon = self.defcon_track
         self.defcon_track += min(n, 5 - self.defcon_track)
         if self.defcon_track < 2:
-            print('Game ended by thermonuclear war')
+            self.sink.emit('Game ended by thermonuclear war')
             self.terminate()
         if previous_defcon > 2 and self.defcon_track == 2 and self.ar_track != 0 and 'NORAD' in self.basket[Side.US]:
             self.cards['NORAD'].place_norad_influence(self)
 
         verb = 'improved' if n > 0 else 'degraded'
-        print(f'DEFCON level {verb} to {self.defcon_track}.')
+        self.sink.emit('DEFCON level {} to {}.', verb, self.defcon_track)
 
     def change_milops(self, side: Side, n: int):
         '''
@@ -190,14 +854,14 @@ class Game:
         self.milops_track[side] += min(n, 5 - self.milops_track[side])
 
     def reset_milops(self):
-        self.milops_track = [0, 0]
+        self.milops_track[:] = [0, 0]
 
     # Here, we have the game initialisation stages.
     def put_start_USSR(self):
         '''
         Stage for USSR player to place starting influence anywhere in Eastern Europe.
         '''
-        self.input_state = Input(
+        self.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(self.event_influence_callback,
                     Country.increment_influence, Side.USSR),
@@ -211,7 +875,7 @@ class Game:
         '''
         Stage for US player to place starting influence anywhere in Western Europe.
         '''
-        self.input_state = Input(
+        self.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(self.event_influence_callback,
                     Country.increment_influence, Side.US),
@@ -234,7 +898,7 @@ class Game:
         elif self.handicap > 0:
             side = Side.USSR
 
-        self.input_state = Input(
+        self.request_input(
             side, InputType.SELECT_COUNTRY,
             partial(self.event_influence_callback,
                     Country.increment_influence, side),
@@ -251,7 +915,7 @@ class Game:
         return True
 
     def choose_headline(self, side: Side):
-        self.input_state = Input(
+        self.request_input(
             side, InputType.SELECT_CARD,
             partial(self.headline_callback, side),
             (c for c in self.hand[side] if self.cards[c].info.can_headline),
@@ -293,8 +957,9 @@ class Game:
         side : Side, optional
             Side's headline is displayed
         '''
-        print(
-            f'{side.toStr()} selected {self.headline_bin[side]} for headline.')
+        self.sink.emit('{} selected {} for headline.',
+                       side.toStr(), self.headline_bin[side])
+        self.players[side.opp].update_headline(self.headline_bin[side])
 
     def resolve_headline_order(self):
         '''
@@ -333,6 +998,7 @@ class Game:
         # TODO use card.dispose
         if self.headline_bin[side] == 'Missile_Envy':
             self.hand[side.opp].append('Missile_Envy')
+            self.players[side].update_opp_hand(['Missile_Envy'], among=())
             self.cards['Missile_Envy'].exchange = False
         elif self.headline_bin[side]:
             c = self.headline_bin[side]
@@ -360,7 +1026,7 @@ class Game:
                 # check if just ended headline or
                 # if AR should be incremented
                 self.ar_track += 1
-                self.ar_side_done = [not self.ars_remaining(
+                self.ar_side_done[:] = [not self.ars_remaining(
                     s) for s in Game.Default.AR_ORDER]
                 self.ar_side = Game.Default.AR_ORDER[0]
                 if all(self.ar_side_done):
@@ -428,14 +1094,14 @@ class Game:
         Checks if the player of <side> can use realignment on any country.
         True if there is at least 1 country suitable for realignment.
         '''
-        return any(self.map.can_realignment(self, n, side) for n in CountryInfo.ALL)
+        return bool(self.map.realignable_mask(self, side).any())
 
     def can_coup_at_all(self, side: Side):
         '''
         Checks if the player of <side> can coup in any country.
         True if there is at least 1 country suitable for coup.
         '''
-        return any(self.map.can_coup(self, n, side) for n in CountryInfo.ALL)
+        return bool(self.map.coupable_mask(self, side).any())
 
     def can_space(self, side: Side, card_name: str):
         '''
@@ -485,7 +1151,7 @@ class Game:
             playable_cards = (
                 c for c in self.hand[side] if self.cards[c].is_playable)
 
-        self.input_state = Input(
+        self.request_input(
             side, InputType.SELECT_CARD,
             partial(self.card_callback, side),
             playable_cards,
@@ -551,7 +1217,7 @@ class Game:
             self.ars_by_turn[side][self.turn_track] == 8
         ]
 
-        self.input_state = Input(
+        self.request_input(
             side, InputType.SELECT_CARD_ACTION,
             partial(self.action_callback, side, card_name,
                     no_event=is_event_resolved,
@@ -663,13 +1329,7 @@ class Game:
         like De_Gaulle_Leads_France and Willy_Brandt. Returns a list of country name
         strings with NATO effect protection.
         '''
-        europe = list(CountryInfo.REGION_ALL[MapRegion.EUROPE])
-        if 'NATO' in self.basket[Side.US]:
-            if 'De_Gaulle_Leads_France' in self.basket[Side.USSR]:
-                europe.remove('France')
-            if 'Willy_Brandt' in self.basket[Side.USSR]:
-                europe.remove('West_Germany')
-        return europe
+        return self.map.names(self.map.nato_mask(self))
 
     def trigger_event(self, side: Side, card_name: str):
         '''
@@ -699,7 +1359,6 @@ class Game:
                 self, name, self.input_state.reps)
             self.input_state.reps = self.cards['The_China_Card'].remove_rep(
                 self, name, self.input_state.reps)
-            self.cards['The_China_Card'].modify_selection(self, side)
 
         # and side == Side.USSR:
         if 'Vietnam_Revolts' in self.basket[Side.USSR]:
@@ -710,10 +1369,14 @@ class Game:
             self.cards['Vietnam_Revolts'].modify_selection(
                 self, card_name, side)
 
+        # after Vietnam Revolts, which may have taken back its operation
+        if card_name == 'The_China_Card':
+            self.cards['The_China_Card'].modify_selection(self, side)
+
         c.increment_influence(side)
 
         if self.input_state.reps == 1:
-            for n in self.input_state.selection:
+            for n in self.input_state.options:
                 if self.map[n].control == side.opp:
                     self.input_state.remove_option(n)
 
@@ -735,18 +1398,16 @@ class Game:
         card = self.cards[card_name]
         reps = self.get_global_effective_ops(side, card.info.ops)
 
-        self.input_state = Input(
+        self.request_input(
             side, InputType.SELECT_COUNTRY,
             partial(self.ops_influence_callback, side, card_name),
-            (n for n in CountryInfo.ALL
-                if self.map.can_place_influence(self, n, side, reps)),
+            self.map.names(self.map.placeable_mask(self, side, reps)),
             prompt=f'Place operations from {card_name} as influence.',
             reps=reps,
             reps_unit='operations'
         )
 
     def realign_dice_callback(self, name, side, num: tuple):
-        self.input_state.reps -= 1
         self.map.realignment(self, name, side, *num)
         return True
 
@@ -814,38 +1475,95 @@ class Game:
         if restricted_list is None:
             restricted_list = CountryInfo.ALL
 
-        self.input_state = Input(
+        self.request_input(
             side, InputType.SELECT_COUNTRY,
             partial(self.realignment_callback, side,
                     card_name=card_name, reps=reps),
-            (n for n in CountryInfo.ALL if self.map.can_realignment(
-                self, n, side) and n in restricted_list),
+            (n for n in self.map.names(self.map.realignable_mask(self, side))
+                if n in restricted_list),
             prompt=f'Select a country for realignment using operations from {card_name}. {reps} realignments remaining.',
             option_stop_early=can_stop_now
         )
 
     def dice_stage(self, fn: Callable[[str], bool] = None, two_dice=False, reroll_ties=False):
-        if not two_dice:
-            options = (str(i) for i in range(1, 7))
-            prompt = '1d6 roll'
-        elif not reroll_ties:
-            options = ((i, j) for i in range(1, 7) for j in range(1, 7))
-            prompt = '2d6 roll (USSR roll, US roll)'
-        else:
-            options = ((i + 2, j) for i in range(1, 7)
-                       for j in range(1, 7) if i + 2 != j)
-            prompt = '2d6 roll (Sponsor roll, Participant roll), no ties'
+        '''
+        Stage which rolls dice and passes the result to fn. Unless self.manual_rng
+        is set, the roll is drawn from self.rng.dice immediately, without an Input.
+
+        Parameters
+        ----------
+        fn : Callable[[str], bool]
+            Receives the roll, as a str for one die or a tuple of two ints.
+        two_dice : bool
+            Roll two dice, (USSR roll, US roll) or (Sponsor roll, Participant roll).
+        reroll_ties : bool
+            Add 2 to the first die and reroll ties, as for Olympic_Games.
+        '''
+        prompt, outcomes, probabilities = Game.Default.DICE[two_dice, reroll_ties]
+
+        if not self.manual_rng:
+            dice = self.rng.dice
+            if self.journal.active:
+                self.journal.record(dice.setstate, dice.getstate())
+            fn(outcomes[dice.randrange(len(outcomes))])
+            return
 
-        self.input_state = Input(
+        self.request_input(
             Side.NEUTRAL, InputType.ROLL_DICE,
-            fn,
-            options,
+            partial(self.dice_callback, fn),
+            outcomes,
             prompt=prompt,
+            distribution=(outcomes, probabilities),
+            rng_stream='dice'
         )
 
-    def coup_dice_callback(self, name, side, ops, free, num: str, che=False):
+    def dice_callback(self, fn: Callable[[str], bool], num):
         self.input_state.reps -= 1
+        return fn(num)
+
+    @staticmethod
+    def dice_distribution(two_dice=False, reroll_ties=False):
+        '''
+        Returns the outcomes of a dice_stage with the same arguments, and their
+        probabilities, as a pair of tuples.
+        '''
+        return Game.Default.DICE[two_dice, reroll_ties][1:]
+
+    def chance_outcomes(self):
+        '''
+        Returns the outcomes of the current input and their probabilities, as a
+        pair of tuples, if it is a chance node (a Side.NEUTRAL input). Returns
+        None otherwise.
+        '''
+        input_state = self.input_state
+        if input_state is None or input_state.side != Side.NEUTRAL:
+            return None
+        if input_state.distribution is not None:
+            return input_state.distribution
+
+        outcomes = tuple(input_state.available_options)
+        return outcomes, (1 / len(outcomes),) * len(outcomes)
 
+    def sample_chance(self):
+        '''
+        Returns an outcome for the current chance node (a Side.NEUTRAL input),
+        drawn from its stream of self.rng. The outcome is not sent to the input.
+        Use this rather than an external random source, so that the game stays
+        reproducible from its seed.
+        '''
+        input_state = self.input_state
+        if input_state is None or input_state.side != Side.NEUTRAL:
+            raise ValueError('The current input is not a chance node.')
+
+        outcomes, probabilities = self.chance_outcomes()
+        stream = self.rng.stream(input_state.rng_stream)
+        if self.journal.active:
+            self.journal.record(stream.setstate, stream.getstate())
+        if len(set(probabilities)) == 1:
+            return outcomes[stream.randrange(len(outcomes))]
+        return stream.choices(outcomes, probabilities)[0]
+
+    def coup_dice_callback(self, name, side, ops, free, num: str, che=False):
         if che:
             before_us_inf = self.map[name].influence[Side.US]
             ca_sa_af = chain(CountryInfo.REGION_ALL[MapRegion.CENTRAL_AMERICA],
@@ -855,7 +1573,7 @@ class Game:
         self.map.coup(self, name, side, ops, int(num), free=free)
 
         if che and self.map[name].influence[Side.US] < before_us_inf:
-            print('You are allowed a second coup from Che.')
+            self.sink.emit('You are allowed a second coup from Che.')
             self.card_operation_coup(Side.USSR, 'Che', restricted_list=[
                 n for n in ca_sa_af if not self.map[n].info.battleground], che=False)
 
@@ -896,33 +1614,40 @@ class Game:
         card = self.cards[card_name]
         effective_ops = self.get_global_effective_ops(
             side, card.info.ops)
-        if restricted_list is None:
-            restricted_list = CountryInfo.ALL
 
         # Cuban Missile Crisis
         if 'Cuban_Missile_Crisis' in self.basket[side.opp]:
             self.cards['Cuban_Missile_Crisis'].cuban_missile_remove(side)
 
-        def choose_coup_country():
-            self.input_state = Input(
-                side, InputType.SELECT_COUNTRY,
-                partial(self.coup_callback, side,
-                        effective_ops, card_name, che=che),
-                (n for n in CountryInfo.ALL
-                    if self.map.can_coup(self, n, side) and n in restricted_list),
-                prompt=f'Select a country to coup using operations from {card_name}.')
+        self.stage_list.append(partial(
+            self.choose_coup_country, side, effective_ops, card_name,
+            restricted_list, che=che))
+
+    def choose_coup_country(self, side: Side, effective_ops: int, card_name: str,
+                            restricted_list: Sequence[str] = None, che=False):
+        '''
+        Stage which asks the player of <side> for the country to coup, after
+        card_operation_coup.
+        '''
+        if restricted_list is None:
+            restricted_list = CountryInfo.ALL
 
-        self.stage_list.append(choose_coup_country)
+        self.request_input(
+            side, InputType.SELECT_COUNTRY,
+            partial(self.coup_callback, side,
+                    effective_ops, card_name, che=che),
+            (n for n in self.map.names(self.map.coupable_mask(self, side))
+                if n in restricted_list),
+            prompt=f'Select a country to coup using operations from {card_name}.')
 
     def space_dice_callback(self, side, num: str):
-        self.input_state.reps -= 1
         curr_stage = self.space_track[side]
 
         outcome = 'Success' if int(
             num) <= Game.Default.SPACE_ROLL_MAX[curr_stage] else 'Failure'
         if outcome == 'Success':
             self.change_space(side, 1)
-        print(f'{outcome} with roll of {num}.')
+        self.sink.emit('{} with roll of {}.', outcome, num)
         self.spaced_turns[side] += 1
         return True
 
@@ -1000,12 +1725,11 @@ class Game:
 
         self.hand[side].remove(opt)
         self.discard_pile.append(opt)
+        self.players[side.opp].update_opp_removed([opt])
         self.input_state.reps -= 1
         return True
 
     def war_dice_callback(self, name, side, modifier, min_roll, win_vp, win_milops, num: str):
-
-        self.input_state.reps -= 1
         outcome = 'Success' if int(num) - modifier >= min_roll else 'Failure'
         if outcome == 'Success':
             self.change_vp(win_vp * side.vp_mult)
@@ -1014,7 +1738,7 @@ class Game:
             influence = self.map[name].influence[side.opp]
             self.map[name].remove_influence(side.opp)
             self.map[name].increment_influence(side, influence)
-        print(f'{outcome} with roll of {num}.')
+        self.sink.emit('{} with roll of {}.', outcome, num)
 
         return True
 
@@ -1047,7 +1771,6 @@ class Game:
         return True
 
     def qbt_dice_callback(self, side: Side, trap_name: str, num: str):
-        self.input_state.reps -= 1
         if int(num) <= 4:
             self.basket[side].remove(trap_name)
         return True
@@ -1076,7 +1799,7 @@ class Game:
         # If we have as many scoring cards as action rounds, then we must play
         # a scoring card. Q/BT stays in basket.
         if len(scoring_cards) == self.ars_remaining(side):
-            self.input_state = Input(
+            self.request_input(
                 side, InputType.SELECT_CARD,
                 partial(self.trigger_event, side),
                 scoring_cards,
@@ -1099,7 +1822,7 @@ class Game:
                     and self.get_global_effective_ops(side, self.cards[n].info.ops) >= 2
                 )
             if suitable_cards:
-                self.input_state = Input(
+                self.request_input(
                     side, InputType.SELECT_CARD,
                     partial(self.qbt_discard_callback, side, trap_name),
                     suitable_cards,
@@ -1107,25 +1830,45 @@ class Game:
                 )
             # If you don't have suitable discards, then you can't play anything.
             else:
-                print('AR skipped due to lack of suitable cards.')
+                self.sink.emit('AR skipped due to lack of suitable cards.')
 
     def shuffle_callback(self, card_name):
         self.input_state.reps -= 1
         self.draw_pile.append(card_name)
         return True
 
+    def shuffle(self, pile):
+        '''
+        Shuffles pile in place with a Fisher-Yates shuffle drawn from
+        self.rng.shuffle.
+        '''
+        stream = self.rng.shuffle
+        if self.journal.active:
+            self.journal.record(stream.setstate, stream.getstate())
+        cards = list(pile)
+        randrange = stream.randrange
+        for i in range(len(cards) - 1, 0, -1):
+            j = randrange(i + 1)
+            cards[i], cards[j] = cards[j], cards[i]
+        pile[:] = cards
+
     def shuffle_draw_pile_stage(self):
-        shuffler_pile = self.draw_pile
-        self.draw_pile = []
+        if not self.manual_rng:
+            self.shuffle(self.draw_pile)
+            return
+
+        shuffler_pile = list(self.draw_pile)
+        self.draw_pile.clear()
 
-        self.input_state = Input(
+        self.request_input(
             Side.NEUTRAL, InputType.SELECT_CARD,
             self.shuffle_callback,
             shuffler_pile,
             'Shuffle the deck.  Select the next card.',
             reps=len(shuffler_pile),
             reps_unit='cards',
-            max_per_option=1
+            max_per_option=1,
+            rng_stream='shuffle'
         )
 
     def expand_deck(self):
@@ -1153,19 +1896,22 @@ class Game:
             # self.hand[Side.USSR].append(self.draw_pile.pop(
             #     self.draw_pile.index('The_China_Card')))
             # # WORKING CODE ABOVE -- uncomment if not using test code
-            self.cards.early_war = []
+            self.cards.early_war.clear()
             self.shuffle_draw_pile_stage()
         elif self.turn_track == 4:
             self.draw_pile.extend(self.cards.mid_war)
-            self.cards.mid_war = []
+            self.cards.mid_war.clear()
             self.shuffle_draw_pile_stage()
         elif self.turn_track == 8:
             self.draw_pile.extend(self.cards.late_war)
-            self.cards.late_war = []
+            self.cards.late_war.clear()
             self.shuffle_draw_pile_stage()
 
     def deal(self, first_side=Side.USSR):
 
+        for player in self.players:
+            player.update_deal(self)
+
         if first_side == Side.NEUTRAL:
             handsize_target = [3, 2]
         if 1 <= self.turn_track <= 3:
@@ -1190,8 +1936,8 @@ class Game:
 
             if not self.draw_pile:
                 # if draw pile exhausted, shuffle the discard pile and put it as the new draw pile
-                self.draw_pile = self.discard_pile
-                self.discard_pile = []
+                self.draw_pile.extend(self.discard_pile)
+                self.discard_pile.clear()
                 self.stage_list.append(
                     partial(self.deal, first_side=next_side))
                 self.shuffle_draw_pile_stage()
@@ -1200,7 +1946,7 @@ class Game:
     # need to make sure next_turn is only called after all extra rounds
     def end_of_turn(self):
 
-        print('-------------------- End of turn --------------------')
+        self.sink.emit('-------------------- End of turn --------------------')
         # -2. Check for held scoring card (originally #2. but moved up to prevent held scoring cards)
 
         def check_for_scoring_cards(self):
@@ -1218,7 +1964,7 @@ class Game:
             # Will hardcode to prevent discarding The China Card via Eagle/Bear has landed
             for s in [Side.USSR, Side.US]:
                 if self.space_track[s] >= 6 and self.space_track[s.opp] < 6:
-                    self.input_state = Input(
+                    self.request_input(
                         s, InputType.SELECT_CARD,
                         partial(self.may_discard_callback, s),
                         (n for n in self.hand[s] if n != 'The_China_Card'),
@@ -1226,13 +1972,13 @@ class Game:
                         option_stop_early='Do not discard.'
                     )
                     break
-            self.spaced_turns = [0, 0]
+            self.spaced_turns[:] = [0, 0]
 
         # 0. Clear all events that only last until the end of turn.
         def clear_baskets(self):
             for function in self.end_turn_stage_list:
                 function()
-            self.end_turn_stage_list = []
+            self.end_turn_stage_list.clear()
 
         # 1. Check milops
         def check_milops(self):
@@ -1266,7 +2012,7 @@ class Game:
             for s in [Side.USSR, Side.US]:
                 if 'The_China_Card' in self.hand[s]:
                     self.change_vp(s.vp_mult)
-            print(f'Final scoring complete.')
+            self.sink.emit('Final scoring complete.')
             self.terminate()
 
         # 6. Increase DEFCON status
@@ -1286,28 +2032,28 @@ class Game:
         self.deal()  # turn marker advanced before dealing
         self.process_headline()
 
-    def score(self, region: MapRegion, check_only=False):
-
+    def region_vps(self, region: MapRegion):
+        '''
+        Returns the VPs that the USSR and the US would each receive if region were
+        scored now, as a list indexed by Side. Reads the counts kept by the map,
+        so it does not walk the countries of the region.
+        '''
         (presence_vps, domination_vps,
          control_vps) = Game.Default.SCORING[region]
 
+        counts = self.map.region_counts[region].tolist()
+        country_count = [c[0] for c in counts]  # USSR, US, NEUTRAL
+        bg_count = [c[1] for c in counts]
+        vps = [c[2] for c in counts[:2]]
+
         if 'Formosan_Resolution' in self.basket[Side.US]:
-            self.map['Taiwan'].info.battleground = True
+            # Taiwan counts as a battleground while Formosan Resolution is in effect
+            taiwan = CountryInfo.ALL['Taiwan']
+            if region in taiwan.regions and not taiwan.battleground:
+                bg_count[self.map.control[taiwan.country_index]] += 1
 
         shuttle_modifier = 1 if 'Shuttle_Diplomacy' in self.basket[Side.US] else 0
 
-        bg_count = [0, 0, 0]  # USSR, US, NEUTRAL
-        country_count = [0, 0, 0]
-        vps = [0, 0]
-
-        for n in CountryInfo.REGION_ALL[region]:
-            x = self.map[n]
-            if x.info.battleground:
-                bg_count[x.control] += 1
-            country_count[x.control] += 1
-            if x.control.opp.name in x.info.adjacent_countries:
-                vps[x.control] += 1
-
         if region in [MapRegion.ASIA, MapRegion.MIDDLE_EAST]:
             bg_count[Side.USSR] -= shuttle_modifier
             country_count[Side.USSR] -= shuttle_modifier
@@ -1323,15 +2069,45 @@ class Game:
                     vps[s] += presence_vps
             elif country_count[s] > 0:
                 vps[s] += presence_vps
+        return vps
+
+    def region_scores(self):
+        '''
+        Returns the swing in VPs, positive for the USSR, that scoring each region
+        would give now, as a dict keyed by MapRegion. Nothing is printed and no
+        state is changed.
+        '''
+        scores = dict()
+        for region in Game.Default.SCORING:
+            vps = self.region_vps(region)
+            scores[region] = (vps[Side.USSR] * Side.USSR.vp_mult +
+                              vps[Side.US] * Side.US.vp_mult)
+        return scores
+
+    def score(self, region: MapRegion, check_only=False):
 
+        vps = self.region_vps(region)
         if not check_only:
             swing = vps[Side.USSR] * Side.USSR.vp_mult + \
                 vps[Side.US] * Side.US.vp_mult
-            print(f'{region.name} scores for {swing} VP')
+            self.sink.emit('{} scores for {} VP', region.name, swing)
             self.change_vp(swing)
         else:
-            print(
-                f'US:USSR = {vps[Side.US]}:{vps[Side.USSR]}')
+            self.sink.emit('US:USSR = {}:{}', vps[Side.US], vps[Side.USSR])
+
+
+class GameSnapshot:
+    '''
+    The saved state of a Game, as returned by Game.snapshot. Treat as opaque.
+    '''
+
+    __slots__ = ('game', 'values', 'lists', 'board', 'rng_state', 'card_values',
+                 'card_states', 'player_states', 'input_values')
+
+
+class UndoToken:
+    '''
+    Returned by Game.apply, to be passed to Game.undo. Treat as opaque.
+    '''
 
-        if self.map['Taiwan'].info.battleground:
-            self.map['Taiwan'].info.battleground = False
+    __slots__ = ('game', 'values', 'player_states')
@@ -0,0 +1,83 @@
+'''
+Positions shared by the tests, reached by uniformly random play.
+'''
+
+import pickle
+import random
+
+from game_mechanics import Game
+from twilight_enums import InputType
+from twilight_input_output import NullSink
+
+
+def opening(seed: int = 0, manual_rng: bool = False):
+    '''Returns a started game at the USSR's starting influence.'''
+    game = Game(NullSink(), seed=seed, manual_rng=manual_rng)
+    game.start()
+    game.advance()
+    return game
+
+
+def headline(seed: int = 0):
+    '''Returns a game at the first headline, after random starting influence.'''
+    game = opening(seed)
+    rng = random.Random(seed)
+    while game.input_state.state != InputType.SELECT_CARD:
+        game.apply(rng.choice(game.input_state.legal_moves()))
+    game.clear_undo()
+    return game
+
+
+def random_positions(games: int, moves: int = 200, seed: int = 0,
+                     manual_rng: bool = False):
+    '''
+    Yields the game at each decision of random games, up to moves decisions per
+    game. Games end early on an engine error, of which the engine still has
+    several.
+    '''
+    rng = random.Random(seed)
+    for i in range(games):
+        game = opening(seed * 1000 + i, manual_rng)
+        for _ in range(moves):
+            if game.winner is not None or not game.advance():
+                break
+            legal = game.input_state.legal_moves()
+            if not legal:
+                break
+            yield game
+            try:
+                game.apply(rng.choice(legal))
+            except Exception:
+                break
+            game.clear_undo()
+
+
+
+def sampled_positions():
+    '''
+    Returns every fourth decision of a few random games, which keeps the tests
+    that walk every country of each position quick.
+    '''
+    return [game for i, game in enumerate(random_positions(4, 160, seed=3))
+            if i % 4 == 0]
+
+def same_payload(a, b):
+    '''
+    Compares two payloads of Game.to_bytes by content: the bytes themselves may
+    differ where pickle shares equal objects in one game and not the other,
+    and in the order of sets.
+    '''
+    if isinstance(a, (set, frozenset)):
+        return a == b
+    if isinstance(a, dict):
+        return (isinstance(b, dict) and a.keys() == b.keys()
+                and all(same_payload(a[k], b[k]) for k in a))
+    if isinstance(a, (list, tuple)):
+        return (type(a) is type(b) and len(a) == len(b)
+                and all(map(same_payload, a, b)))
+    return pickle.dumps(a) == pickle.dumps(b)
+
+
+def state(game):
+    '''Returns the whole state of game as a payload of Game.to_bytes, for same_payload.'''
+    return pickle.loads(game.to_bytes())
@@ -0,0 +1,66 @@
+import pickle
+import random
+
+from game_mechanics import Game
+from twilight_input_output import NullSink
+from positions import opening, random_positions, same_payload
+
+
+def test_new_game_round_trip():
+    game = Game(NullSink(), seed=4)
+    copy = Game.from_bytes(game.to_bytes())
+    assert copy.map is None and copy.rng.seed == 4
+    assert copy.to_bytes() == game.to_bytes()
+
+
+def test_from_bytes_does_not_start_or_print(capsys):
+    game = opening(1)
+    copy = Game.from_bytes(game.to_bytes())
+    assert isinstance(copy.sink, NullSink)
+    assert copy.zobrist_hash() == game.zobrist_hash()
+    assert capsys.readouterr().out == ''
+
+
+def test_round_trip_matches_the_game():
+    rng = random.Random(0)
+    checked = 0
+    for game in random_positions(8, moves=150, seed=2):
+        if rng.random() > 0.1:
+            continue
+        data = game.to_bytes()
+        copy = Game.from_bytes(data)
+        assert same_payload(pickle.loads(copy.to_bytes()), pickle.loads(data))
+        assert copy.zobrist_hash() == game.zobrist_hash()
+        assert copy.input_state.legal_moves() == game.input_state.legal_moves()
+        checked += 1
+    assert checked > 10
+
+
+def test_copies_play_on_alike():
+    for game in random_positions(4, moves=60, seed=5):
+        pass
+    game.clear_undo()
+    copy = Game.from_bytes(game.to_bytes())
+    rng = random.Random(1)
+    for _ in range(30):
+        if game.winner is not None or not game.advance():
+            break
+        assert copy.advance()
+        moves = game.input_state.legal_moves()
+        assert copy.input_state.legal_moves() == moves
+        move = rng.choice(moves)
+        try:
+            game.apply(move)
+        except Exception:
+            break
+        copy.apply(move)
+        assert copy.zobrist_hash() == game.zobrist_hash()
+
+
+def test_load_bytes_restores_in_place():
+    game = opening(3)
+    data = game.to_bytes()
+    game.apply(game.input_state.legal_moves()[0])
+    game.load_bytes(data)
+    assert same_payload(pickle.loads(game.to_bytes()), pickle.loads(data))
+    assert not game.undo_tokens
@@ -0,0 +1,69 @@
+from twilight_enums import InputType, MapRegion, Side
+from twilight_map import CountryInfo
+from positions import headline
+
+
+def test_chernobyl_closes_the_designated_region():
+    game = headline(1)
+    game.cards['Chernobyl'].use_event(game, Side.US)
+    assert game.input_state.recv('Europe')
+    assert 'Chernobyl_Europe' in game.basket[Side.US]
+    europe = CountryInfo.REGION[MapRegion.EUROPE]
+    assert not game.map.placeable_mask(game, Side.USSR, 3)[europe].any()
+
+    # the end of the turn lifts it
+    game.end_turn_stage_list[-1]()
+    assert 'Chernobyl_Europe' not in game.basket[Side.US]
+    assert game.map.placeable_mask(game, Side.USSR, 3)[europe].any()
+
+
+def test_debt_crisis_doubles_ussr_influence():
+    game = headline(1)
+    card = game.cards['Latin_American_Debt_Crisis']
+    argentina = game.map['Argentina']
+    assert not card.double_inf_ussr_callback(game, 'Argentina')
+    argentina.increment_influence(Side.USSR, 2)
+    assert card.double_inf_ussr_callback(game, 'Argentina')
+    assert argentina.influence[Side.USSR] == 4
+
+
+def test_china_card_and_vietnam_revolts_do_not_overspend():
+    game = headline(1)
+    game.cards['Vietnam_Revolts'].use_event(game, Side.USSR)
+    game.map['Thailand'].set_influence(1, 3)
+    game.card_operation_influence(Side.USSR, 'The_China_Card')
+    # 4 operations, +1 for Asia and +1 for Southeast Asia, the first Thailand
+    # costing 2 while the US controls it
+    for name in ('Thailand', 'Thailand', 'North_Korea'):
+        assert game.input_state.recv(name)
+    # the Southeast Asia operation is lost, and the Asia one is at stake
+    assert game.input_state.reps == 1
+    assert not game.input_state.is_available('Poland')
+    assert game.input_state.is_available('North_Korea')
+
+
+def test_missile_envy_takes_an_opponents_event_for_operations():
+    game = headline(1)
+    game.hand[Side.US][:] = ['Marshall_Plan', 'Duck_and_Cover']
+    game.cards['Missile_Envy'].use_event(game, Side.USSR)
+    assert game.input_state.side == Side.US
+    assert game.input_state.legal_moves() == ['Marshall_Plan']
+
+    assert game.input_state.recv('Marshall_Plan')
+    assert 'Marshall_Plan' in game.hand[Side.USSR]
+    assert 'Marshall_Plan' not in game.hand[Side.US]
+    # a US event, so the USSR uses its operations without the event
+    assert game.input_state.side == Side.USSR
+    assert game.input_state.state == InputType.SELECT_CARD_ACTION
+    assert 'PLAY_EVENT' not in game.input_state.legal_moves()
+    assert 'INFLUENCE' in game.input_state.legal_moves()
+
+
+def test_brush_war_targets_unprotected_countries_of_stability_two_or_less():
+    game = headline(1)
+    game.cards['Brush_War'].use_event(game, Side.USSR)
+    assert game.input_state.state == InputType.SELECT_COUNTRY
+    nato = game.map.nato_mask(game)
+    expected = [n for n, info in CountryInfo.ALL.items()
+                if info.stability <= 2 and not nato[info.country_index]]
+    assert game.input_state.legal_moves() == expected
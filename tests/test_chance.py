@@ -0,0 +1,74 @@
+import pytest
+
+from twilight_chance import (coup_distribution, coup_ops, realignment_distribution)
+from twilight_enums import Side
+from positions import random_positions
+
+
+def prompts(func_name: str, limit: int = 40):
+    '''Yields (game, callback) at up to limit prompts whose callback is func_name of Game.'''
+    found = 0
+    for game in random_positions(60, seed=3, manual_rng=True):
+        callback = game.input_state.callback
+        if getattr(getattr(callback, 'func', None), '__name__', None) == func_name:
+            yield game, callback
+            found += 1
+            if found == limit:
+                return
+
+
+def engine_distribution(game, name: str, side: Side):
+    '''
+    Picks name at the current prompt and returns the distribution of the
+    outcomes the engine rolls for it, as (ussr, us, defcon, milops, vp) tuples
+    of the influence in name and of the changes of the tracks.
+    '''
+    start = game.snapshot()
+    game.apply(name)
+    try:
+        dice = game.input_state
+        assert dice.side == Side.NEUTRAL
+        country = game.map[name]
+
+        def tracks():
+            return game.defcon_track, game.milops_track[side], game.vp_track
+
+        before = tracks()
+        distribution = dict()
+        for outcome, p in zip(*game.chance_outcomes()):
+            snapshot = game.snapshot()
+            dice.recv(outcome)
+            after = tracks()
+            key = (*country.influence.tolist(), *(a - b for a, b in zip(after, before)))
+            distribution[key] = distribution.get(key, 0.0) + p
+            game.restore(snapshot)
+        return distribution
+    finally:
+        game.restore(start)
+
+
+def test_coup_distribution_matches_engine():
+    checked = 0
+    for game, callback in prompts('coup_callback'):
+        side, effective_ops, card_name = callback.args
+        free = callback.keywords.get('free', False)
+        ops = coup_ops(game, side, effective_ops, card_name)
+        for name in list(game.input_state.available_options)[:6]:
+            row = game.map[name].info.country_index
+            outcomes, probs = coup_distribution(game, name, side, int(ops[row]), free)
+            assert dict(zip(outcomes, probs)) == pytest.approx(
+                engine_distribution(game, name, side))
+            checked += 1
+    assert checked > 0
+
+
+def test_realignment_distribution_matches_engine():
+    checked = 0
+    for game, callback in prompts('realignment_callback'):
+        side = callback.args[0]
+        for name in list(game.input_state.available_options)[:6]:
+            outcomes, probs = realignment_distribution(game, name)
+            expected = {(ussr, us, 0, 0, 0): p for (ussr, us, *_), p in zip(outcomes, probs)}
+            assert expected == pytest.approx(engine_distribution(game, name, side))
+            checked += 1
+    assert checked > 0
@@ -0,0 +1,26 @@
+import pytest
+
+from game_mechanics import Game
+from twilight_enums import InputType
+from positions import opening
+
+
+@pytest.mark.parametrize('two_dice, reroll_ties', list(Game.Default.DICE))
+def test_manual_dice_match_the_distribution(two_dice, reroll_ties):
+    outcomes, probs = Game.dice_distribution(two_dice, reroll_ties)
+    assert len(outcomes) == len(set(outcomes)) == len(probs)
+    assert abs(sum(probs) - 1) < 1e-12
+
+    game = opening(1, manual_rng=True)
+    rolls = []
+    game.dice_stage(lambda roll: rolls.append(roll) or True, two_dice, reroll_ties)
+    input_state = game.input_state
+    assert input_state.state == InputType.ROLL_DICE
+    assert input_state.options == outcomes
+    assert input_state.distribution == (outcomes, probs)
+    assert game.chance_outcomes() == (outcomes, probs)
+
+    roll = game.sample_chance()
+    assert input_state.recv(roll)
+    assert rolls == [roll]
+    assert input_state.reps == 0
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from game_mechanics import Game
+from twilight_actions import ActionSpace
+from twilight_enums import InputType, Side
+from twilight_headless import HeadlessRunner
+from twilight_input_output import Decision, Input
+from positions import headline, same_payload, state
+
+
+def test_drive_gives_up_on_rejected_moves():
+    game = headline(1)
+    calls = []
+
+    def choose(game, moves):
+        calls.append(moves)
+        return 'Not a move'
+
+    with pytest.raises(RuntimeError):
+        game.drive(choose)
+    assert len(calls) == Game.MAX_REJECTED
+
+
+def test_drive_stops_after_max_moves():
+    game = headline(1)
+    rng = random.Random(0)
+    assert game.drive(lambda game, moves: rng.choice(moves), max_moves=5) == 5
+
+
+def test_playout_is_undone_by_its_token():
+    game = headline(2)
+    before = game.zobrist_hash()
+    rng = random.Random(0)
+    for seed in range(5):
+        try:
+            token = game.playout(lambda game, moves: rng.randrange(len(moves)), 300, seed=seed)
+        except Exception:
+            token = game.undo_tokens[-1]
+        game.undo(token)
+        assert game.zobrist_hash() == before
+        game.rehash()
+        assert game.zobrist_hash() == before
+
+
+def test_playout_asks_the_policy_without_inputs(monkeypatch):
+    game = headline(3)
+    before = game.zobrist_hash()
+    rng = random.Random(0)
+    decisions = []
+
+    def policy(game, moves):
+        legal = game.input_state.legal_moves()
+        assert not isinstance(game.input_state, Input)
+        assert moves.dtype.kind == 'i' and len(moves) == len(legal)
+        assert ((0 <= moves) & (moves < ActionSpace.SIZE)).all()
+        assert (moves[-1] == ActionSpace.STOP) == bool(game.input_state.option_stop_early)
+        decisions.append(len(moves))
+        return rng.randrange(len(moves))
+
+    def no_input(*args, **kwargs):
+        raise AssertionError('An Input was made in the rollout mode.')
+
+    monkeypatch.setattr(Input, '__init__', no_input)
+    token = game.playout(policy, 20, seed=1)
+    assert len(decisions) == 20
+    # the pending decision is handed back as an Input
+    assert isinstance(game.input_state, Input)
+    game.undo(token)
+    assert game.zobrist_hash() == before
+
+
+def test_playout_plays_as_drive():
+    a, b = headline(4), headline(4)
+    rng_a, rng_b = random.Random(1), random.Random(1)
+    a.playout(lambda game, moves: rng_a.randrange(len(moves)), 150, seed=2)
+    b.rng.reseed(2)
+    b.drive(lambda game, moves: moves[rng_b.randrange(len(moves))], 150)
+    assert a.zobrist_hash() == b.zobrist_hash()
+    assert same_payload(state(a), state(b))
+
+
+def test_headless_games_replay_from_their_seed():
+    runner = HeadlessRunner(seed=5, max_moves=300)
+    for _ in range(3):
+        try:
+            game = runner.run()
+        except Exception:
+            continue
+        seed, moves = runner.seed, runner.moves
+        replay = runner.run(seed=seed)
+        assert runner.moves == moves
+        assert replay.zobrist_hash() == game.zobrist_hash()
+
+
+def test_decision_looks_options_up_by_name_as_input():
+    picks = []
+    args = (Side.US, InputType.SELECT_COUNTRY, lambda o: picks.append(o) or True,
+            ('Cuba', 'Mexico', 'Panama'))
+    decision = Decision().set(*args, reps=2)
+    assert not decision.recv('Japan') and not decision.is_available('Japan')
+    with pytest.raises(KeyError):
+        decision.remove_option('Japan')
+    decision.remove_option('Mexico')
+    assert decision.recv('Panama')
+    assert picks == ['Panama']
+
+    input_state = decision.to_input()
+    assert input_state.legal_moves() == decision.legal_moves() == ['Cuba', 'Panama']
+    assert Decision().load(input_state).option_index == Input(*args).option_index
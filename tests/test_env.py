@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+
+from twilight_env import TwilightEnv, VecEnv
+from twilight_rng import GameRNG
+
+
+def failing_reset(env, fail_seeds):
+    reset = env.reset
+
+    def wrapped(seed=None):
+        if fail_seeds is None or seed in fail_seeds:
+            raise ValueError(f'bad seed {seed}')
+        return reset(seed)
+    env.reset = wrapped
+
+
+def test_reset_gives_up_after_repeated_failures():
+    vec = VecEnv(2, seed=1)
+    failing_reset(vec.envs[1], None)
+    with pytest.raises(RuntimeError):
+        vec.reset()
+    assert vec.episodes[1] == VecEnv.MAX_RESET_ATTEMPTS
+
+
+def test_failed_resets_are_reported_in_infos():
+    vec = VecEnv(1, seed=2, max_steps=1)
+    vec.reset()
+    first = vec.episodes[0]
+    bad = [GameRNG.derive(vec.seed, 0, first + k) for k in range(2)]
+    failing_reset(vec.envs[0], bad)
+    action = int(np.flatnonzero(vec.masks[0])[0])
+    *_, dones, _, infos = vec.step(np.array([action]))
+    assert dones[0] and infos[0]['truncated']
+    assert [seed for seed, _ in infos[0]['reset_errors']] == bad
+    assert all(isinstance(e, ValueError) for _, e in infos[0]['reset_errors'])
+    assert vec.masks[0].any()
+
+
+def test_illegal_actions_raise_before_any_game_is_played():
+    vec = VecEnv(2, seed=4)
+    vec.reset()
+    legal = int(np.flatnonzero(vec.masks[0])[0])
+    illegal = int(np.flatnonzero(~vec.masks[1])[0])
+    before = [env.game.to_bytes() for env in vec.envs]
+    for actions in ([legal, illegal], [legal, -1], [legal, 10 ** 6], [legal]):
+        with pytest.raises(ValueError):
+            vec.step(np.array(actions))
+    assert [env.game.to_bytes() for env in vec.envs] == before
+
+
+def test_engine_errors_end_the_game():
+    vec = VecEnv(1, seed=5)
+    vec.reset()
+    seed = vec.envs[0].game.rng.seed
+
+    def recv(option):
+        raise KeyError(option)
+    vec.envs[0].game.input_state.recv = recv
+    action = int(np.flatnonzero(vec.masks[0])[0])
+    *_, dones, masks, infos = vec.step(np.array([action]))
+    assert dones[0] and isinstance(infos[0]['error'], KeyError)
+    assert infos[0]['seed'] == seed
+    assert masks[0].any()
+
+
+def test_env_masks_match_legal_moves():
+    env = TwilightEnv()
+    env.reset(3)
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        if env.done:
+            break
+        mask = env.legal_action_mask()
+        options = {env.action_option(a) for a in np.flatnonzero(mask)}
+        assert options == set(env.game.input_state.legal_moves())
+        try:
+            env.step(int(rng.choice(np.flatnonzero(mask))))
+        except Exception:
+            break
+
+
+def test_winning_step_ends_the_episode():
+    rng = np.random.default_rng(0)
+    wins = 0
+    for seed in range(10):
+        env = TwilightEnv()
+        env.reset(seed)
+        try:
+            for _ in range(2000):
+                _, reward, done, info = env.step(
+                    int(rng.choice(np.flatnonzero(env.legal_action_mask()))))
+                if done or info['winner'] is not None:
+                    break
+        except Exception:
+            continue
+        if info['winner'] is not None:
+            wins += 1
+            assert done and reward != 0
+            with pytest.raises(RuntimeError):
+                env.step(0)
+    assert wins > 0
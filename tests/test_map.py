@@ -0,0 +1,28 @@
+import numpy as np
+
+from twilight_enums import MapRegion, Side
+from twilight_map import CountryInfo
+from positions import sampled_positions
+
+
+def test_control_and_region_counts_match_the_board():
+    for game in sampled_positions():
+        board = game.map
+        counts = np.zeros_like(board.region_counts)
+        for name, info in CountryInfo.ALL.items():
+            control = board[name].control
+            assert board.control[info.country_index] == control, name
+            adjacent = control != Side.NEUTRAL and control.opp.name in info.adjacent_countries
+            for region in info.regions:
+                counts[region, control] += (1, info.battleground, adjacent)
+        assert (board.region_counts == counts).all()
+        assert counts[MapRegion.EUROPE, Side.NEUTRAL, 2] == 0
+
+
+def test_recount_matches_incremental_updates():
+    for game in sampled_positions():
+        board = game.map
+        control, region_counts = board.control.copy(), board.region_counts.copy()
+        board.recount()
+        assert (board.control == control).all()
+        assert (board.region_counts == region_counts).all()
@@ -0,0 +1,28 @@
+from twilight_enums import Side
+from twilight_map import CountryInfo
+from positions import sampled_positions
+
+
+def test_placeable_mask_matches_per_country_checks():
+    for game in sampled_positions():
+        board = game.map
+        for side in (Side.USSR, Side.US):
+            for ops in (1, 2):
+                mask = board.placeable_mask(game, side, ops)
+                for name, info in CountryInfo.ALL.items():
+                    assert mask[info.country_index] == board.can_place_influence(
+                        game, name, side, ops), (name, side, ops)
+
+
+def test_coup_and_realignment_masks_match_per_country_checks():
+    for game in sampled_positions():
+        board = game.map
+        for side in (Side.USSR, Side.US):
+            for free in (False, True):
+                coups = board.coupable_mask(game, side, free)
+                realignments = board.realignable_mask(game, side, free)
+                for name, info in CountryInfo.ALL.items():
+                    i = info.country_index
+                    assert coups[i] == board.can_coup(game, name, side, free), (name, side, free)
+                    assert realignments[i] == board.can_realignment(
+                        game, name, side, free), (name, side, free)
@@ -0,0 +1,19 @@
+import random
+
+from twilight_enums import Side
+from twilight_mcts import Node
+from positions import headline
+
+
+def test_game_with_a_winner_is_terminal():
+    game = headline(1)
+    rng = random.Random(0)
+    assert Node(game, rng).side == Side.USSR
+
+    # decided, with the headline still pending
+    game.winner = Side.US
+    assert not game.input_state.complete
+    node = Node(game, rng)
+    assert node.side is None and node.result == -1.0
+    assert not node.untried
+    assert node.matches(game)
@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from twilight_enums import Side
+from positions import headline, opening
+
+
+def brute_force_multisets(game):
+    '''
+    Returns the multisets of picks which resolve the current input, found by
+    trying every order of picks with Game.apply, each sorted into option order.
+    '''
+    input_state = game.input_state
+    order = input_state.option_index
+    found = set()
+
+    def canonical(picks):
+        return tuple(sorted(picks, key=order.__getitem__))
+
+    def extend(picks):
+        stop = input_state.option_stop_early
+        for move in input_state.legal_moves():
+            before = input_state.selection.get(move)
+            token = game.apply(move)
+            try:
+                if move == stop:
+                    found.add(canonical(picks) + (stop,))
+                elif input_state.selection[move] > before:
+                    if game.input_state is input_state and not input_state.complete:
+                        extend(picks + [move])
+                    else:
+                        found.add(canonical(picks + [move]))
+            finally:
+                game.undo(token)
+
+    extend([])
+    return found
+
+
+def influence_input(seed: int, side: Side, card_name: str):
+    game = headline(seed)
+    game.card_operation_influence(side, card_name)
+    return game
+
+
+def de_stalinization_input(seed: int):
+    game = headline(seed)
+    game.cards['De_Stalinization'].use_event(game, Side.USSR)
+    return game
+
+
+def asia_input(seed: int, card_name: str, vietnam_revolts: bool):
+    '''
+    Returns a game at the USSR's placement of operations from card_name, with
+    the US in control of Japan and Thailand and the options narrowed to a few
+    countries in and out of Asia, so that the brute force stays quick.
+    '''
+    game = headline(seed)
+    if vietnam_revolts:
+        game.cards['Vietnam_Revolts'].use_event(game, Side.USSR)
+    game.map['Japan'].set_influence(1, 5)
+    game.map['Thailand'].set_influence(1, 3)
+    game.card_operation_influence(Side.USSR, card_name)
+    input_state = game.input_state
+    for name in input_state.options:
+        if name not in ASIA_OPTIONS:
+            input_state.remove_option(name)
+    assert input_state.legal_moves() == [
+        name for name in input_state.options if name in ASIA_OPTIONS]
+    return game
+
+
+# Southeast Asia, the rest of Asia, outside Asia, and US control in and out of
+# Southeast Asia
+ASIA_OPTIONS = ('Vietnam', 'Laos_Cambodia', 'Thailand', 'North_Korea', 'Japan', 'Poland')
+
+CASES = [
+    pytest.param(lambda: de_stalinization_input(1), id='de_stalinization-1'),
+    pytest.param(lambda: de_stalinization_input(2), id='de_stalinization-2'),
+    pytest.param(lambda: influence_input(1, Side.USSR, 'Olympic_Games'), id='ussr-2-ops'),
+    pytest.param(lambda: influence_input(1, Side.US, 'Olympic_Games'), id='us-2-ops'),
+    pytest.param(lambda: influence_input(3, Side.US, 'Duck_and_Cover'), id='us-3-ops'),
+    pytest.param(lambda: asia_input(1, 'The_China_Card', False), id='china-card'),
+    pytest.param(lambda: asia_input(1, 'Duck_and_Cover', True), id='vietnam-revolts'),
+    pytest.param(lambda: asia_input(1, 'The_China_Card', True), id='china-card-vietnam-revolts'),
+]
+
+
+@pytest.mark.parametrize('make_game', CASES)
+def test_multisets_match_brute_force(make_game):
+    game = make_game()
+    order = game.input_state.option_index
+    # as in brute_force_multisets, with the early stopping option last
+    multisets = {
+        tuple(sorted(multiset, key=lambda move: order.get(move, len(order))))
+        for multiset in game.input_multisets()}
+    assert len(multisets) == len(game.input_multisets())
+    assert multisets == brute_force_multisets(game)
+
+
+@pytest.mark.parametrize('make_game', CASES)
+def test_every_multiset_is_accepted(make_game):
+    game = make_game()
+    hash_before = game.zobrist_hash()
+    for multiset in game.input_multisets():
+        game.undo(game.apply_multiset(multiset))
+    assert game.zobrist_hash() == hash_before
+
+
+def test_starting_influence_counts():
+    game = opening(1)
+    # six influence over nine countries, as many as wanted in each: C(9 + 5, 6)
+    assert len(game.input_state.options) == 9
+    assert len(game.input_multisets()) == 3003
+
+
+def test_apply_multiset_matches_sequential_apply():
+    game = opening(1)
+    rng = random.Random(0)
+    multisets = game.input_multisets()
+    for multiset in rng.sample(multisets, 20):
+        token = game.apply_multiset(multiset)
+        hash_multiset = game.zobrist_hash()
+        game.undo(token)
+        tokens = [game.apply(move) for move in multiset]
+        assert game.zobrist_hash() == hash_multiset
+        for token in reversed(tokens):
+            game.undo(token)
+
+
+def test_apply_multiset_rejects_unavailable_picks():
+    game = opening(1)
+    multiset = game.input_multisets(limit=1)[0]
+    hash_before = game.zobrist_hash()
+    with pytest.raises(ValueError):
+        game.apply_multiset(multiset + multiset[:1])
+    assert game.zobrist_hash() == hash_before
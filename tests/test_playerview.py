@@ -0,0 +1,29 @@
+import random
+
+from positions import random_positions
+
+
+def test_known_cards_are_in_the_opponents_hand():
+    checked = 0
+    for game in random_positions(40, moves=400, seed=7):
+        for view in game.players:
+            opp = view.side.opp
+            held = set(game.hand[opp]).union((game.headline_bin[opp],))
+            assert view.opp_hand <= held
+            checked += bool(view.opp_hand)
+    assert checked > 0
+
+
+def test_samples_keep_the_known_cards():
+    rng = random.Random(0)
+    for i, game in enumerate(random_positions(10, moves=200, seed=8)):
+        if i % 7:
+            continue
+        for view in game.players:
+            hand, draw_pile, headline = view.sample(game, rng)
+            opp = view.side.opp
+            assert len(hand) == len(game.hand[opp])
+            assert sorted(hand + draw_pile + [headline] * (headline is not None)) == sorted(
+                game.hand[opp] + game.draw_pile
+                + [view.hidden_headline(game)] * (view.hidden_headline(game) is not None))
+            assert view.opp_hand <= set(hand).union((headline,))
@@ -0,0 +1,52 @@
+import os
+import random
+import subprocess
+import sys
+
+from twilight_rng import GameRNG
+from positions import opening
+
+
+def test_streams_are_independent():
+    a, b = GameRNG(5), GameRNG(5)
+    for _ in range(10):
+        b.dice.random()
+    assert [a.shuffle.random() for _ in range(5)] == [b.shuffle.random() for _ in range(5)]
+    assert [a.discard.random() for _ in range(5)] == [b.discard.random() for _ in range(5)]
+    assert a.dice.random() != b.dice.random()
+
+
+def test_state_round_trip_and_reseed():
+    rng = GameRNG(6)
+    state = rng.getstate()
+    first = [rng.stream(name).random() for name in GameRNG.STREAMS]
+    rng.setstate(state)
+    assert [rng.stream(name).random() for name in GameRNG.STREAMS] == first
+
+    rng.reseed(7)
+    assert rng.seed == 6
+    assert [rng.stream(name).random() for name in GameRNG.STREAMS] == [
+        GameRNG(7).stream(name).random() for name in GameRNG.STREAMS]
+
+
+def test_derive_does_not_depend_on_hash_seed():
+    code = 'from twilight_rng import GameRNG; print(GameRNG.derive("root", 1, "players"))'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outputs = {subprocess.run(
+        [sys.executable, '-c', code], cwd=root, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONHASHSEED=str(hash_seed))).stdout
+        for hash_seed in (1, 2)}
+    assert outputs == {f'{GameRNG.derive("root", 1, "players")}\n'}
+
+
+def test_games_replay_from_their_seed():
+    def play(seed):
+        game = opening(seed)
+        rng = random.Random(seed)
+        game.drive(lambda game, moves: rng.choice(moves), max_moves=150)
+        return game
+
+    a, b = play(11), play(11)
+    assert a.zobrist_hash() == b.zobrist_hash()
+    assert a.draw_pile == b.draw_pile
+    assert play(12).zobrist_hash() != a.zobrist_hash()
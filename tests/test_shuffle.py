@@ -0,0 +1,15 @@
+from positions import opening
+
+
+def test_shuffle_draws_from_the_shuffle_stream():
+    piles = []
+    for seed in (1, 1, 2):
+        game = opening(seed)
+        dice = game.rng.dice.getstate()
+        pile = sorted(game.hand[0])
+        game.draw_pile[:] = pile
+        game.shuffle(game.draw_pile)
+        assert sorted(game.draw_pile) == pile
+        assert game.rng.dice.getstate() == dice
+        piles.append(list(game.draw_pile))
+    assert piles[0] == piles[1] != piles[2]
@@ -0,0 +1,20 @@
+import random
+
+from positions import headline, same_payload, state
+
+
+def test_snapshot_restores_any_number_of_times():
+    game = headline(4)
+    before = state(game)
+    snapshot = game.snapshot()
+    for seed in range(3):
+        rng = random.Random(seed)
+        for _ in range(40):
+            if game.winner is not None or not game.advance():
+                break
+            try:
+                game.apply(rng.choice(game.input_state.legal_moves()))
+            except Exception:
+                break
+        game.restore(snapshot)
+        assert same_payload(state(game), before)
@@ -0,0 +1,79 @@
+from twilight_mcts import MCTS
+from twilight_transposition import TranspositionTable
+from positions import headline
+
+
+class Payload:
+    pass
+
+
+def test_store_without_move_keeps_best_move():
+    table = TranspositionTable(0.01)
+    node = Payload()
+    table.store(7, 10, 1.0, 10, 'Poland', payload=node)
+    table.store(7, 11, 2.0, 11, payload=node)
+    assert table.probe(7) == (11, 2.0, 11, 'Poland', node)
+    table.store(7, 12, 3.0, 12, 'Hungary')
+    assert table.probe(7)[3] == 'Hungary'
+
+
+def test_new_key_without_move_has_no_move():
+    table = TranspositionTable(0.01, ways=1)
+    table.store(1, 5, 0.0, 5, 'Poland')
+    # same bucket, evicts key 1 under the 'always' policy
+    other = 1 + table.mask + 1
+    table.policy = 'always'
+    table.store(other, 1, 0.0, 1)
+    assert table.probe(1) is None
+    assert table.probe(other)[3] is None
+
+
+def test_depth_policy_keeps_deeper_entries():
+    table = TranspositionTable(0.01, ways=2)
+    bucket = table.mask + 1
+    assert table.store(0, depth=5)
+    assert table.store(bucket, depth=6)
+    assert not table.store(2 * bucket, depth=4)
+    assert table.store(3 * bucket, depth=7)
+    assert table.probe(0) is None
+    assert table.probe(bucket) is not None
+    assert table.stats()['evictions'] == 1
+
+
+def test_backups_keep_searched_best_move():
+    game = headline(1)
+    table = TranspositionTable(1)
+    search = MCTS(seed=1, max_rollout=20, table=table)
+    move = search.search(game, playouts=30)
+    key = search.root.key
+    assert table.probe(key)[3] == move
+    search.playout(game)
+    assert table.probe(key)[3] == move
+
+
+def test_payloads_are_not_kept_alive():
+    table = TranspositionTable(0.01)
+    node = Payload()
+    table.store(3, payload=node)
+    assert table.payload(3) is node
+    del node
+    assert table.payload(3) is None
+    assert table.probe(3) is not None
+
+
+def test_move_ids_are_bounded():
+    table = TranspositionTable(0.01)
+    table.MAX_MOVES = 4
+    for key in range(6):
+        table.store(key, move=f'move {key}')
+    assert len(table.moves) == 4
+    assert [table.probe(key)[3] for key in range(6)] == [
+        'move 0', 'move 1', 'move 2', None, None, None]
+
+
+def test_entries_fit_the_budget():
+    table = TranspositionTable(1)
+    assert table.capacity * table.ENTRY_BYTES <= 2 ** 20
+    arrays = (table.keys, table.visits, table.values, table.depths,
+              table.move_ids, table.used)
+    assert sum(a.itemsize for a in arrays) + 8 + 80 == table.ENTRY_BYTES
@@ -0,0 +1,39 @@
+import random
+
+from positions import headline, random_positions, same_payload, state
+
+
+def test_undo_restores_every_position():
+    rng = random.Random(0)
+    checked = 0
+    for game in random_positions(20, moves=300, seed=1):
+        before, key = state(game), game.zobrist_hash()
+        for move in rng.sample(game.input_state.legal_moves(), 1):
+            try:
+                token = game.apply(move)
+            except Exception:
+                # an engine error leaves the token of the failed move outstanding
+                token = game.undo_tokens[-1]
+            game.undo(token)
+            assert game.zobrist_hash() == key
+            assert same_payload(state(game), before)
+            checked += 1
+    assert checked > 500
+
+
+def test_undo_many_moves_in_reverse():
+    game = headline(3)
+    before = state(game)
+    rng = random.Random(1)
+    tokens = []
+    for _ in range(60):
+        if game.winner is not None or not game.advance():
+            break
+        try:
+            tokens.append(game.apply(rng.choice(game.input_state.legal_moves())))
+        except Exception:
+            tokens.append(game.undo_tokens[-1])
+            break
+    for token in reversed(tokens):
+        game.undo(token)
+    assert same_payload(state(game), before)
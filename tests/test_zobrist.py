@@ -0,0 +1,35 @@
+from positions import opening, random_positions
+
+
+def test_incremental_hash_matches_rehash():
+    for game in random_positions(20, moves=300, seed=2):
+        key = game.zobrist_hash()
+        game.rehash()
+        assert game.zobrist_hash() == key
+
+
+def test_recount_keeps_the_board_hash():
+    for game in random_positions(4, moves=160, seed=3):
+        board = game.map
+        zobrist = board.zobrist
+        board.recount()
+        assert board.zobrist == zobrist
+
+
+def test_transpositions_share_a_hash():
+    game = opening(5)
+    first, second = game.input_state.legal_moves()[:2]
+    a = game.apply(first)
+    b = game.apply(second)
+    key = game.zobrist_hash()
+    game.undo(b)
+    game.undo(a)
+    a = game.apply(second)
+    game.apply(first)
+    assert game.zobrist_hash() == key
+    game.undo(game.undo_tokens[-1])
+    game.undo(a)
+    # and differ from other placements
+    game.apply(first)
+    game.apply(first)
+    assert game.zobrist_hash() != key
@@ -0,0 +1,95 @@
+'''
+The fixed integer action space shared by the environment and the rollout mode
+of Game.playout, in which every option of every kind of input has an id.
+'''
+
+import numpy as np
+
+from twilight_cards import Card
+from twilight_enums import InputType, CardAction
+from twilight_map import CountryInfo
+
+
+class ActionSpace:
+    '''
+    A fixed integer action space covering every kind of Input. Each InputType
+    has its own block of action ids:
+
+    - STOP: the early stopping option of any input.
+    - CARD_ACTION: offset by CardAction value.
+    - CARD: offset by Card.card_index.
+    - COUNTRY: offset by CountryInfo.country_index.
+    - DICE: offset by the position of the outcome among the input's options,
+      as in Game.Default.DICE.
+    - MULTIPLE: offset by the position of the choice among the input's options.
+    '''
+
+    MAX_DICE = 36
+    MAX_MULTIPLE = 8
+
+    STOP = 0
+    CARD_ACTION = 1
+    CARD = CARD_ACTION + len(CardAction)
+    COUNTRY = CARD + max(Card.INDEX) + 1
+    DICE = COUNTRY + CountryInfo.SIZE
+    MULTIPLE = DICE + MAX_DICE
+    SIZE = MULTIPLE + MAX_MULTIPLE
+
+    @staticmethod
+    def option_ids(input_state):
+        '''
+        Returns the action ids of the options of input_state, as an int array in
+        the order of input_state.options.
+        '''
+        state = input_state.state
+        options = input_state.options
+        if state == InputType.SELECT_CARD_ACTION:
+            ids = (ActionSpace.CARD_ACTION + CardAction[o] for o in options)
+        elif state == InputType.SELECT_CARD:
+            ids = (ActionSpace.CARD + Card.ALL[o].card_index for o in options)
+        elif state == InputType.SELECT_COUNTRY:
+            ids = (ActionSpace.COUNTRY + CountryInfo.ALL[o].country_index
+                   for o in options)
+        elif state == InputType.ROLL_DICE:
+            ids = range(ActionSpace.DICE, ActionSpace.DICE + len(options))
+        else:
+            if len(options) > ActionSpace.MAX_MULTIPLE:
+                raise ValueError(
+                    f'Too many options for the action space: {input_state.prompt}')
+            ids = range(ActionSpace.MULTIPLE, ActionSpace.MULTIPLE + len(options))
+        return np.fromiter(ids, dtype=np.int64, count=len(options))
+
+    @staticmethod
+    def move_ids(state: InputType, options: tuple, indices, option_stop_early=''):
+        '''
+        Returns the action ids of options[i] for each i in indices, followed by
+        STOP if option_stop_early is set, as an int array. These are the legal
+        moves of a decision in the rollout mode of Game.playout, where indices
+        are its available options.
+        '''
+        table = ActionSpace._IDS.get(state)
+        if table is not None:
+            ids = [table[options[i]] for i in indices]
+        else:
+            if state == InputType.ROLL_DICE:
+                first = ActionSpace.DICE
+            elif len(options) > ActionSpace.MAX_MULTIPLE:
+                raise ValueError(f'Too many options for the action space: {options}')
+            else:
+                first = ActionSpace.MULTIPLE
+            ids = [first + i for i in indices]
+        if option_stop_early:
+            ids.append(ActionSpace.STOP)
+        return np.array(ids, dtype=np.int64)
+
+
+# action ids by option, for the kinds of input whose options are named
+ActionSpace._IDS = {
+    InputType.SELECT_CARD_ACTION: {
+        action.name: ActionSpace.CARD_ACTION + action for action in CardAction},
+    InputType.SELECT_CARD: {
+        name: ActionSpace.CARD + card.card_index for name, card in Card.ALL.items()},
+    InputType.SELECT_COUNTRY: {
+        name: ActionSpace.COUNTRY + info.country_index
+        for name, info in CountryInfo.ALL.items()},
+}
@@ -0,0 +1,601 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+'''
+Micro-benchmarks for the engine. Usage:
+
+    python twilight_benchmark.py [benchmark ...]
+
+With no arguments, every benchmark is run. Games are played with uniformly random
+choices, and engine output is sent to a NullSink.
+'''
+
+import io
+import sys
+import pickle
+import random
+import numpy as np
+
+from contextlib import redirect_stdout
+from copy import deepcopy
+from time import perf_counter
+
+from game_mechanics import Game
+from twilight_env import VecEnv, SubprocVecEnv
+from twilight_chance import expectimax
+from twilight_enums import Side
+from twilight_input_output import NullSink
+from twilight_map import CountryInfo
+from twilight_mcts import MCTS, TreeParallelMCTS, RootParallelMCTS
+from twilight_transposition import TranspositionTable
+from twilight_ui import UI
+
+
+def advance(game: Game):
+    '''
+    Runs stages until input is required. Returns False if the game has ended.
+    '''
+    while game.input_state is None or game.input_state.complete:
+        if not game.stage_list:
+            return False
+        game.stage_complete()
+    return True
+
+
+def random_move(game: Game, rng: random.Random):
+    '''
+    Sends a uniformly random legal option to the current input.
+    '''
+    game.input_state.recv(rng.choice(game.input_state.legal_moves()))
+
+
+def random_positions(n: int, seed: int = 0):
+    '''
+    Yields the game at each decision point of random games, until n positions have
+    been yielded. Games which raise an engine error are abandoned.
+    '''
+    rng = random.Random(seed)
+    count = 0
+    while count < n:
+        game = Game(NullSink(), seed=rng.getrandbits(64))
+        game.start()
+        try:
+            while count < n and advance(game):
+                yield game
+                count += 1
+                random_move(game, rng)
+        except Exception:
+            continue
+
+
+def timed(f, repeat: int):
+    '''Returns the mean wall time of f() in microseconds.'''
+    start = perf_counter()
+    for _ in range(repeat):
+        f()
+    return (perf_counter() - start) / repeat * 1e6
+
+
+def benchmark_snapshot(positions: int = 500):
+    '''
+    Compares the per-move cost of Game.snapshot and Game.restore with deepcopy.
+    '''
+    totals = dict(deepcopy=0, snapshot=0, restore=0)
+    for game in random_positions(positions):
+        totals['deepcopy'] += timed(lambda: deepcopy(game), 3)
+        totals['snapshot'] += timed(game.snapshot, 20)
+        snapshot = game.snapshot()
+        totals['restore'] += timed(lambda: game.restore(snapshot), 20)
+
+    print(f'snapshot: {positions} positions')
+    for name, total in totals.items():
+        print(f'  {name:<10}{total / positions:10.1f} us/move')
+    print(f'  speedup   {totals["deepcopy"] / totals["snapshot"]:10.1f}x')
+
+
+def benchmark_checkpoint(positions: int = 500):
+    '''
+    Compares the per-move cost of saving a game with Game.to_bytes and loading
+    it with Game.from_bytes, or into an existing game with Game.load_bytes,
+    against a pickle round trip.
+    '''
+    totals = dict(pickle=0, unpickle=0, to_bytes=0, from_bytes=0, load_bytes=0)
+    sizes = dict(pickle=0, to_bytes=0)
+    worker = Game(NullSink())
+    worker.start()
+    for game in random_positions(positions):
+        pickled = pickle.dumps(game, pickle.HIGHEST_PROTOCOL)
+        data = game.to_bytes()
+        sizes['pickle'] += len(pickled)
+        sizes['to_bytes'] += len(data)
+        totals['pickle'] += timed(lambda: pickle.dumps(game, pickle.HIGHEST_PROTOCOL), 5)
+        totals['unpickle'] += timed(lambda: pickle.loads(pickled), 5)
+        totals['to_bytes'] += timed(game.to_bytes, 5)
+        totals['from_bytes'] += timed(lambda: Game.from_bytes(data, NullSink()), 5)
+        totals['load_bytes'] += timed(lambda: worker.load_bytes(data), 5)
+
+    print(f'checkpoint: {positions} positions')
+    for name, total in totals.items():
+        print(f'  {name:<12}{total / positions:10.1f} us/move')
+    for name, total in sizes.items():
+        print(f'  {name:<12}{total / positions:10.0f} bytes')
+
+
+def benchmark_undo(positions: int = 500):
+    '''
+    Compares the cost of trying a move with Game.apply and Game.undo against
+    Game.snapshot and Game.restore.
+    '''
+    rng = random.Random(1)
+    totals = dict(snapshot=0, journal=0)
+    count = 0
+
+    def try_snapshot(game, move):
+        snapshot = game.snapshot()
+        try:
+            game.input_state.recv(move)
+            game.advance()
+        finally:
+            game.restore(snapshot)
+
+    def try_journal(game, move):
+        try:
+            game.apply(move)
+        finally:
+            # also discards a move which raised an engine error part way
+            while game.undo_tokens:
+                game.undo(game.undo_tokens[-1])
+
+    for game in random_positions(positions):
+        move = rng.choice(game.input_state.legal_moves())
+        try:
+            snapshot = timed(lambda: try_snapshot(game, move), 5)
+            journal = timed(lambda: try_journal(game, move), 5)
+        except Exception:
+            continue
+        totals['snapshot'] += snapshot
+        totals['journal'] += journal
+        count += 1
+
+    print(f'undo: {count} positions')
+    for name, total in totals.items():
+        print(f'  {name:<10}{total / count:10.1f} us/move')
+
+
+def benchmark_shuffle(repeat: int = 200):
+    '''
+    Compares shuffling the Early War deck one card at a time through Inputs,
+    resolved as in the UI, with Game.shuffle.
+    '''
+    rng = random.Random(2)
+    game = Game(NullSink(), manual_rng=True)
+    game.start()
+    deck = list(game.cards.early_war)
+
+    def manual():
+        game.draw_pile[:] = deck
+        game.shuffle_draw_pile_stage()
+        while not game.input_state.complete:
+            game.input_state.recv(
+                rng.choice(list(game.input_state.available_options)))
+
+    def automatic():
+        game.draw_pile[:] = deck
+        game.shuffle(game.draw_pile)
+
+    print(f'shuffle: {len(deck)} cards')
+    print(f'  {"manual":<10}{timed(manual, repeat):10.1f} us/shuffle')
+    print(f'  {"rng":<10}{timed(automatic, repeat):10.1f} us/shuffle')
+
+
+def benchmark_dice(repeat: int = 2000):
+    '''
+    Compares a 2d6 dice_stage resolved through an Input, as in the UI, with a
+    roll drawn directly from the game's RNG.
+    '''
+    rng = random.Random(3)
+    game = Game(NullSink())
+    game.start()
+
+    def roll(num):
+        return True
+
+    def manual():
+        game.dice_stage(roll, two_dice=True)
+        game.input_state.recv(rng.choice(list(game.input_state.available_options)))
+
+    def automatic():
+        game.dice_stage(roll, two_dice=True)
+
+    game.manual_rng = True
+    manual_time = timed(manual, repeat)
+    game.manual_rng = False
+    automatic_time = timed(automatic, repeat)
+
+    print('dice: 2d6 roll')
+    print(f'  {"manual":<10}{manual_time:10.1f} us/roll')
+    print(f'  {"rng":<10}{automatic_time:10.1f} us/roll')
+
+
+def benchmark_placement(positions: int = 500):
+    '''
+    Compares generating the influence placement options of both sides with
+    GameMap.can_place_influence per country against GameMap.placeable_mask.
+    '''
+    totals = dict(per_country=0, mask=0)
+
+    def per_country(game):
+        for side in (Side.USSR, Side.US):
+            [n for n in CountryInfo.ALL
+             if game.map.can_place_influence(game, n, side, 1)]
+
+    def mask(game):
+        for side in (Side.USSR, Side.US):
+            game.map.names(game.map.placeable_mask(game, side, 1))
+
+    for game in random_positions(positions):
+        totals['per_country'] += timed(lambda: per_country(game), 5)
+        totals['mask'] += timed(lambda: mask(game), 5)
+
+    print(f'placement: {positions} positions')
+    for name, total in totals.items():
+        print(f'  {name:<12}{total / positions:10.1f} us/position')
+    print(f'  speedup     {totals["per_country"] / totals["mask"]:10.1f}x')
+
+
+def benchmark_coup(positions: int = 500):
+    '''
+    Compares generating the coup and realignment options of both sides with
+    GameMap.can_coup and GameMap.can_realignment per country against
+    GameMap.coupable_mask and GameMap.realignable_mask.
+    '''
+    totals = dict(per_country=0, mask=0)
+
+    def per_country(game):
+        for side in (Side.USSR, Side.US):
+            [n for n in CountryInfo.ALL if game.map.can_coup(game, n, side)]
+            [n for n in CountryInfo.ALL if game.map.can_realignment(game, n, side)]
+
+    def mask(game):
+        for side in (Side.USSR, Side.US):
+            game.map.names(game.map.coupable_mask(game, side))
+            game.map.names(game.map.realignable_mask(game, side))
+
+    for game in random_positions(positions):
+        totals['per_country'] += timed(lambda: per_country(game), 5)
+        totals['mask'] += timed(lambda: mask(game), 5)
+
+    print(f'coup: {positions} positions')
+    for name, total in totals.items():
+        print(f'  {name:<12}{total / positions:10.1f} us/position')
+    print(f'  speedup     {totals["per_country"] / totals["mask"]:10.1f}x')
+
+
+def benchmark_expectimax(prompts: int = 50):
+    '''
+    Compares valuing every target of a coup or realignment prompt by playing
+    each target and each outcome of its dice with apply and undo against
+    twilight_chance.expectimax, which computes the outcomes of all targets at
+    once. The simulation only reads the VP track of each outcome, so it is
+    timed without the cost of an evaluation.
+    '''
+    totals = dict(simulate=0, expectimax=0)
+
+    def simulate(game):
+        manual_rng = game.manual_rng
+        game.manual_rng = True
+        values = dict()
+        for move in game.input_state.available_options:
+            token = game.apply(move)
+            if game.input_state.side == Side.NEUTRAL:
+                value = 0.0
+                for outcome, p in zip(*game.chance_outcomes()):
+                    outcome_token = game.apply(outcome)
+                    value += p * game.vp_track / 20
+                    game.undo(outcome_token)
+                values[move] = value
+            game.undo(token)
+        game.manual_rng = manual_rng
+        return values
+
+    count = 0
+    for game in random_positions(10 ** 6):
+        callback = getattr(game.input_state.callback, 'func', None)
+        if callback not in (game.coup_callback, game.realignment_callback):
+            continue
+        totals['simulate'] += timed(lambda: simulate(game), 3)
+        totals['expectimax'] += timed(lambda: expectimax(game), 3)
+        count += 1
+        if count == prompts:
+            break
+
+    print(f'expectimax: {count} coup and realignment prompts')
+    for name, total in totals.items():
+        print(f'  {name:<12}{total / count:10.1f} us/prompt')
+    print(f'  speedup     {totals["simulate"] / totals["expectimax"]:10.1f}x')
+
+
+def benchmark_vecenv(steps: int = 20000, n: int = 32):
+    '''
+    Measures the steps per second of a VecEnv of n games, with a batched random
+    policy which picks a legal action for every game with one argmax.
+    '''
+    rng = np.random.default_rng(4)
+    env = VecEnv(n, seed=4)
+    _, masks = env.reset()
+    finished = 0
+
+    start = perf_counter()
+    for _ in range(steps // n):
+        noise = rng.random(masks.shape)
+        noise[~masks] = -1
+        _, _, dones, masks, _ = env.step(noise.argmax(axis=1))
+        finished += int(dones.sum())
+    elapsed = perf_counter() - start
+
+    print(f'vecenv: {n} games')
+    print(f'  {"steps/s":<10}{steps // n * n / elapsed:10.0f}')
+    print(f'  {"games/s":<10}{finished / elapsed:10.1f}')
+
+
+def benchmark_subproc(steps: int = 20000, n: int = 32, workers=(1, 2, 4, 8)):
+    '''
+    Measures the steps and games per second of a SubprocVecEnv of n games, for
+    each number of workers, with the same random policy as benchmark_vecenv.
+    Scaling is bounded by the number of cores.
+    '''
+    print(f'subproc: {n} games')
+    print(f'  {"workers":<10}{"steps/s":>10}{"games/s":>10}')
+    for w in workers:
+        rng = np.random.default_rng(5)
+        with SubprocVecEnv(n, w, seed=5) as env:
+            _, masks = env.reset()
+            finished = 0
+            start = perf_counter()
+            for _ in range(steps // n):
+                noise = rng.random(masks.shape)
+                noise[~masks] = -1
+                _, _, dones, masks, _ = env.step(noise.argmax(axis=1))
+                finished += int(dones.sum())
+            elapsed = perf_counter() - start
+        print(f'  {w:<10}{steps // n * n / elapsed:10.0f}{finished / elapsed:10.1f}')
+
+
+def opening_position(seed: int = 0):
+    '''
+    Returns a game with its starting influence placed at random from seed, at
+    the first headline.
+    '''
+    rng = random.Random(seed)
+    game = Game(NullSink(), seed=seed)
+    game.start()
+    while advance(game) and game.input_state.prompt != 'Select headline.':
+        random_move(game, rng)
+    return game
+
+
+def benchmark_playout(playouts: int = 200, max_moves: int = 1000):
+    '''
+    Compares random playouts from the first headline driven through the UI
+    with its output discarded, through Game.apply with every move undone
+    afterwards, and in the rollout mode of Game.playout, undone with its one
+    token. Each playout runs until the game ends, max_moves decisions are
+    made or the engine raises an error. Playouts cut short by an engine error
+    are counted apart, and the rates are of the other playouts alone, though
+    the time of every playout is counted.
+    '''
+    game = opening_position()
+    snapshot = game.snapshot()
+
+    def ui_playouts():
+        errors = 0
+        ui = UI()
+        ui.game = game
+        ui.game_in_progress = True
+        with redirect_stdout(io.StringIO()):
+            for i in range(playouts):
+                game.restore(snapshot)
+                game.rng.reseed(i)
+                ui.game_rollback = game.snapshot()
+                try:
+                    ui.game_state_changed()
+                    for _ in range(max_moves):
+                        if not ui.options or game.winner is not None:
+                            break
+                        ui.parse_move(str(rng.choice(list(ui.options))))
+                except Exception:
+                    errors += 1
+        return errors
+
+    def apply_playouts():
+        errors = 0
+        for i in range(playouts):
+            game.rng.reseed(i)
+            try:
+                for _ in range(max_moves):
+                    if game.winner is not None or not game.advance():
+                        break
+                    game.apply(rng.choice(game.input_state.legal_moves()))
+            except Exception:
+                errors += 1
+            while game.undo_tokens:
+                game.undo(game.undo_tokens[-1])
+        return errors
+
+    def fast_playouts():
+        errors = 0
+
+        def policy(game, moves):
+            return rng.randrange(len(moves))
+        for i in range(playouts):
+            try:
+                game.undo(game.playout(policy, max_moves, seed=i))
+            except Exception:
+                errors += 1
+                game.undo(game.undo_tokens[-1])
+        return errors
+
+    print(f'playout: {playouts} random playouts from the first headline')
+    rates = dict()
+    for name, f in (('ui', ui_playouts), ('apply', apply_playouts),
+                    ('playout', fast_playouts)):
+        game.restore(snapshot)
+        rng = random.Random(0)
+        start = perf_counter()
+        errors = f()
+        rates[name] = (playouts - errors) / (perf_counter() - start)
+        print(f'  {name:<10}{rates[name]:10.1f} playouts/s'
+              f'{rates[name] / rates["ui"]:8.1f}x'
+              f'{errors:6} ended by an engine error')
+
+
+def mid_war_position(seed: int = 6):
+    '''
+    Returns a game played at random from seed to its first decision of turn 4,
+    the first Mid War turn. Games which raise an engine error are replaced.
+    '''
+    rng = random.Random(seed)
+    while True:
+        game = Game(NullSink(), seed=rng.getrandbits(64))
+        game.start()
+        try:
+            while advance(game):
+                if game.turn_track >= 4 and game.input_state.side != Side.NEUTRAL:
+                    return game
+                random_move(game, rng)
+        except Exception:
+            continue
+
+
+def benchmark_mcts(seconds: float = 3, workers=(1, 2, 4, 8)):
+    '''
+    Measures the playouts per second of MCTS, TreeParallelMCTS and
+    RootParallelMCTS from a fixed Mid War position, for each number of
+    workers. Scaling is bounded by the number of cores, and tree parallelism
+    by the GIL.
+    '''
+    game = mid_war_position()
+    search = MCTS(seed=7)
+    search.search(game, seconds=seconds)
+    print(f'mcts: turn {game.turn_track}, {seconds}s per search')
+    print(f'  {"serial":<10}{search.playouts / seconds:10.0f} playouts/s')
+    print(f'  {"workers":<10}{"tree":>10}{"root":>10}')
+    for w in workers:
+        tree = TreeParallelMCTS(w, seed=7)
+        tree.search(game, seconds=seconds)
+        with RootParallelMCTS(w, seed=7) as root:
+            root.search(game, seconds=seconds)
+        print(f'  {w:<10}{tree.playouts / seconds:10.0f}'
+              f'{root.playouts / seconds:10.0f}')
+
+
+def tree_positions(search: MCTS, game: Game):
+    '''
+    Returns the number of distinct positions, by Game.zobrist_hash, in the tree
+    of search, and the depth of its deepest node. The tree is walked by
+    applying and undoing its moves on game, which must be at the root.
+    '''
+    positions = set()
+    seen = set()
+    deepest = 0
+    manual_rng = game.manual_rng
+    game.manual_rng = True
+
+    def walk(node, depth):
+        nonlocal deepest
+        positions.add(game.zobrist_hash())
+        deepest = max(deepest, depth)
+        if id(node) in seen:
+            return
+        seen.add(id(node))
+        for move, child in node.children.items():
+            token = game.apply(move)
+            try:
+                walk(child, depth + 1)
+            finally:
+                game.undo(token)
+
+    try:
+        walk(search.root, 0)
+    finally:
+        game.manual_rng = manual_rng
+    return len(positions), deepest
+
+
+def benchmark_transposition(playouts: int = 3000, max_rollout: int = 0):
+    '''
+    Compares the trees MCTS builds from the USSR's starting influence placement,
+    six picks of one influence each, without a transposition table and with
+    tables of each replacement policy. Rollouts are cut off after max_rollout
+    moves, so that the cost is in the tree.
+
+    Every playout adds one node. Without a table, orderings of the same picks
+    are separate nodes, so the tree holds fewer distinct positions than nodes.
+    '''
+    game = Game(NullSink(), seed=8)
+    game.start()
+    game.advance()
+    print(f'transposition: {game.input_state.prompt} {playouts} playouts')
+    print(f'  {"table":<16}{"nodes":>8}{"positions":>10}{"depth":>6}'
+          f'{"hits":>8}{"evictions":>10}{"time":>8}')
+    tables = [('none', None)] + [
+        (f'{policy} {mb}MB', TranspositionTable(mb, policy))
+        for policy in TranspositionTable.POLICIES for mb in (16, 0.05)]
+    for name, table in tables:
+        search = MCTS(seed=8, max_rollout=max_rollout, table=table)
+        start = perf_counter()
+        search.search(game, playouts=playouts)
+        elapsed = perf_counter() - start
+        positions, depth = tree_positions(search, game)
+        stats = dict(hits=0, evictions=0) if table is None else table.stats()
+        print(f'  {name:<16}{search.nodes:8}{positions:10}{depth:6}'
+              f'{stats["hits"]:8}{stats["evictions"]:10}{elapsed:7.2f}s')
+
+
+def benchmark_multisets(repeat: int = 200):
+    '''
+    Counts the distinct multisets of each side's starting influence placement,
+    against the ordered sequences of picks which one-pick moves search over,
+    and times their enumeration and applying one multiset as a single move.
+    '''
+    game = Game(NullSink(), seed=8)
+    game.start()
+    game.advance()
+    print('multisets: starting influence')
+    print(f'  {"side":<8}{"sequences":>12}{"multisets":>12}{"enumerate":>12}'
+          f'{"apply":>10}')
+    while game.input_state.prompt == 'Place starting influence.':
+        input_state = game.input_state
+        sequences = len(input_state.selection) ** input_state.reps
+        start = perf_counter()
+        multisets = game.input_multisets()
+        elapsed = perf_counter() - start
+
+        def apply_undo():
+            game.undo(game.apply_multiset(multisets[-1]))
+        print(f'  {input_state.side.name:<8}{sequences:12}{len(multisets):12}'
+              f'{elapsed:11.2f}s{timed(apply_undo, repeat):8.1f}us')
+        game.apply_multiset(multisets[-1])
+
+
+BENCHMARKS = {
+    'snapshot': benchmark_snapshot,
+    'checkpoint': benchmark_checkpoint,
+    'undo': benchmark_undo,
+    'shuffle': benchmark_shuffle,
+    'dice': benchmark_dice,
+    'placement': benchmark_placement,
+    'coup': benchmark_coup,
+    'expectimax': benchmark_expectimax,
+    'vecenv': benchmark_vecenv,
+    'subproc': benchmark_subproc,
+    'playout': benchmark_playout,
+    'mcts': benchmark_mcts,
+    'transposition': benchmark_transposition,
+    'multisets': benchmark_multisets,
+}
+
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS:
+        BENCHMARKS[name]()
@@ -4,23 +4,24 @@ from typing import Callable, Optional
 from functools import partial
 from itertools import chain
 
-from twilight_input_output import Input
+from twilight_journal import Journal, Journaled, Pile
 from twilight_map import MapRegion, CountryInfo, Country
 from twilight_enums import Side, MapRegion, InputType, CardAction
 
 
 class GameCards:
 
-    def __init__(self):
+    def __init__(self, journal: Journal = None):
 
         self.ALL = dict()
-        self.early_war = []
-        self.mid_war = []
-        self.late_war = []
+        self.early_war = Pile(journal)
+        self.mid_war = Pile(journal)
+        self.late_war = Pile(journal)
 
         for card_name, CardClass in Card.ALL.items():
 
             self.ALL[card_name] = CardClass()
+            self.ALL[card_name].journal = journal
 
             if CardClass.stage == 'Early War':
                 self.early_war.append(card_name)
@@ -33,7 +34,7 @@ class GameCards:
         return self.ALL[item]
 
 
-class Card:
+class Card(Journaled):
 
     ALL = dict()
     INDEX = dict()
@@ -81,6 +82,7 @@ class Card:
 
     def dispose(self, game, side):
         game.hand[side].remove(self.name)
+        game.players[side.opp].update_opp_removed([self.name])
         if self.event_occurred and self.event_unique:
             game.removed_pile.append(self.name)
         else:
@@ -184,7 +186,7 @@ class Five_Year_Plan(Card):
 
     def callback(self, game_instance, card_name: str):
         game_instance.input_state.reps -= 1
-        print(f'{card_name} was selected by Five_Year_Plan.')
+        game_instance.sink.emit('{} was selected by Five_Year_Plan.', card_name)
         if game_instance.cards[card_name].info.owner == Side.US:
             # must append backwards!
             game_instance.stage_list.append(
@@ -202,13 +204,14 @@ class Five_Year_Plan(Card):
         reps = len(game_instance.hand[Side.USSR]) if len(
             game_instance.hand[Side.USSR]) <= 1 else 1
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.NEUTRAL, InputType.SELECT_CARD,
             partial(self.callback, game_instance),
             (n for n in game_instance.hand[Side.USSR]
              if n != 'Five_Year_Plan'),
             prompt='Five Year Plan: USSR randomly discards a card.',
-            reps=reps
+            reps=reps,
+            rng_stream='discard'
         )
 
 
@@ -280,12 +283,12 @@ class The_China_Card(Card):
 
     def modify_selection(self, game_instance, side):
         if game_instance.input_state.reps == 2 and self.all_points_in_region:
-            for n in game_instance.input_state.selection:
+            for n in game_instance.input_state.options:
                 if game_instance.map[n].info.name not in The_China_Card._region and game_instance.map[n].control == side.opp:
                     game_instance.input_state.remove_option(n)
 
         if game_instance.input_state.reps == 1 and self.all_points_in_region:
-            for n in game_instance.input_state.selection:
+            for n in game_instance.input_state.options:
                 if game_instance.map[n].info.name not in The_China_Card._region:
                     game_instance.input_state.remove_option(n)
 
@@ -305,7 +308,7 @@ class Socialist_Governments(Card):
     def use_event(self, game_instance, side: Side):
         if self.can_event(game_instance, Side.USSR):
             self.event_occurred = True
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.USSR, InputType.SELECT_COUNTRY,
                 partial(game_instance.event_influence_callback,
                         Country.decrement_influence, Side.US),
@@ -399,22 +402,22 @@ class Vietnam_Revolts(Card):
         all options not in ASIA, and also remove the options outside SEA if opponent owned. 
         '''
         if card_name == 'The_China_Card' and game_instance.input_state.reps == 3 and self.all_points_in_region:
-            for n in game_instance.input_state.selection:
+            for n in game_instance.input_state.options:
                 if game_instance.map[n].info.name not in The_China_Card._region and game_instance.map[n].control == side.opp:
                     game_instance.input_state.remove_option(n)
 
         if card_name == 'The_China_Card' and game_instance.input_state.reps == 2 and self.all_points_in_region:
-            for n in game_instance.input_state.selection:
+            for n in game_instance.input_state.options:
                 if game_instance.map[n].info.name not in The_China_Card._region or (game_instance.map[n].info.name not in Vietnam_Revolts._region and game_instance.map[n].control == side.opp):
                     game_instance.input_state.remove_option(n)
 
         elif game_instance.input_state.reps == 2 and self.all_points_in_region:
-            for n in game_instance.input_state.selection:
+            for n in game_instance.input_state.options:
                 if game_instance.map[n].info.name not in Vietnam_Revolts._region or game_instance.map[n].control == side.opp:
                     game_instance.input_state.remove_option(n)
 
         elif game_instance.input_state.reps == 1 and self.all_points_in_region:
-            for n in game_instance.input_state.selection:
+            for n in game_instance.input_state.options:
                 if game_instance.map[n].info.name not in Vietnam_Revolts._region:
                     game_instance.input_state.remove_option(n)
 
@@ -431,7 +434,7 @@ class Blockade(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_CARD,
             partial(game_instance.may_discard_callback, Side.US,
                     did_not_discard_fn=partial(game_instance.map['West_Germany'].remove_influence, Side.US)),
@@ -504,7 +507,7 @@ class COMECON(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.USSR),
@@ -543,41 +546,41 @@ class Warsaw_Pact_Formed(Card):
     event_text = 'Remove all US Influence from four countries in Eastern Europe, or add 5 USSR Influence in Eastern Europe, adding no more than 2 per country. Allow play of NATO.'
     event_unique = True
 
-    def use_event(self, game_instance, side: Side):
-        def remove():
-            game_instance.input_state = Input(
-                Side.USSR, InputType.SELECT_COUNTRY,
-                partial(game_instance.event_influence_callback,
-                        Country.remove_influence, Side.US),
-                (n for n in CountryInfo.REGION_ALL[MapRegion.EASTERN_EUROPE]
-                    if game_instance.map[n].has_us_influence),
-                prompt='Warsaw Pact Formed: Remove all US influence from 4 countries in Eastern Europe.',
-                reps=4,
-                reps_unit='influence',
-                max_per_option=1
-            )
+    def remove(self, game_instance):
+        game_instance.request_input(
+            Side.USSR, InputType.SELECT_COUNTRY,
+            partial(game_instance.event_influence_callback,
+                    Country.remove_influence, Side.US),
+            (n for n in CountryInfo.REGION_ALL[MapRegion.EASTERN_EUROPE]
+                if game_instance.map[n].has_us_influence),
+            prompt='Warsaw Pact Formed: Remove all US influence from 4 countries in Eastern Europe.',
+            reps=4,
+            reps_unit='influence',
+            max_per_option=1
+        )
 
-        def add():
-            game_instance.input_state = Input(
-                Side.USSR, InputType.SELECT_COUNTRY,
-                partial(game_instance.event_influence_callback,
-                        Country.increment_influence, Side.USSR),
-                CountryInfo.REGION_ALL[MapRegion.EASTERN_EUROPE],
-                prompt='Warsaw Pact Formed: Add 5 USSR Influence to any countries in Eastern Europe.',
-                reps=5,
-                reps_unit='influence',
-                max_per_option=2
-            )
+    def add(self, game_instance):
+        game_instance.request_input(
+            Side.USSR, InputType.SELECT_COUNTRY,
+            partial(game_instance.event_influence_callback,
+                    Country.increment_influence, Side.USSR),
+            CountryInfo.REGION_ALL[MapRegion.EASTERN_EUROPE],
+            prompt='Warsaw Pact Formed: Add 5 USSR Influence to any countries in Eastern Europe.',
+            reps=5,
+            reps_unit='influence',
+            max_per_option=2
+        )
 
+    def use_event(self, game_instance, side: Side):
         self.event_occurred = True
         game_instance.basket[Side.US].append('Warsaw_Pact_Formed')
         option_function_mapping = {
-            'Remove all US influence from 4 countries in Eastern Europe': remove,
-            'Add 5 USSR Influence to any countries in Eastern Europe': add
+            'Remove all US influence from 4 countries in Eastern Europe': partial(self.remove, game_instance),
+            'Add 5 USSR Influence to any countries in Eastern Europe': partial(self.add, game_instance)
         }
 
         if len([n for n in CountryInfo.REGION_ALL[MapRegion.EASTERN_EUROPE] if game_instance.map[n].has_us_influence]):
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.USSR, InputType.SELECT_MULTIPLE,
                 partial(game_instance.select_multiple_callback,
                         option_function_mapping),
@@ -585,7 +588,7 @@ class Warsaw_Pact_Formed(Card):
                 prompt='Warsaw Pact: Choose between two options.'
             )
         else:
-            add()
+            self.add(game_instance)
 
 
 class De_Gaulle_Leads_France(Card):
@@ -631,7 +634,7 @@ class Truman_Doctrine(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.remove_influence, Side.USSR),
@@ -651,39 +654,38 @@ class Olympic_Games(Card):
     owner = Side.NEUTRAL
     event_text = 'Player sponsors Olympics. Opponent may participate or boycott. If Opponent participates, each player rolls one die, with the sponsor adding 2 to his roll. High roll gains 2 VP. Reroll ties If Opponent boycotts, degrade DEFCON one level and the Sponsor may Conduct Operations as if they played a 4 Ops card.'
 
-    def use_event(self, game_instance, side: Side):
-        def participate(side_opp):
-            # NOTE: the _participate inner function receives the opposite side from the main card function
-            def participate_dice_callback(num: tuple):
-                game_instance.input_state.reps -= 1
-                outcome = 'Success' if num[0] > num[1] else 'Failure'
-                if outcome:
-                    # side_opp is the sponsor
-                    game_instance.change_vp(2 * side_opp.vp_mult)
-                else:
-                    game_instance.change_vp(2 * side_opp.opp.vp_mult)
-                print(
-                    f'{outcome} with (Sponsor, Participant) rolls of ({num[0]}, {num[1]}).')
+    def participate_dice_callback(self, game_instance, sponsor: Side, num: tuple):
+        outcome = 'Success' if num[0] > num[1] else 'Failure'
+        if outcome:
+            game_instance.change_vp(2 * sponsor.vp_mult)
+        else:
+            game_instance.change_vp(2 * sponsor.opp.vp_mult)
+        game_instance.sink.emit(
+            '{} with (Sponsor, Participant) rolls of ({}, {}).', outcome, num[0], num[1])
 
-                return True
+        return True
 
-            game_instance.stage_list.append(
-                partial(game_instance.dice_stage, participate_dice_callback, two_dice=True, reroll_ties=True))
-            return True
+    def participate(self, game_instance, sponsor: Side):
+        game_instance.stage_list.append(
+            partial(game_instance.dice_stage,
+                    partial(self.participate_dice_callback, game_instance, sponsor),
+                    two_dice=True, reroll_ties=True))
+        return True
 
-        def boycott(side):
-            game_instance.change_defcon(-1)
-            game_instance.select_action(
-                side, f'Blank_4_Op_Card', is_event_resolved=True)
+    def boycott(self, game_instance, sponsor: Side):
+        game_instance.change_defcon(-1)
+        game_instance.select_action(
+            sponsor, f'Blank_4_Op_Card', is_event_resolved=True)
 
+    def use_event(self, game_instance, side: Side):
         self.event_occurred = True
 
         option_function_mapping = {
-            'Participate and sponsor has modified die roll (+2).': partial(participate, side),
-            'Boycott: DEFCON level degrades by 1 and sponsor may conduct operations as if they played a 4 op card.': partial(boycott, side)
+            'Participate and sponsor has modified die roll (+2).': partial(self.participate, game_instance, side),
+            'Boycott: DEFCON level degrades by 1 and sponsor may conduct operations as if they played a 4 op card.': partial(self.boycott, game_instance, side)
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side.opp, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -726,7 +728,7 @@ class Independent_Reds(Card):
         self.event_occurred = True
         ireds = ['Yugoslavia', 'Romania',
                  'Bulgaria', 'Hungary', 'Czechoslovakia']
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.match_influence, Side.US),
@@ -748,7 +750,7 @@ class Marshall_Plan(Card):
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
         game_instance.basket[Side.US].append('Marshall_Plan')
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.US),
@@ -772,7 +774,7 @@ class Indo_Pakistani_War(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side, InputType.SELECT_COUNTRY,
             partial(game_instance.war_country_callback, side),
             ['India', 'Pakistan'],
@@ -808,7 +810,7 @@ class CIA_Created(Card):
     event_unique = True
 
     def use_event(self, game_instance, side: Side):
-        print(f'USSR player reveals: {game_instance.hand[Side.USSR]}')
+        game_instance.sink.emit('USSR player reveals: {}', game_instance.hand[Side.USSR])
         game_instance.players[Side.US].update_opp_hand(
             game_instance.hand[Side.USSR])
         self.event_occurred = True
@@ -847,7 +849,7 @@ class Suez_Crisis(Card):
         self.event_occurred = True
         suez = ['France', 'UK', 'Israel']
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.decrement_influence, Side.US),
@@ -872,7 +874,7 @@ class East_European_Unrest(Card):
         self.event_occurred = True
         dec = 2 if 8 <= game_instance.turn_track <= 10 else 1
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback, partial(
                 Country.decrement_influence, amt=dec), Side.USSR),
@@ -896,7 +898,7 @@ class Decolonization(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.USSR),
@@ -945,7 +947,7 @@ class UN_Intervention(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side, InputType.SELECT_CARD,
             partial(self.callback, game_instance, side),
             (n for n in game_instance.hand[side]
@@ -964,35 +966,35 @@ class De_Stalinization(Card):
     event_text = 'USSR may relocate up to 4 Influence points to non-US controlled countries. No more than 2 Influence may be placed in the same country.'
     event_unique = True
 
-    def use_event(self, game_instance, side: Side):
-        def remove_callback(country_name):
-            if country_name != game_instance.input_state.option_stop_early:
-                game_instance.event_influence_callback(
-                    Country.decrement_influence, Side.USSR, country_name)
-                if game_instance.input_state.reps:
-                    # TODO make a better prompt
-                    game_instance.input_state.option_stop_early = f'Move {4 - game_instance.input_state.reps} influence.'
-                    return True
+    def remove_callback(self, game_instance, country_name):
+        if country_name != game_instance.input_state.option_stop_early:
+            game_instance.event_influence_callback(
+                Country.decrement_influence, Side.USSR, country_name)
+            if game_instance.input_state.reps:
+                # TODO make a better prompt
+                game_instance.input_state.option_stop_early = f'Move {4 - game_instance.input_state.reps} influence.'
+                return True
 
-            ops = 4 - game_instance.input_state.reps
-            # if we get here, either out of reps or optional prompt
-            game_instance.input_state = Input(
-                Side.USSR, InputType.SELECT_COUNTRY,
-                partial(game_instance.event_influence_callback,
-                        Country.increment_influence, Side.USSR),
-                (n for n in CountryInfo.ALL
-                    if game_instance.map[n].control != Side.US and not game_instance.map[n].info.superpower),
-                prompt=f'Add {ops} influence using De-Stalinization.',
-                reps=ops,
-                reps_unit='influence',
-                max_per_option=2
-            )
-            return True
+        ops = 4 - game_instance.input_state.reps
+        # if we get here, either out of reps or optional prompt
+        game_instance.request_input(
+            Side.USSR, InputType.SELECT_COUNTRY,
+            partial(game_instance.event_influence_callback,
+                    Country.increment_influence, Side.USSR),
+            (n for n in CountryInfo.ALL
+                if game_instance.map[n].control != Side.US and not game_instance.map[n].info.superpower),
+            prompt=f'Add {ops} influence using De-Stalinization.',
+            reps=ops,
+            reps_unit='influence',
+            max_per_option=2
+        )
+        return True
 
+    def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
-            remove_callback,
+            partial(self.remove_callback, game_instance),
             (n for n in CountryInfo.ALL
                 if game_instance.map[n].has_ussr_influence and not game_instance.map[n].info.superpower),
             prompt='Remove up to 4 influence using De-Stalinization.',
@@ -1077,11 +1079,13 @@ class The_Cambridge_Five(Card):
             countries = [CountryInfo.REGION_ALL[k] for k in [
                 Card.ALL[n].scoring_region for n in us_scoring_cards]]
 
-            print(f'US player reveals: {us_scoring_cards}')
-            game_instance.players[Side.USSR].update_opp_hand(us_scoring_cards)
+            game_instance.sink.emit('US player reveals: {}', us_scoring_cards)
+            game_instance.players[Side.USSR].update_opp_hand(
+                us_scoring_cards,
+                among=[n for n, c in Card.ALL.items() if c.card_type == 'Scoring'])
 
             self.event_occurred = True
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.USSR, InputType.SELECT_COUNTRY,
                 partial(game_instance.event_influence_callback,
                         Country.increment_influence, Side.US),
@@ -1114,7 +1118,7 @@ class Special_Relationship(Card):
                 available_list = game_instance.map['UK'].info.adjacent_countries
                 incr = 1
 
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.US, InputType.SELECT_COUNTRY,
                 partial(game_instance.event_influence_callback, partial(
                     Country.increment_influence, amt=incr), Side.US),
@@ -1135,7 +1139,7 @@ class NORAD(Card):
     event_unique = True
 
     def place_norad_influence(self, game_instance):
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.US),
@@ -1166,13 +1170,13 @@ class Brush_War(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        nato_mask = game_instance.map.nato_mask(game_instance)
+        game_instance.request_input(
             side, InputType.SELECT_COUNTRY,
             partial(game_instance.war_country_callback, side,
                     lower=3, win_vp=1, win_milops=3),
-            (n for n in game_instance.map.ALL
-                if game_instance.map[n].info.stability <= 2
-                and n not in game_instance.calculate_nato_countries()),
+            (n for n, info in CountryInfo.ALL.items()
+                if info.stability <= 2 and not nato_mask[info.country_index]),
             prompt='Brush War: Choose a target country.'
         )
 
@@ -1211,7 +1215,7 @@ class Southeast_Asia_Scoring(Card):
             vps[Side.US] * Side.US.vp_mult
 
         swing += game_instance.map['Thailand'].control.vp_mult
-        print(f'Southeast Asia scores for {swing} VP')
+        game_instance.sink.emit('Southeast Asia scores for {} VP', swing)
         game_instance.change_vp(swing)
 
 
@@ -1243,6 +1247,15 @@ class Cuban_Missile_Crisis(Card):
     event_text = 'Set DEFCON to Level 2. Any further Coup attempt by your opponent this turn, anywhere on the board, will result in Global Thermonuclear War. Your opponent will lose the game. This event may be cancelled at any time if the USSR player removes two Influence from Cuba or the US player removes 2 Influence from either West Germany or Turkey.'
     event_unique = True
 
+    def cuban_callback(self, game_instance, side: Side, opt: str):
+        if opt != game_instance.input_state.option_stop_early:
+            game_instance.event_influence_callback(
+                partial(Country.decrement_influence, amt=2), side, opt)
+            game_instance.basket[side.opp].remove('Cuban_Missile_Crisis')
+        else:
+            game_instance.input_state.reps -= 1
+        return True
+
     def cuban_missile_remove(self, game_instance, side: Side):
         '''
         Gives an opportunity to the couping player to remove 2 influence from
@@ -1265,18 +1278,9 @@ class Cuban_Missile_Crisis(Card):
         if len(options) == 0:
             return False
 
-        def cuban_callback(self, opt: str):
-            if opt != game_instance.input_state.option_stop_early:
-                game_instance.event_influence_callback(
-                    partial(Country.decrement_influence, amt=2), side, opt)
-                game_instance.basket[side.opp].remove('Cuban_Missile_Crisis')
-            else:
-                game_instance.input_state.reps -= 1
-            return True
-
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
-            partial(cuban_callback, game_instance),
+            partial(self.cuban_callback, game_instance, side),
             options,
             prompt='Cuban Missile Crisis: Remove 2 influence to de-escalate.',
             reps_unit='influence',
@@ -1352,7 +1356,7 @@ class Salt_Negotiations(Card):
 
         can_stop_now = 'Do not take a card.'
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side, InputType.SELECT_CARD,
             partial(self.callback, game_instance, side, can_stop_now),
             (n for n in game_instance.discard_pile if game_instance.cards[n].info.ops >= 1),
@@ -1385,16 +1389,19 @@ class Summit(Card):
     owner = Side.NEUTRAL
     event_text = 'Both players roll a die.  Each adds 1 for each Region they Dominate or Control. High roller gains 2 VP and may move DEFCON marker one level in either direction. Do not reroll ties.'
 
+    def no_change(self):
+        pass
+
     def choices(self, game_instance, side: Side):
         game_instance.change_vp(2*side.vp_mult)
 
         option_function_mapping = {
             'DEFCON -1': partial(game_instance.change_defcon, -1),
-            'No change': partial(lambda: None),
+            'No change': self.no_change,
             'DEFCON +1': partial(game_instance.change_defcon, 1),
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -1403,7 +1410,6 @@ class Summit(Card):
         )
 
     def dice_callback(self, game_instance, ussr_advantage: int, num: tuple):
-        game_instance.input_state.reps -= 1
         outcome = 'USSR success' if num[Side.USSR] + \
             ussr_advantage > num[Side.US] else 'US success'
 
@@ -1411,8 +1417,9 @@ class Summit(Card):
             self.choices(game_instance, Side.USSR)
         else:
             self.choices(game_instance, Side.US)
-        print(
-            f'{outcome} with (USSR, US) rolls of ({num[Side.USSR]}, {num[Side.US]}). ussr_advantage is {ussr_advantage}.')
+        game_instance.sink.emit(
+            '{} with (USSR, US) rolls of ({}, {}). ussr_advantage is {}.',
+            outcome, num[Side.USSR], num[Side.US], ussr_advantage)
         return True
 
     def use_event(self, game_instance, side: Side):
@@ -1464,7 +1471,7 @@ class How_I_Learned_to_Stop_Worrying(Card):
             f'DEFCON 5': partial(game_instance.change_defcon, 5 - game_instance.defcon_track)
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -1485,20 +1492,16 @@ class Junta(Card):
     event_text = 'Place 2 Influence in any one Central or South American country. Then you may make a free Coup attempt or Realignment roll in one of these regions (using this card\'s Operations Value).'
 
     def stage_2(self, game_instance, side, ca_sa):
-        def coup(game_instance, side, ca_sa):
-            game_instance.card_operation_coup(
-                side, 'Junta', restricted_list=ca_sa, free=True)
-
-        def realignment(game_instance, side, ca_sa):
-            game_instance.card_operation_realignment(
-                side, 'Junta', restricted_list=ca_sa, free=True)
-
         option_function_mapping = {
-            'Free coup attempt': partial(coup, game_instance, side, ca_sa),
-            'Free realignment rolls': partial(realignment, game_instance, side, ca_sa)
+            'Free coup attempt': partial(
+                game_instance.card_operation_coup, side, 'Junta',
+                restricted_list=ca_sa, free=True),
+            'Free realignment rolls': partial(
+                game_instance.card_operation_realignment, side, 'Junta',
+                restricted_list=ca_sa, free=True)
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side.opp, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -1511,7 +1514,7 @@ class Junta(Card):
         ca_sa = list(CountryInfo.REGION_ALL[MapRegion.CENTRAL_AMERICA]) + list(
             CountryInfo.REGION_ALL[MapRegion.SOUTH_AMERICA])
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     partial(Country.increment_influence, amt=2), side),
@@ -1544,7 +1547,7 @@ class Kitchen_Debates(Card):
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
         if self.can_event(game_instance, Side.US):
-            print('USSR poked in the chest by US player!')
+            game_instance.sink.emit('USSR poked in the chest by US player!')
             game_instance.change_vp(-2)
 
 
@@ -1565,6 +1568,8 @@ class Missile_Envy(Card):
         if self.exchange:
             game.hand[side].remove(self.name)
             game.hand[side.opp].append(self.name)
+            game.players[side].update_opp_hand([self.name], among=())
+            game.players[side.opp].update_opp_removed([self.name])
             self.exchange = False
         else:
             game.basket[side].remove(self.name)
@@ -1577,6 +1582,8 @@ class Missile_Envy(Card):
         game.input_state.reps -= 1
         game.hand[side.opp].remove(card)
         game.hand[side].append(card)
+        game.players[side.opp].update_opp_hand([card], among=())
+        game.players[side].update_opp_removed([card])
 
         self.exchange = True
 
@@ -1585,7 +1592,7 @@ class Missile_Envy(Card):
             options = [CardAction.INFLUENCE, CardAction.COUP,
                        CardAction.REALIGNMENT, CardAction.SPACE]
 
-            self.input_state = Input(
+            game.request_input(
                 side, InputType.SELECT_CARD_ACTION,
                 partial(game.action_callback, side, card,
                         no_event=True),
@@ -1598,6 +1605,7 @@ class Missile_Envy(Card):
             game.stage_list.append(
                 partial(game.cards[card].dispose, game, side))
             game.stage_list.append(partial(game.trigger_event, side, card))
+        return True
 
     def use_event(self, game, side: Side):
         self.event_occurred = True
@@ -1616,7 +1624,7 @@ class Missile_Envy(Card):
             elif curr_ops == best_ops:
                 best_cards.append(card_name)
 
-        game.input_state = Input(
+        game.request_input(
             side.opp, InputType.SELECT_CARD,
             partial(self.missile_envy_exchange_callback, game, side),
             best_cards,
@@ -1683,33 +1691,27 @@ class South_African_Unrest(Card):
     owner = Side.USSR
     event_text = 'USSR either adds 2 Influence in South Africa or adds 1 Influence in South Africa and 2 Influence in any countries adjacent to South Africa.'
 
-    def use_event(self, game_instance, side: Side):
-        def _sa():
-            game_instance.map.change_influence('South_Africa', Side.USSR, 2)
-
-        def _sa_angola():
-            game_instance.map.change_influence('South_Africa', Side.USSR, 1)
-            game_instance.map.change_influence('Angola', Side.USSR, 2)
-
-        def _sa_botswana():
-            game_instance.map.change_influence('South_Africa', Side.USSR, 1)
-            game_instance.map.change_influence('Botswana', Side.USSR, 2)
-
-        def _sa_angola_botswana():
-            game_instance.map.change_influence('South_Africa', Side.USSR, 1)
-            game_instance.map.change_influence('Angola', Side.USSR, 1)
-            game_instance.map.change_influence('Botswana', Side.USSR, 1)
+    def add_influence(self, game_instance, placements: tuple):
+        '''Adds USSR influence to each country of placements, as (name, amount) pairs.'''
+        for name, amount in placements:
+            game_instance.map.change_influence(name, Side.USSR, amount)
 
+    def use_event(self, game_instance, side: Side):
         self.event_occurred = True
 
         option_function_mapping = {
-            'Add 2 Influence to South Africa.': _sa,
-            'Add 1 Influence to South Africa and 2 Influence to Angola.': _sa_angola,
-            'Add 1 Influence to South Africa and 2 Influence to Botswana.': _sa_botswana,
-            'Add 1 Influence each to South Africa, Angola, and Botswana.': _sa_angola_botswana
+            'Add 2 Influence to South Africa.': partial(
+                self.add_influence, game_instance, (('South_Africa', 2),)),
+            'Add 1 Influence to South Africa and 2 Influence to Angola.': partial(
+                self.add_influence, game_instance, (('South_Africa', 1), ('Angola', 2))),
+            'Add 1 Influence to South Africa and 2 Influence to Botswana.': partial(
+                self.add_influence, game_instance, (('South_Africa', 1), ('Botswana', 2))),
+            'Add 1 Influence each to South Africa, Angola, and Botswana.': partial(
+                self.add_influence, game_instance,
+                (('South_Africa', 1), ('Angola', 1), ('Botswana', 1)))
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -1771,7 +1773,7 @@ class Muslim_Revolution(Card):
             self.event_occurred = True
             mr = ['Sudan', 'Iran', 'Iraq', 'Egypt',
                   'Libya', 'Saudi_Arabia', 'Syria', 'Jordan']
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.USSR, InputType.SELECT_COUNTRY,
                 partial(game_instance.event_influence_callback,
                         Country.remove_influence, Side.US),
@@ -1887,7 +1889,7 @@ class Lone_Gunman(Card):
     event_unique = True
 
     def use_event(self, game_instance, side: Side):
-        print(f'US player reveals: {game_instance.hand[Side.US]}')
+        game_instance.sink.emit('US player reveals: {}', game_instance.hand[Side.US])
         game_instance.players[Side.USSR].update_opp_hand(
             game_instance.hand[Side.US])
         self.event_occurred = True
@@ -1906,7 +1908,7 @@ class Colonial_Rear_Guards(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.US),
@@ -1967,7 +1969,7 @@ class Puppet_Governments(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.US),
@@ -2015,7 +2017,7 @@ class Grain_Sales_to_Soviets(Card):
             option_function_mapping['Use card with UN Intervention'] = partial(
                 self.use_un_intervention, game_instance, card_name)
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -2025,21 +2027,24 @@ class Grain_Sales_to_Soviets(Card):
 
     def random_card_callback(self, game_instance, card_name: str):
         game_instance.input_state.reps -= 1
-        print(f'{card_name} was selected by Grain Sales to Soviets.')
+        game_instance.sink.emit('{} was selected by Grain Sales to Soviets.', card_name)
         game_instance.hand[Side.USSR].remove(card_name)
         game_instance.hand[Side.US].append(card_name)
+        game_instance.players[Side.USSR].update_opp_hand([card_name], among=())
+        game_instance.players[Side.US].update_opp_removed([card_name])
         game_instance.stage_list.append(
             partial(self.action_stage, game_instance, card_name))
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.NEUTRAL, InputType.SELECT_CARD,
             partial(self.random_card_callback, game_instance),
             (n for n in game_instance.hand[Side.USSR]
              if n != 'Grain_Sales_to_Soviets'),
-            prompt='Grain Sales to Soviets: US player randomly selects a card from USSR player\'s hand.'
+            prompt='Grain Sales to Soviets: US player randomly selects a card from USSR player\'s hand.',
+            rng_stream='discard'
         )
 
 
@@ -2087,7 +2092,7 @@ class OAS_Founded(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.US),
@@ -2151,6 +2156,7 @@ class Shuttle_Diplomacy(Card):
     def dispose(self, game, side):
         game.limbo.append(self.name)
         game.hand[side].remove(self.name)
+        game.players[side.opp].update_opp_removed([self.name])
 
 
 class The_Voice_Of_America(Card):
@@ -2164,7 +2170,7 @@ class The_Voice_Of_America(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.decrement_influence, Side.USSR),
@@ -2189,7 +2195,7 @@ class Liberation_Theology(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.USSR),
@@ -2217,7 +2223,7 @@ class Ussuri_River_Skirmish(Card):
             game_instance.cards['The_China_Card'].move_china_card(
                 game_instance, Side.USSR, made_playable=True)
         elif 'The_China_Card' in game_instance.hand[Side.US]:
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.US, InputType.SELECT_COUNTRY,
                 partial(game_instance.event_influence_callback,
                         Country.increment_influence, Side.US),
@@ -2244,6 +2250,7 @@ class Ask_Not_What_Your_Country_Can_Do_For_You(Card):
         if card_name != option_stop_early:
             game_instance.hand[Side.US].remove(card_name)
             game_instance.discard_pile.append(card_name)
+            game_instance.players[Side.USSR].update_opp_removed([card_name])
         else:
             game_instance.input_state.reps = 0
         return True
@@ -2254,7 +2261,7 @@ class Ask_Not_What_Your_Country_Can_Do_For_You(Card):
         reps_modifier = 1 if 'The_China_Card' in game_instance.hand[Side.US] else 0
         reps = len(game_instance.hand[Side.US]) - reps_modifier
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_CARD,
             partial(self.callback, game_instance, option_stop_early),
             (n for n in game_instance.hand[Side.US] if n != 'The_China_Card'),
@@ -2369,7 +2376,7 @@ class Our_Man_In_Tehran(Card):
         game_instance.draw_pile.extend(game_instance.hand[Side.NEUTRAL])
         game_instance.players[Side.US].update_draw_pile(
             game_instance.hand[Side.NEUTRAL])
-        game_instance.hand[Side.NEUTRAL] = []
+        game_instance.hand[Side.NEUTRAL].clear()
         return True
 
     def callback(self, game_instance, opt: str):
@@ -2384,7 +2391,7 @@ class Our_Man_In_Tehran(Card):
             self.event_occurred = True
             game_instance.deal(first_side=Side.NEUTRAL)
 
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 Side.US, InputType.SELECT_CARD,
                 partial(self.callback, game_instance),
                 (n for n in game_instance.hand[Side.NEUTRAL]),
@@ -2470,7 +2477,7 @@ class Star_Wars(Card):
     def use_event(self, game_instance, side: Side):
         if self.can_event(game_instance, Side.US):
             self.event_occurred = True
-            game_instance.input_state = Input(
+            game_instance.request_input(
                 side, InputType.SELECT_CARD,
                 partial(self.callback, game_instance, side),
                 (n for n in game_instance.discard_pile if game_instance.cards[n].info.card_type != 'Scoring'),
@@ -2506,7 +2513,7 @@ class The_Reformer(Card):
 
     def use_event(self, game_instance, side: Side):
         reps = 6 if game_instance.vp_track > 0 else 4
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.increment_influence, Side.USSR),
@@ -2532,7 +2539,7 @@ class Marine_Barracks_Bombing(Card):
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
         game_instance.map.set_influence('Lebanon', Side.US, 0)
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.decrement_influence, Side.US),
@@ -2612,6 +2619,7 @@ class Terrorism(Card):
         game_instance.input_state.reps -= 1
         game_instance.hand[side.opp].remove(card_name)
         game_instance.discard_pile.append(card_name)
+        game_instance.players[side].update_opp_removed([card_name])
         return True
 
     def use_event(self, game_instance, side: Side):
@@ -2621,14 +2629,15 @@ class Terrorism(Card):
         reps = len(game_instance.hand[side.opp]) if len(
             game_instance.hand[side.opp]) <= reps else reps
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.NEUTRAL, InputType.SELECT_CARD,
             self.callback,
             game_instance.hand[side.opp],
             prompt='Randomly discard a card.',
             reps=reps,
             reps_unit='cards to discard',
-            max_per_option=1
+            max_per_option=1,
+            rng_stream='discard'
         )
 
 
@@ -2659,22 +2668,22 @@ class Chernobyl(Card):
     event_text = 'The US player may designate one Region. For the remainder of the turn the USSR may not add additional Influence to that Region by the play of Operations Points via placing Influence.'
     event_unique = True
 
-    def use_event(self, game_instance, side: Side):
-        def add_chernobyl(effect_name: str):
-            game_instance.basket[Side.US].append('effect_name')
-            game_instance.end_turn_stage_list.append(
-                lambda: game_instance.basket[Side.US].remove(effect_name))
+    def add_chernobyl(self, game_instance, effect_name: str):
+        game_instance.basket[Side.US].append(effect_name)
+        game_instance.end_turn_stage_list.append(
+            partial(game_instance.basket[Side.US].remove, effect_name))
 
+    def use_event(self, game_instance, side: Side):
         option_function_mapping = {
-            'Europe': partial(add_chernobyl, 'Chernobyl_Europe'),
-            'Middle East': partial(add_chernobyl, 'Chernobyl_Middle_East'),
-            'Asia': partial(add_chernobyl, 'Chernobyl_Asia'),
-            'Africa': partial(add_chernobyl, 'Chernobyl_Africa'),
-            'Central America': partial(add_chernobyl, 'Chernobyl_Central_America'),
-            'South America': partial(add_chernobyl, 'Chernobyl_South_America'),
+            'Europe': partial(self.add_chernobyl, game_instance, 'Chernobyl_Europe'),
+            'Middle East': partial(self.add_chernobyl, game_instance, 'Chernobyl_Middle_East'),
+            'Asia': partial(self.add_chernobyl, game_instance, 'Chernobyl_Asia'),
+            'Africa': partial(self.add_chernobyl, game_instance, 'Chernobyl_Africa'),
+            'Central America': partial(self.add_chernobyl, game_instance, 'Chernobyl_Central_America'),
+            'South America': partial(self.add_chernobyl, game_instance, 'Chernobyl_South_America'),
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side.opp, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -2693,31 +2702,34 @@ class Latin_American_Debt_Crisis(Card):
     event_text = 'Unless the US Player immediately discards a \'3\' or greater Operations card, double USSR Influence in two countries in South America.'
     event_unique = True
 
-    def use_event(self, game_instance, side: Side):
-        def double_inf_ussr_callback(country_name: str) -> bool:
-            if game_instance.map[country_name].get_ussr_influence == 0:
-                return False
-            game_instance.map[country_name].influence[Side.USSR] *= 2
-            return True
+    def double_inf_ussr_callback(self, game_instance, country_name: str) -> bool:
+        country = game_instance.map[country_name]
+        if country.influence[Side.USSR] == 0:
+            return False
+        country.increment_influence(Side.USSR, country.influence[Side.USSR])
+        return True
 
-        def did_not_discard_fn():
-            game_instance.input_state = Input(
-                Side.USSR, InputType.SELECT_COUNTRY,
-                double_inf_ussr_callback,
-                (n for n in CountryInfo.REGION_ALL[MapRegion.SOUTH_AMERICA]
-                    if game_instance.map[n].has_ussr_influence),
-                prompt='Select countries to double USSR influence.',
-                reps=2,
-                reps_unit='countries',
-                max_per_option=1
-            )
+    def did_not_discard_fn(self, game_instance):
+        game_instance.request_input(
+            Side.USSR, InputType.SELECT_COUNTRY,
+            partial(self.double_inf_ussr_callback, game_instance),
+            (n for n in CountryInfo.REGION_ALL[MapRegion.SOUTH_AMERICA]
+                if game_instance.map[n].has_ussr_influence),
+            prompt='Select countries to double USSR influence.',
+            reps=2,
+            reps_unit='countries',
+            max_per_option=1
+        )
 
+    def use_event(self, game_instance, side: Side):
         self.event_occurred = True
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.US, InputType.SELECT_CARD,
             partial(game_instance.may_discard_callback, Side.US,
-                    did_not_discard_fn=partial(game_instance.stage_list.append, did_not_discard_fn)),
+                    did_not_discard_fn=partial(
+                        game_instance.stage_list.append,
+                        partial(self.did_not_discard_fn, game_instance))),
             (n for n in game_instance.hand[Side.US]
                 if n != 'The_China_Card'
                 and game_instance.get_global_effective_ops(side, game_instance.cards[n].info.ops) >= 3),
@@ -2743,20 +2755,17 @@ class Tear_Down_This_Wall(Card):
         game_instance.change_vp(1)
         game_instance.map['East_Germany'].change_influence(0, 3)
 
-        def coup(game_instance, side):
-            game_instance.card_operation_coup(side, 'Tear_Down_This_Wall', restricted_list=list(
-                CountryInfo.REGION_ALL[MapRegion.EUROPE]), free=True)
-
-        def realignment(game_instance, side):
-            game_instance.card_operation_realignment(side, 'Tear_Down_This_Wall', restricted_list=list(
-                CountryInfo.REGION_ALL[MapRegion.EUROPE]), free=True)
-
+        europe = list(CountryInfo.REGION_ALL[MapRegion.EUROPE])
         option_function_mapping = {
-            'Free coup attempt': partial(coup, game_instance, side),
-            'Free realignment rolls': partial(realignment, game_instance, side)
+            'Free coup attempt': partial(
+                game_instance.card_operation_coup, side, 'Tear_Down_This_Wall',
+                restricted_list=europe, free=True),
+            'Free realignment rolls': partial(
+                game_instance.card_operation_realignment, side, 'Tear_Down_This_Wall',
+                restricted_list=europe, free=True)
         }
 
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side.opp, InputType.SELECT_MULTIPLE,
             partial(game_instance.select_multiple_callback,
                     option_function_mapping),
@@ -2796,7 +2805,7 @@ class Aldrich_Ames_Remix(Card):
     def use_event(self, game_instance, side: Side):
         game_instance.players[Side.USSR].update_opp_hand(
             game_instance.hand[Side.US])
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_CARD,
             partial(game_instance.may_discard_callback, Side.US),
             (n for n in game_instance.hand[Side.US]
@@ -2818,7 +2827,7 @@ class Pershing_II_Deployed(Card):
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
         game_instance.change_vp(1)
-        game_instance.input_state = Input(
+        game_instance.request_input(
             Side.USSR, InputType.SELECT_COUNTRY,
             partial(game_instance.event_influence_callback,
                     Country.decrement_influence, Side.US),
@@ -2883,7 +2892,7 @@ class Iran_Iraq_War(Card):
 
     def use_event(self, game_instance, side: Side):
         self.event_occurred = True
-        game_instance.input_state = Input(
+        game_instance.request_input(
             side, InputType.SELECT_COUNTRY,
             partial(game_instance.war_country_callback, side),
             ['Iran', 'Iraq'],
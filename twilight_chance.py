@@ -0,0 +1,358 @@
+'''
+Exact outcome distributions of coups and realignments, and a one-ply
+expectimax over the targets of a coup or realignment prompt.
+
+A coup rolls one die and a realignment two, so both outcomes follow in closed
+form from the board. They are computed for every row of the board at once,
+with the modifiers GameMap.coup and GameMap.realignment apply.
+
+Their success probabilities and expected influence changes only depend on a
+few small integers, and are also tabulated at import, for lookups without
+the dice: see coup_expectation and realignment_expectation.
+'''
+
+import numpy as np
+
+from game_mechanics import Game
+from twilight_enums import Side, MapRegion
+from twilight_map import CountryInfo
+
+
+# faces of a die, and the differences of two dice from -5 to 5
+DIE = np.arange(1, 7)
+DIE_PROBS = np.full(6, 1 / 6)
+TWO_DICE = np.arange(-5, 6)
+TWO_DICE_PROBS = (6 - np.abs(TWO_DICE)) / 36
+
+LATIN_AMERICA = (CountryInfo.REGION[MapRegion.CENTRAL_AMERICA]
+                 | CountryInfo.REGION[MapRegion.SOUTH_AMERICA])
+
+# table bounds: coup operations from 0 to 6, which covers 4 operations with
+# the China Card and Vietnam Revolts bonuses, stabilities from 0 to 5, and
+# modifiers from -2 to 2 for coups and from -8 to 8 for realignments. Influence
+# is clipped where it no longer changes the outcome, at the largest difference.
+COUP_OPS = 7
+COUP_STABILITY = 6
+COUP_MODIFIER = 2
+COUP_INFLUENCE = 6 + (COUP_OPS - 1) + COUP_MODIFIER - 2
+REALIGNMENT_MODIFIER = 8
+REALIGNMENT_INFLUENCE = 5 + REALIGNMENT_MODIFIER
+
+
+def _coup_tables():
+    ops = np.arange(COUP_OPS)[:, None, None, None]
+    stability = np.arange(COUP_STABILITY)[:, None, None]
+    modifier = np.arange(-COUP_MODIFIER, COUP_MODIFIER + 1)[:, None]
+    difference = DIE + ops + modifier - 2 * stability
+    swing = np.maximum(difference, 0)[..., None, :]
+    opp = np.arange(COUP_INFLUENCE + 1)[:, None]
+    removed = np.minimum(swing, opp) @ DIE_PROBS
+    return (difference > 0) @ DIE_PROBS, removed, (swing @ DIE_PROBS) - removed
+
+
+def _realignment_tables():
+    difference = (TWO_DICE
+                  + np.arange(-REALIGNMENT_MODIFIER, REALIGNMENT_MODIFIER + 1)[:, None])
+    influence = np.arange(REALIGNMENT_INFLUENCE + 1)[:, None]
+    us_loss = np.minimum(np.maximum(difference, 0)[:, None, :], influence)
+    ussr_loss = np.minimum(np.maximum(-difference, 0)[:, None, :], influence)
+    return ((difference > 0) @ TWO_DICE_PROBS, (difference < 0) @ TWO_DICE_PROBS,
+            ussr_loss @ TWO_DICE_PROBS, us_loss @ TWO_DICE_PROBS)
+
+
+# COUP_SUCCESS[ops, stability, modifier + COUP_MODIFIER] is the probability a
+# coup changes influence, and COUP_REMOVED and COUP_ADDED, indexed further by
+# the opposing influence, the expected opposing influence removed and own
+# influence added
+COUP_SUCCESS, COUP_REMOVED, COUP_ADDED = _coup_tables()
+
+# REALIGNMENT_USSR_WINS[modifier + REALIGNMENT_MODIFIER] and
+# REALIGNMENT_US_WINS are the probabilities a realignment removes US and USSR
+# influence, and REALIGNMENT_USSR_LOSS and REALIGNMENT_US_LOSS, indexed further
+# by the influence of that side, the expected influence it loses
+(REALIGNMENT_USSR_WINS, REALIGNMENT_US_WINS,
+ REALIGNMENT_USSR_LOSS, REALIGNMENT_US_LOSS) = _realignment_tables()
+
+# weights of board_evaluation, in the units of its VP term
+CONTROL_WEIGHT = 0.02
+INFLUENCE_WEIGHT = 0.005
+
+
+def coup_modifiers(game: Game, side: Side):
+    '''
+    Returns the modifier of a coup by side in every row of the board, which is
+    added to the die roll: Latin American Death Squads and SALT Negotiations,
+    as GameMap.coup applies them.
+    '''
+    modifiers = np.zeros(CountryInfo.SIZE, dtype=np.int32)
+    if 'Latin_American_Death_Squads' in game.basket[side]:
+        modifiers[LATIN_AMERICA] += 1
+    elif 'Latin_American_Death_Squads' in game.basket[side.opp]:
+        modifiers[LATIN_AMERICA] -= 1
+    if 'SALT_Negotiations' in game.basket[side]:
+        modifiers -= 1
+    return modifiers
+
+
+def coup_ops(game: Game, side: Side, effective_ops: int, card_name: str = None):
+    '''
+    Returns the operations of a coup by side in every row of the board, which
+    are effective_ops plus the bonus Game.coup_callback gives for the China Card
+    in Asia and for Vietnam Revolts in Southeast Asia.
+    '''
+    ops = np.full(CountryInfo.SIZE, effective_ops, dtype=np.int32)
+    if card_name == 'The_China_Card':
+        ops[CountryInfo.REGION[MapRegion.ASIA]] += 1
+    if side == Side.USSR and 'Vietnam_Revolts' in game.basket[Side.USSR]:
+        ops[CountryInfo.REGION[MapRegion.SOUTHEAST_ASIA]] += 1
+    return ops
+
+
+def coup_defcon(game: Game, side: Side):
+    '''
+    Returns the DEFCON change of a coup by side in every row of the board, as
+    passed to Game.change_defcon: to DEFCON 1 under the Cuban Missile Crisis,
+    else -1 in battlegrounds unless the US holds Nuclear Subs.
+    '''
+    if 'Cuban_Missile_Crisis' in game.basket[side.opp]:
+        return np.full(CountryInfo.SIZE, 1 - game.defcon_track, dtype=np.int32)
+    if side == Side.US and 'Nuclear_Subs' in game.basket[Side.US]:
+        return np.zeros(CountryInfo.SIZE, dtype=np.int32)
+    return -CountryInfo.BATTLEGROUND.astype(np.int32)
+
+
+def coup_outcomes(game: Game, side: Side, ops, free: bool = False):
+    '''
+    Returns the outcomes of a coup by side in every row of the board, for each
+    face of the die, with probabilities DIE_PROBS.
+
+    Parameters
+    ----------
+    side : Side
+        The side couping.
+    ops : int or np.ndarray
+        Operations of the coup, including local bonuses, for every row.
+    free : bool
+        Whether the coup is free, so that military operations are not gained.
+
+    Returns
+    -------
+    Arrays ussr, us, defcon, milops and vp of shape (CountryInfo.SIZE, 6): the
+    influence after the coup, and the changes of DEFCON, of the military
+    operations track of side and of VP.
+    '''
+    ops = np.broadcast_to(ops, (CountryInfo.SIZE,))[:, None]
+    influence = game.map.influence
+    own, opp = influence[:, side][:, None], influence[:, side.opp][:, None]
+
+    difference = (DIE + ops + coup_modifiers(game, side)[:, None]
+                  - 2 * CountryInfo.STABILITY[:, None])
+    success = difference > 0
+    opp_after = np.where(success, np.maximum(opp - difference, 0), opp)
+    own_after = np.where(success, own + np.maximum(difference - opp, 0), own)
+
+    shape = difference.shape
+    defcon = np.broadcast_to(coup_defcon(game, side)[:, None], shape)
+    # Game.change_milops stops the track at 5
+    milops = 0 if free else np.minimum(ops, 5 - game.milops_track[side])
+    milops = np.broadcast_to(milops, shape)
+    vp = int(side == Side.US and 'Yuri_and_Samantha' in game.basket[Side.USSR])
+    vp = np.full(shape, vp, dtype=np.int32)
+    if side == Side.USSR:
+        return own_after, opp_after, defcon, milops, vp
+    return opp_after, own_after, defcon, milops, vp
+
+
+def realignment_modifiers(game: Game):
+    '''
+    Returns the modifier in favour of the USSR of a realignment in every row of
+    the board, which is added to the difference of the rolls: Iran-Contra
+    Scandal, control of adjacent countries and the influence majority.
+    '''
+    control = game.map.control
+    adjacency = CountryInfo.ADJACENCY
+    modifiers = ((adjacency & (control == Side.USSR)).sum(axis=1)
+                 - (adjacency & (control == Side.US)).sum(axis=1))
+    ussr = game.map.influence[:, Side.USSR]
+    us = game.map.influence[:, Side.US]
+    modifiers += np.sign(ussr - us)
+    if 'Iran_Contra_Scandal' in game.basket[Side.USSR]:
+        modifiers += 1
+    return modifiers
+
+
+def realignment_outcomes(game: Game):
+    '''
+    Returns the outcomes of a realignment in every row of the board, for each
+    difference of the USSR and US rolls in TWO_DICE, with probabilities
+    TWO_DICE_PROBS. The side realigning does not change them.
+
+    Returns
+    -------
+    Arrays ussr, us, defcon, milops and vp of shape (CountryInfo.SIZE, 11), as
+    for coup_outcomes; realignments leave the last three unchanged.
+    '''
+    influence = game.map.influence
+    ussr = influence[:, Side.USSR][:, None]
+    us = influence[:, Side.US][:, None]
+    difference = TWO_DICE + realignment_modifiers(game)[:, None]
+    ussr_after = np.where(difference < 0, np.maximum(ussr + difference, 0), ussr)
+    us_after = np.where(difference > 0, np.maximum(us - difference, 0), us)
+    zeros = np.zeros(difference.shape, dtype=np.int32)
+    return ussr_after, us_after, zeros, zeros, zeros
+
+
+def coup_expectation(game: Game, side: Side, ops):
+    '''
+    Returns the probability that a coup by side succeeds in every row of the
+    board, and the expected opposing influence it removes and own influence it
+    adds, looked up in COUP_SUCCESS, COUP_REMOVED and COUP_ADDED. Rows which
+    cannot be couped, such as the superpowers, have a probability of 0.
+
+    Parameters
+    ----------
+    ops : int or np.ndarray
+        Operations of the coup, including local bonuses, for every row.
+    '''
+    valid = CountryInfo.STABILITY < COUP_STABILITY
+    ops = np.clip(np.broadcast_to(ops, (CountryInfo.SIZE,)), 0, COUP_OPS - 1)
+    stability = np.where(valid, CountryInfo.STABILITY, 0)
+    modifier = np.clip(coup_modifiers(game, side), -COUP_MODIFIER, COUP_MODIFIER) + COUP_MODIFIER
+    opp = np.minimum(game.map.influence[:, side.opp], COUP_INFLUENCE)
+    return (np.where(valid, COUP_SUCCESS[ops, stability, modifier], 0.0),
+            np.where(valid, COUP_REMOVED[ops, stability, modifier, opp], 0.0),
+            np.where(valid, COUP_ADDED[ops, stability, modifier, opp], 0.0))
+
+
+def realignment_expectation(game: Game):
+    '''
+    Returns the probabilities that a realignment removes US influence and USSR
+    influence in every row of the board, and the expected USSR and US
+    influence it removes, looked up in the REALIGNMENT tables.
+    '''
+    modifier = np.clip(realignment_modifiers(game), -REALIGNMENT_MODIFIER,
+                       REALIGNMENT_MODIFIER) + REALIGNMENT_MODIFIER
+    influence = np.minimum(game.map.influence, REALIGNMENT_INFLUENCE)
+    return (REALIGNMENT_USSR_WINS[modifier], REALIGNMENT_US_WINS[modifier],
+            REALIGNMENT_USSR_LOSS[modifier, influence[:, Side.USSR]],
+            REALIGNMENT_US_LOSS[modifier, influence[:, Side.US]])
+
+
+def _distribution(outcomes, probs, row: int):
+    '''Merges the equal outcomes in row of outcome arrays into (outcomes, probs).'''
+    merged = dict()
+    for outcome, p in zip(zip(*(a[row].tolist() for a in outcomes)), probs.tolist()):
+        merged[outcome] = merged.get(outcome, 0.0) + p
+    return list(merged), list(merged.values())
+
+
+def coup_distribution(game: Game, name: str, side: Side, effective_ops: int,
+                      free: bool = False):
+    '''
+    Returns the outcomes of side couping name and their probabilities, as a
+    tuple (outcomes, probs) like Game.chance_outcomes. Each outcome is a tuple
+    (ussr, us, defcon, milops, vp) of the influence in name after the coup and
+    the changes of DEFCON, of the military operations of side and of VP.
+
+    Parameters
+    ----------
+    effective_ops : int
+        The operations passed to GameMap.coup, including local bonuses.
+    free : bool
+        Whether the coup is free.
+    '''
+    outcomes = coup_outcomes(game, side, effective_ops, free)
+    return _distribution(outcomes, DIE_PROBS, CountryInfo.ALL[name].country_index)
+
+
+def realignment_distribution(game: Game, name: str):
+    '''
+    Returns the outcomes of a realignment in name and their probabilities, as
+    for coup_distribution.
+    '''
+    outcomes = realignment_outcomes(game)
+    return _distribution(outcomes, TWO_DICE_PROBS, CountryInfo.ALL[name].country_index)
+
+
+def board_evaluation(game: Game, side: Side, rows, ussr, us, defcon, milops, vp):
+    '''
+    Evaluates outcomes of a coup or realignment by side, from -1 (US victory)
+    to 1 (USSR victory). Arrays ussr, us, defcon, milops and vp hold outcomes
+    as returned by coup_outcomes, with one row for each country in rows.
+
+    The value is the VP track over 20, after the VP change and the VP the
+    sides would lose for missing military operations at the new DEFCON, plus
+    small terms for the change of control, doubled in battlegrounds, and of
+    influence. Outcomes which take DEFCON below 2 end the game, which the
+    engine awards on VP.
+    '''
+    rows = np.asarray(rows)
+    stability = CountryInfo.STABILITY[rows][:, None]
+    weight = 1 + CountryInfo.BATTLEGROUND[rows][:, None]
+    ussr_before = game.map.influence[rows, Side.USSR][:, None]
+    us_before = game.map.influence[rows, Side.US][:, None]
+
+    def control(ussr, us):
+        return ((ussr - us >= stability).astype(np.int32)
+                - (us - ussr >= stability))
+
+    new_defcon = np.minimum(game.defcon_track + defcon, 5)
+    milops_track = [np.full(ussr.shape, m) for m in game.milops_track]
+    milops_track[side] = milops_track[side] + milops
+    vp_after = (game.vp_track + vp
+                - np.maximum(new_defcon - milops_track[Side.USSR], 0)
+                + np.maximum(new_defcon - milops_track[Side.US], 0))
+
+    value = (vp_after / 20
+             + CONTROL_WEIGHT * weight * (control(ussr, us) - control(ussr_before, us_before))
+             + INFLUENCE_WEIGHT * ((ussr - ussr_before) - (us - us_before)))
+    value = np.clip(value, -1.0, 1.0)
+    return np.where(new_defcon < 2, 1.0 if game.vp_track > 0 else -1.0, value)
+
+
+def expectimax(game: Game, evaluate=board_evaluation):
+    '''
+    Evaluates every target of the current coup or realignment prompt in one
+    pass: the value of a target is the expectation of evaluate over the
+    outcomes of its dice. The early stopping option of a realignment prompt
+    is valued as the unchanged board.
+
+    Returns a tuple (best_move, values), where values maps each move to its
+    value from -1 (US victory) to 1 (USSR victory), and best_move is the best
+    move for the side to move. Raises ValueError if the current input is not a
+    coup or realignment prompt.
+
+    Parameters
+    ----------
+    evaluate : callable
+        Called as evaluate(game, side, rows, ussr, us, defcon, milops, vp) with
+        the outcomes of each row, and returns their values as an array.
+    '''
+    input_state = game.input_state
+    callback = input_state.callback
+    func = getattr(callback, 'func', None)
+    if func == game.coup_callback:
+        side, effective_ops, card_name = callback.args
+        ops = coup_ops(game, side, effective_ops, card_name)
+        outcomes = coup_outcomes(game, side, ops, callback.keywords.get('free', False))
+        probs = DIE_PROBS
+    elif func == game.realignment_callback:
+        side = callback.args[0]
+        outcomes = realignment_outcomes(game)
+        probs = TWO_DICE_PROBS
+    else:
+        raise ValueError('The current input is not a coup or realignment prompt.')
+
+    moves = list(input_state.available_options)
+    rows = np.array([CountryInfo.ALL[name].country_index for name in moves], dtype=np.intp)
+    values = evaluate(game, side, rows, *(a[rows] for a in outcomes)) @ probs
+    values = dict(zip(moves, values.tolist()))
+
+    if input_state.option_stop_early:
+        # the padding row 0, which no outcome changes
+        unchanged = [np.zeros((1, 1), dtype=np.int32)] * 5
+        values[input_state.option_stop_early] = float(
+            evaluate(game, side, np.zeros(1, dtype=np.intp), *unchanged)[0, 0])
+
+    pick = max if side == Side.USSR else min
+    return pick(values, key=values.get), values
@@ -0,0 +1,146 @@
+import numpy as np
+
+from typing import Sequence
+
+from twilight_cards import Card
+from twilight_enums import Side
+from twilight_map import GameMap, CountryInfo
+from twilight_playerview import PlayerView
+
+
+class ObservationEncoder:
+
+    # features of each row of the board, in order
+    COUNTRY_FEATURES = ('ussr_influence', 'us_influence', 'ussr_control',
+                        'us_control', 'ussr_access', 'us_access', 'stability',
+                        'battleground')
+    # scalar features, in order
+    TRACKS = ('vp', 'defcon', 'turn', 'ar', 'ar_side_ussr', 'ar_side_us',
+              'ussr_milops', 'us_milops', 'ussr_space', 'us_space',
+              'ussr_spaced_turns', 'us_spaced_turns', 'side_ussr', 'side_us')
+    # bitmasks over card_index, in order
+    CARD_SETS = ('hand', 'opp_hand', 'opp_headline', 'discard', 'removed')
+
+    # basket entries are cards, except for the Chernobyl regions
+    BASKET_NAMES = tuple(Card.ALL) + tuple(n for n, _ in GameMap.CHERNOBYL_REGIONS)
+
+    INFLUENCE_SCALE = 1 / 5
+    TRACK_SCALES = dict(vp=1 / 20, defcon=1 / 5, turn=1 / 10, ar=1 / 8,
+                        ussr_milops=1 / 5, us_milops=1 / 5,
+                        ussr_space=1 / 8, us_space=1 / 8)
+
+    def __init__(self):
+        '''
+        Encodes a PlayerView into a fixed-layout float32 feature vector of length
+        self.size. self.layout maps each block of the vector to its slice:
+
+        - 'countries': CountryInfo.SIZE rows of COUNTRY_FEATURES, so that
+          vector[layout['countries']].reshape(CountryInfo.SIZE, -1) gives one
+          plane per feature. Access is whether a side may place influence in the
+          country by adjacency. Padding rows are zero.
+        - 'tracks': the TRACKS, scaled to about [0, 1] (VP to [-1, 1]).
+        - each of CARD_SETS: a bitmask over Card.card_index. opp_hand and
+          opp_headline hold only the cards known to the viewing side.
+        - 'ussr_basket', 'us_basket': bitmasks over BASKET_NAMES of the effects
+          in play for each side.
+
+        The view must be up to date, i.e. PlayerView.update has been called
+        since the game last changed.
+        '''
+        self.n_cards = max(Card.INDEX) + 1
+        self.card_index = {name: card.card_index for name, card in Card.ALL.items()}
+        self.basket_index = {name: i for i, name in enumerate(self.BASKET_NAMES)}
+
+        sizes = [('countries', CountryInfo.SIZE * len(self.COUNTRY_FEATURES)),
+                 ('tracks', len(self.TRACKS))]
+        sizes += [(name, self.n_cards) for name in self.CARD_SETS]
+        sizes += [('ussr_basket', len(self.BASKET_NAMES)),
+                  ('us_basket', len(self.BASKET_NAMES))]
+
+        self.layout = dict()
+        start = 0
+        for name, size in sizes:
+            self.layout[name] = slice(start, start + size)
+            start += size
+        self.size = start
+
+        # adjacency including the country itself, for access
+        self._adjacency = (CountryInfo.ADJACENCY |
+                           np.eye(CountryInfo.SIZE, dtype=bool)).astype(np.float32)
+        self._placeable = (CountryInfo.VALID & ~CountryInfo.SUPERPOWER).astype(np.float32)
+        self._stability = np.where(CountryInfo.VALID, CountryInfo.STABILITY, 0) / 4
+        self._present = np.zeros(CountryInfo.SIZE, dtype=np.float32)
+
+    def empty(self, n: int = None):
+        '''
+        Returns a zeroed float32 array for one encoding, or for a batch of n.
+        '''
+        shape = self.size if n is None else (n, self.size)
+        return np.zeros(shape, dtype=np.float32)
+
+    def encode(self, view: PlayerView, out: np.ndarray = None):
+        '''
+        Encodes view into out, a float32 array of length self.size, and returns
+        it. A new array is allocated if out is not given.
+        '''
+        if out is None:
+            out = self.empty()
+        layout = self.layout
+
+        countries = out[layout['countries']].reshape(CountryInfo.SIZE, -1)
+        influence = view.map.influence
+        control = view.map.control
+        np.multiply(influence, self.INFLUENCE_SCALE, out=countries[:, 0:2])
+        np.equal(control, Side.USSR, out=countries[:, 2])
+        np.equal(control, Side.US, out=countries[:, 3])
+        for side in (Side.USSR, Side.US):
+            access = countries[:, 4 + side]
+            np.greater(influence[:, side], 0, out=self._present)
+            np.matmul(self._adjacency, self._present, out=access)
+            np.minimum(access, 1, out=access)
+            np.multiply(access, self._placeable, out=access)
+        countries[:, 6] = self._stability
+        countries[:, 7] = CountryInfo.BATTLEGROUND
+
+        tracks = out[layout['tracks']]
+        scales = self.TRACK_SCALES
+        tracks[0] = view.vp_track * scales['vp']
+        tracks[1] = view.defcon_track * scales['defcon']
+        tracks[2] = view.turn_track * scales['turn']
+        tracks[3] = view.ar_track * scales['ar']
+        tracks[4] = view.ar_side == Side.USSR
+        tracks[5] = view.ar_side == Side.US
+        tracks[6] = view.milops_track[Side.USSR] * scales['ussr_milops']
+        tracks[7] = view.milops_track[Side.US] * scales['us_milops']
+        tracks[8] = view.space_track[Side.USSR] * scales['ussr_space']
+        tracks[9] = view.space_track[Side.US] * scales['us_space']
+        tracks[10] = view.spaced_turns[Side.USSR]
+        tracks[11] = view.spaced_turns[Side.US]
+        tracks[12] = view.side == Side.USSR
+        tracks[13] = view.side == Side.US
+
+        headline = (view.opp_headline,) if view.opp_headline else ()
+        for name, cards in (('hand', view.hand), ('opp_hand', view.opp_hand),
+                            ('opp_headline', headline),
+                            ('discard', view.discard_pile),
+                            ('removed', view.removed_pile)):
+            self._bitmask(out[layout[name]], cards, self.card_index)
+        self._bitmask(out[layout['ussr_basket']], view.basket[Side.USSR],
+                      self.basket_index)
+        self._bitmask(out[layout['us_basket']], view.basket[Side.US],
+                      self.basket_index)
+        return out
+
+    def encode_batch(self, views: Sequence[PlayerView], out: np.ndarray):
+        '''
+        Encodes each of views into the matching row of out, a preallocated float32
+        array of shape (n, self.size) with n at least len(views), and returns out.
+        '''
+        for i, view in enumerate(views):
+            self.encode(view, out[i])
+        return out
+
+    @staticmethod
+    def _bitmask(block, names, index):
+        block.fill(0)
+        block[[index[name] for name in names if name in index]] = 1
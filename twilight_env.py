@@ -0,0 +1,500 @@
+import random
+import multiprocessing
+import numpy as np
+
+from multiprocessing import shared_memory
+
+from game_mechanics import Game
+from twilight_actions import ActionSpace
+from twilight_encoder import ObservationEncoder
+from twilight_enums import Side
+from twilight_input_output import NullSink
+from twilight_rng import GameRNG
+
+
+class TwilightEnv:
+
+    def __init__(self, handicap=-2, sink=None, resolve_chance=True):
+        '''
+        Gym-style environment over a Game, with the fixed action space of
+        ActionSpace. Both sides are played through step. The side to move is
+        given by info, which step also returns.
+
+        Parameters
+        ----------
+        handicap : int
+            Handicap of each new game, by default -2.
+        sink : optional
+            Event sink for new games, by default a NullSink.
+        resolve_chance : bool
+            If True, Side.NEUTRAL inputs (e.g. random discards) are resolved by
+            Game.sample_chance as soon as they come up, so every step is a move
+            of the USSR or the US. By default True.
+        '''
+        self.handicap = handicap
+        self.sink = NullSink() if sink is None else sink
+        self.resolve_chance = resolve_chance
+        self.encoder = ObservationEncoder()
+        self.game = None
+        self.done = True
+        self.side = Side.USSR  # the side to move, or which moved last
+
+        # action ids of the current input, computed once per Input
+        self._input = None
+        self._ids = None
+        self._options = None
+        self._positions = None
+
+    def reset(self, seed=None):
+        '''
+        Starts a new game from seed, and returns its first observation.
+        '''
+        self.game = Game(self.sink, seed=seed)
+        self.game.start(self.handicap)
+        self.done = False
+        self.side = Side.USSR
+        self._advance()
+        return self.observe()
+
+    def step(self, action: int):
+        '''
+        Plays action for the side to move. Returns (observation, reward, done,
+        info), where the observation is that of the next side to move. The reward
+        is 1 if the side which moved has won, -1 if it has lost, and 0 otherwise.
+        '''
+        if self.done:
+            raise RuntimeError('The game has ended. Call reset to start a new game.')
+
+        reward = self._play(self.action_option(action))
+        return self.observe(), reward, self.done, self.info()
+
+    def _play(self, option):
+        '''
+        Sends option to the current input and advances to the next decision.
+        Returns the reward of the side which moved. Errors of the engine are
+        raised as they are.
+        '''
+        side = self.game.input_state.side
+        self.game.input_state.recv(option)
+        self._advance()
+
+        if self.game.winner is None:
+            return 0.0
+        self.done = True
+        return 1.0 if self.game.winner == side else -1.0
+
+    def _advance(self):
+        game = self.game
+        while True:
+            # a winner may be declared with an input still pending, e.g. the
+            # next headline after final scoring
+            if game.winner is not None or not game.advance() or game.winner is not None:
+                self.done = True
+                return
+            if game.input_state.side != Side.NEUTRAL:
+                self.side = game.input_state.side
+            if not (self.resolve_chance and game.input_state.side == Side.NEUTRAL):
+                return
+            game.input_state.recv(game.sample_chance())
+
+    def _index(self):
+        input_state = self.game.input_state
+        if self._input is not input_state:
+            self._input = input_state
+            self._ids = ActionSpace.option_ids(input_state)
+            self._options = input_state.options
+            self._positions = {o: i for i, o in enumerate(self._options)}
+        return self._ids
+
+    def legal_action_mask(self, out: np.ndarray = None):
+        '''
+        Returns a bool array of shape (ActionSpace.SIZE,) which is True for the
+        actions available to the side to move. Pass out to fill an existing
+        array instead.
+        '''
+        if out is None:
+            mask = np.zeros(ActionSpace.SIZE, dtype=bool)
+        else:
+            mask = out
+            mask.fill(False)
+        if self.done:
+            return mask
+
+        input_state = self.game.input_state
+        ids = self._index()
+        mask[ids[input_state.available_indices()]] = True
+
+        if input_state.option_stop_early:
+            mask[ActionSpace.STOP] = True
+        return mask
+
+    def action_option(self, action: int):
+        '''
+        Returns the option of the current input for action. Raises ValueError if
+        the action is not available.
+        '''
+        if not self.legal_action_mask()[action]:
+            raise ValueError(f'Action {action} is not available.')
+        if action == ActionSpace.STOP:
+            return self.game.input_state.option_stop_early
+        return self._options[np.flatnonzero(self._ids == action)[0]]
+
+    def option_action(self, option):
+        '''Returns the action id of an option of the current input.'''
+        if option == self.game.input_state.option_stop_early:
+            return ActionSpace.STOP
+        return int(self._index()[self._positions[option]])
+
+    def observe(self, side: Side = None, out: np.ndarray = None):
+        '''
+        Returns the ObservationEncoder encoding of the PlayerView of side, by
+        default self.side, the side to move. Pass out to encode into an existing
+        array of length self.encoder.size.
+        '''
+        side = self.side if side is None else side
+        view = self.game.players[side]
+        view.update(self.game, side)
+        return self.encoder.encode(view, out)
+
+    def info(self):
+        '''
+        Returns a dict with the side to move and its InputType, which are None
+        once the game has ended, and the winner.
+        '''
+        input_state = None if self.done else self.game.input_state
+        return dict(
+            side=None if input_state is None else input_state.side,
+            input_type=None if input_state is None else input_state.state,
+            winner=self.game.winner)
+
+
+class VecEnv:
+
+    # new games in a row which may fail to start before _reset gives up
+    MAX_RESET_ATTEMPTS = 10
+
+    def __init__(self, n: int, seed=None, handicap=-2, max_steps: int = 5000,
+                 start: int = 0, buffers: dict = None):
+        '''
+        Steps n TwilightEnvs together with a batch of actions, so that encoding
+        and policy inference can be batched around the games. Finished games are
+        reset automatically.
+
+        Results are written into preallocated arrays, which are returned by reset
+        and step and overwritten by the next call:
+
+        - observations: float32 array of shape (n, encoder.size)
+        - rewards: float32 array of shape (n,)
+        - dones: bool array of shape (n,)
+        - masks: bool array of shape (n, ActionSpace.SIZE), the legal actions
+        - sides: int8 array of shape (n,), the Side to move in each game
+
+        Parameters
+        ----------
+        n : int
+            Number of games.
+        seed : optional
+            Root seed. Game k of environment i is seeded with
+            GameRNG.derive(seed, i, k), and can be replayed from that seed alone.
+        handicap : int
+            Handicap of each new game, by default -2.
+        max_steps : int
+            A game is abandoned after this many steps, by default 5000.
+        start : int
+            Index of the first environment, for seeding. Used when the games of
+            one run are split between several VecEnvs. By default 0.
+        buffers : dict, optional
+            Arrays to write results into, keyed by name as in buffer_specs. By
+            default new arrays are allocated.
+        '''
+        self.n = n
+        self.seed = random.getrandbits(64) if seed is None else seed
+        self.max_steps = max_steps
+        self.start = start
+        self.envs = [TwilightEnv(handicap) for _ in range(n)]
+        self.episodes = [0] * n
+        self.steps = [0] * n
+
+        encoder = self.envs[0].encoder
+        for env in self.envs:
+            env.encoder = encoder
+        if buffers is None:
+            buffers = {name: np.zeros(shape, dtype=dtype)
+                       for name, shape, dtype in VecEnv.buffer_specs(n)}
+        self.observations = buffers['observations']
+        self.rewards = buffers['rewards']
+        self.dones = buffers['dones']
+        self.masks = buffers['masks']
+        self.sides = buffers['sides']
+
+    @staticmethod
+    def buffer_specs(n: int):
+        '''
+        Returns the (name, shape, dtype) of each result array of a VecEnv of n
+        games.
+        '''
+        return (('observations', (n, ObservationEncoder().size), np.float32),
+                ('rewards', (n,), np.float32),
+                ('dones', (n,), bool),
+                ('masks', (n, ActionSpace.SIZE), bool),
+                ('sides', (n,), np.int8))
+
+    def reset(self):
+        '''
+        Starts a new game in every environment. Returns (observations, masks).
+        Raises RuntimeError if a game fails to start MAX_RESET_ATTEMPTS times in
+        a row.
+        '''
+        for i in range(self.n):
+            self._reset(i, dict())
+        self.rewards.fill(0)
+        self.dones.fill(False)
+        return self.observations, self.masks
+
+    def _reset(self, i, info: dict):
+        '''
+        Starts a new game in environment i, skipping seeds whose game raises an
+        engine error or has no legal actions before its first decision. The
+        seed and error of each skipped game are added to info['reset_errors'].
+        '''
+        env = self.envs[i]
+        for _ in range(VecEnv.MAX_RESET_ATTEMPTS):
+            seed = GameRNG.derive(self.seed, self.start + i, self.episodes[i])
+            self.episodes[i] += 1
+            try:
+                env.reset(seed)
+            except Exception as e:
+                error = e
+            else:
+                if env.legal_action_mask(out=self.masks[i]).any():
+                    break
+                error = RuntimeError('No legal actions.')
+            info.setdefault('reset_errors', []).append((seed, error))
+        else:
+            raise RuntimeError(
+                f'{VecEnv.MAX_RESET_ATTEMPTS} new games in a row failed to start '
+                f'in environment {self.start + i}.') from error
+        self.steps[i] = 0
+        env.observe(out=self.observations[i])
+        self.sides[i] = env.side
+
+    def step(self, actions):
+        '''
+        Plays actions[i] in game i. Returns (observations, rewards, dones, masks,
+        infos), where infos is a list of dicts, empty unless the game ended.
+
+        When game i ends, rewards[i] is the reward of the side that moved, as for
+        TwilightEnv.step, and the game is replaced by a new one whose first
+        observation is in observations[i]. infos[i] then holds the seed and
+        winner of the finished game. A game which raises an engine error, has no
+        legal actions, or reaches max_steps is ended without a winner, and
+        infos[i] says why. New games which fail to start are skipped, and listed
+        as (seed, error) pairs in infos[i]['reset_errors'].
+
+        Raises ValueError, before any game is played, if an action is not legal
+        in its game according to masks.
+        '''
+        _check_actions(actions, self.masks)
+        infos = [dict() for _ in range(self.n)]
+        for i, env in enumerate(self.envs):
+            info = infos[i]
+            self.steps[i] += 1
+            option = env.action_option(int(actions[i]))
+            try:
+                reward = env._play(option)
+            except Exception as e:
+                reward = 0.0
+                env.done = True
+                info['error'] = e
+            done = env.done
+
+            if not done and not env.legal_action_mask(out=self.masks[i]).any():
+                done = True
+                info['error'] = RuntimeError('No legal actions.')
+            elif not done and self.steps[i] >= self.max_steps:
+                done = True
+                info['truncated'] = True
+
+            self.rewards[i] = reward
+            self.dones[i] = done
+            if done:
+                info['seed'] = env.game.rng.seed
+                info['winner'] = env.game.winner
+                self._reset(i, info)
+            else:
+                env.observe(out=self.observations[i])
+                self.sides[i] = env.side
+        return self.observations, self.rewards, self.dones, self.masks, infos
+
+
+class SubprocVecEnv:
+
+    def __init__(self, n: int, workers: int, seed=None, handicap=-2,
+                 max_steps: int = 5000, context: str = None):
+        '''
+        A VecEnv whose n games are split between worker processes, so that games
+        are stepped on several cores. Each worker runs a VecEnv over its slice of
+        the games, writing into arrays in shared memory, so observations and
+        masks are never pickled. The actions of a step are written to a shared
+        array before the step is broadcast to the workers.
+
+        The results are the same arrays as VecEnv, and game k of environment i is
+        seeded in the same way, so a run gives the same games whatever the number
+        of workers. Engine errors in infos are given as strings, and errors
+        raised in a worker are raised again by the call that sent the command.
+
+        Call close, or use as a context manager, to stop the workers and release
+        the shared memory.
+
+        Parameters
+        ----------
+        n : int
+            Number of games.
+        workers : int
+            Number of worker processes.
+        seed, handicap, max_steps
+            As for VecEnv.
+        context : str, optional
+            multiprocessing start method, by default the platform default.
+        '''
+        self.n = n
+        self.seed = random.getrandbits(64) if seed is None else seed
+        ctx = multiprocessing.get_context(context)
+
+        specs = VecEnv.buffer_specs(n) + (('actions', (n,), np.int64),)
+        self._memory = []
+        arrays = dict()
+        for name, shape, dtype in specs:
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+            self._memory.append(memory)
+            arrays[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        self.observations = arrays['observations']
+        self.rewards = arrays['rewards']
+        self.dones = arrays['dones']
+        self.masks = arrays['masks']
+        self.sides = arrays['sides']
+        self.actions = arrays['actions']
+
+        shared = [(m.name, shape, dtype)
+                  for m, (_, shape, dtype) in zip(self._memory, specs)]
+        bounds = np.linspace(0, n, workers + 1).astype(int)
+        self.pipes = []
+        self.processes = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            pipe, worker_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_subproc_worker, daemon=True,
+                args=(worker_pipe, shared, int(start), int(stop), self.seed,
+                      handicap, max_steps))
+            process.start()
+            worker_pipe.close()
+            self.pipes.append(pipe)
+            self.processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _broadcast(self, command):
+        for pipe in self.pipes:
+            pipe.send(command)
+        replies = [pipe.recv() for pipe in self.pipes]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+
+    def reset(self):
+        '''As VecEnv.reset.'''
+        self._broadcast('reset')
+        return self.observations, self.masks
+
+    def step(self, actions):
+        '''As VecEnv.step.'''
+        _check_actions(actions, self.masks)
+        self.actions[:] = actions
+        infos = [dict() for _ in range(self.n)]
+        for finished in self._broadcast('step'):
+            for i, info in finished:
+                infos[i] = info
+        return self.observations, self.rewards, self.dones, self.masks, infos
+
+    def close(self):
+        '''Stops the workers and releases the shared memory.'''
+        if not self.processes:
+            return
+        for pipe in self.pipes:
+            pipe.send('close')
+        for process in self.processes:
+            process.join()
+        self.pipes = []
+        self.processes = []
+        # drop the views before releasing the memory under them
+        self.observations = self.rewards = self.dones = None
+        self.masks = self.sides = self.actions = None
+        for memory in self._memory:
+            memory.close()
+            memory.unlink()
+
+
+def _check_actions(actions, masks: np.ndarray):
+    '''Raises ValueError unless actions[i] is legal in masks[i] for every game.'''
+    actions = np.asarray(actions, dtype=np.int64)
+    if actions.shape != (len(masks),):
+        raise ValueError(f'Expected {len(masks)} actions, got shape {actions.shape}.')
+    in_range = (actions >= 0) & (actions < ActionSpace.SIZE)
+    legal = in_range.copy()
+    legal[in_range] = masks[np.flatnonzero(in_range), actions[in_range]]
+    if not legal.all():
+        i = int(np.flatnonzero(~legal)[0])
+        raise ValueError(f'Action {actions[i]} is not available in game {i}.')
+
+
+def _error_string(error: Exception):
+    return f'{type(error).__name__}: {error}'
+
+
+def _subproc_worker(pipe, shared, start, stop, seed, handicap, max_steps):
+    '''
+    Runs a VecEnv over games start to stop of a SubprocVecEnv, answering the
+    commands sent on pipe until it is sent 'close'.
+    '''
+    memory = [shared_memory.SharedMemory(name=name) for name, _, _ in shared]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=m.buf)[start:stop]
+              for m, (_, shape, dtype) in zip(memory, shared)]
+    *buffers, actions = arrays
+    names = [name for name, _, _ in VecEnv.buffer_specs(0)]
+    env = VecEnv(stop - start, seed, handicap, max_steps, start=start,
+                 buffers=dict(zip(names, buffers)))
+
+    while True:
+        command = pipe.recv()
+        if command == 'close':
+            break
+        try:
+            if command == 'step':
+                *_, infos = env.step(actions)
+                finished = []
+                for i, info in enumerate(infos):
+                    if info:
+                        if 'error' in info:
+                            info['error'] = _error_string(info['error'])
+                        if 'reset_errors' in info:
+                            info['reset_errors'] = [(seed, _error_string(error))
+                                                    for seed, error in info['reset_errors']]
+                        finished.append((start + i, info))
+                pipe.send(finished)
+            elif command == 'reset':
+                env.reset()
+                pipe.send(None)
+        except Exception as e:
+            # the parent is waiting for a reply, so send the error instead
+            pipe.send(RuntimeError(_error_string(e)))
+
+    del env, buffers, actions, arrays
+    for m in memory:
+        m.close()
+    pipe.close()
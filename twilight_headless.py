@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+'''
+Plays games without the UI, for batch simulation. Usage:
+
+    python twilight_headless.py [games] [seed]
+'''
+
+import sys
+import random
+
+from collections import Counter
+from time import perf_counter
+from typing import Callable, Dict
+
+from game_mechanics import Game
+from twilight_enums import Side
+from twilight_input_output import NullSink
+from twilight_rng import GameRNG
+
+
+class HeadlessRunner:
+
+    def __init__(self, players: Dict[Side, Callable[[Game], str]] = None,
+                 seed=None, sink=None, max_moves: int = 20000):
+        '''
+        Plays games with Game.drive, in the same order as the UI with
+        auto-commit on.
+
+        Parameters
+        ----------
+        players : Dict[Side, Callable[[Game], str]], optional
+            Maps Side.USSR and Side.US to a function which receives the game and
+            returns one of the options of game.input_state. Sides which are not
+            given select uniformly at random, from a stream derived from the
+            game's seed. Side.NEUTRAL inputs are resolved by game.sample_chance.
+        seed : optional
+            Root seed from which the seed of each new game is drawn. A game is
+            reproduced by passing its seed, self.seed, to run.
+        sink : optional
+            Event sink for new games, by default a NullSink.
+        max_moves : int
+            A game is abandoned after this many decisions, by default 20000.
+        '''
+        self.players = dict() if players is None else players
+        self.rng = random.Random(seed)
+        self.player_rng = random.Random(seed)
+        self.seed = None
+        self.sink = NullSink() if sink is None else sink
+        self.max_moves = max_moves
+        self.moves = 0
+
+    def run(self, game: Game = None, handicap=-2, seed=None):
+        '''
+        Plays a game until it ends or max_moves is reached, and returns it.
+        The result is in game.winner, which is None if the game was abandoned.
+        The number of decisions made is left in self.moves.
+
+        Parameters
+        ----------
+        game : Game, optional
+            A game in progress to continue. By default a new game is started.
+        handicap : int
+            Handicap for a new game, by default -2.
+        seed : optional
+            Seed for a new game. By default one is drawn from the runner's seed.
+        '''
+        if game is None:
+            if seed is None:
+                seed = self.rng.getrandbits(64)
+            game = Game(self.sink, seed=seed)
+            game.start(handicap)
+
+        self.seed = game.rng.seed
+        self.player_rng = random.Random(GameRNG.derive(self.seed, 'players'))
+        # left at 0 if the engine raises
+        self.moves = 0
+        self.moves = game.drive(self._choose, self.max_moves)
+        return game
+
+    def _choose(self, game: Game, moves: list):
+        player = self.players.get(game.input_state.side)
+        if player is None:
+            return self.player_rng.choice(moves)
+        return player(game)
+
+
+if __name__ == '__main__':
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    runner = HeadlessRunner(seed=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+
+    results = Counter()
+    errors = dict()
+    moves = 0
+    start = perf_counter()
+    for _ in range(games):
+        try:
+            game = runner.run()
+        except Exception as e:
+            results[f'error ({type(e).__name__})'] += 1
+            errors.setdefault(type(e).__name__, runner.seed)
+        else:
+            results[game.winner.toStr() if game.winner else 'abandoned'] += 1
+        moves += runner.moves
+    elapsed = perf_counter() - start
+
+    print(f'{games} games, {moves} moves in {elapsed:.2f}s '
+          f'({games / elapsed:.1f} games/s, {moves / elapsed:.0f} moves/s)')
+    for result, n in results.most_common():
+        print(f'  {result:<24}{n}')
+    for error, seed in errors.items():
+        print(f'First {error} in game with seed {seed}')
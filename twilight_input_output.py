@@ -1,13 +1,15 @@
 from typing import Sequence, Iterable, Callable, Tuple
 from twilight_enums import Side, InputType
+from twilight_journal import Journaled
 
 
-class Input:
+class Input(Journaled):
 
     def __init__(self, side: Side, state: InputType, callback: Callable[[str], bool],
                  options: Iterable[str], prompt: str = '',
                  reps: int = 1, reps_unit: str = '', max_per_option: int = -1,
-                 option_stop_early=''):
+                 option_stop_early='', distribution: Tuple[tuple, tuple] = None,
+                 rng_stream: str = ''):
         '''
         Creates an input state, which is the interface by which the game engine
         communicates with the user.
@@ -43,17 +45,47 @@ class Input:
             have been exhausted, this the option text for the early stopping
             option.
             Defaults to empty string, which means this options is not available.
+        distribution : Tuple[tuple, tuple]
+            For Side.NEUTRAL inputs, the outcomes and their probabilities, if
+            precomputed. The outcomes should be the same as options.
+            Defaults to None, which means all options are equally likely.
+        rng_stream : str
+            For Side.NEUTRAL inputs, the stream of the game's GameRNG which
+            resolves them: 'shuffle', 'dice' or 'discard'.
+            Defaults to empty string, for inputs which are not chance nodes.
+
+        Attributes
+        ----------
+        options : Tuple[str, ...]
+            The options, without duplicates, in the order they were given. The
+            index of an option is its position here.
+        option_index : Dict[str, int]
+            The index of each option.
+        available : int
+            A bitset of the available options, in which bit i is set if
+            options[i] may still be selected. Kept up to date by recv,
+            remove_option and change_max_per_option.
         '''
-        self.side = side
-        self.state = state
-        self.callback = callback
-        self.prompt = prompt
-        self.reps = reps
-        self.reps_unit = reps_unit
-        self.max_per_option = reps if max_per_option == -1 else max_per_option
-        self.option_stop_early = option_stop_early
-        self.selection = {k: 0 for k in options}
-        self.discarded_options = set()
+        selection = dict.fromkeys(options, 0)
+        options = tuple(selection)
+        max_per_option = reps if max_per_option == -1 else max_per_option
+        # a new input has nothing to journal, so skip Journaled.__setattr__
+        vars(self).update(
+            side=side,
+            state=state,
+            callback=callback,
+            prompt=prompt,
+            reps=reps,
+            reps_unit=reps_unit,
+            max_per_option=max_per_option,
+            option_stop_early=option_stop_early,
+            distribution=distribution,
+            rng_stream=rng_stream,
+            options=options,
+            option_index=dict(zip(options, range(len(options)))),
+            available=(1 << len(options)) - 1 if max_per_option > 0 else 0,
+            selection=selection,
+            discarded_options=set())
 
     def recv(self, input_str):
         '''
@@ -65,16 +97,22 @@ class Input:
         input_str : str
             The selected option.
         '''
-        if (input_str not in self.available_options and
-                (not self.option_stop_early or input_str != self.option_stop_early)):
-            return False
-
-        if input_str == self.option_stop_early:
+        if self.option_stop_early and input_str == self.option_stop_early:
             self.callback(input_str)
             return True
 
+        i = self.option_index.get(input_str)
+        if i is None or not self.available >> i & 1:
+            return False
+
         if self.callback(input_str):
-            self.selection[input_str] += 1
+            count = self.selection[input_str]
+            if self.journal is not None and self.journal.active:
+                self.journal.record(self.selection.__setitem__, input_str, count)
+            self.selection[input_str] = count + 1
+            # the callback may have changed max_per_option, so test afterwards
+            if count + 1 >= self.max_per_option:
+                self.available &= ~(1 << i)
             return True
         else:
             return False
@@ -92,17 +130,56 @@ class Input:
         '''
         if option not in self.selection:
             raise KeyError('Option was never present!')
+        if (self.journal is not None and self.journal.active
+                and option not in self.discarded_options):
+            self.journal.record(self.discarded_options.discard, option)
         self.discarded_options.add(option)
+        bit = 1 << self.option_index[option]
+        if self.available & bit:
+            self.available ^= bit
+
+    def is_available(self, option):
+        '''
+        Returns True if option may be selected, without listing the options.
+        The early stopping option is not included.
+        '''
+        i = self.option_index.get(option)
+        return i is not None and self.available >> i & 1 == 1
+
+    def available_indices(self):
+        '''
+        Returns the indices of the available options, in increasing order.
+        '''
+        bits = self.available
+        if not bits & (bits + 1):
+            # every option below the highest available one, the common case
+            return list(range(bits.bit_length()))
+        indices = []
+        while bits:
+            low = bits & -bits
+            indices.append(low.bit_length() - 1)
+            bits ^= low
+        return indices
 
     @property
     def available_options(self):
         '''
         Returns available input options to the user.
         '''
-        return (
-            item[0] for item in self.selection.items()
-            if item[0] not in self.discarded_options
-            and item[1] < self.max_per_option)
+        options = self.options
+        return (options[i] for i in self.available_indices())
+
+    def legal_moves(self):
+        '''
+        Returns the available options as a list, followed by the early stopping
+        option if there is one. A cheaper form of available_options, for callers
+        which need every option at once.
+        '''
+        options = self.options
+        moves = [options[i] for i in self.available_indices()]
+        if self.option_stop_early:
+            moves.append(self.option_stop_early)
+        return moves
 
     @property
     def complete(self):
@@ -114,6 +191,219 @@ class Input:
 
     def change_max_per_option(self, n: int):
         self.max_per_option += n
+        # every option's count is compared again, since n may be negative
+        limit = self.max_per_option
+        discarded = self.discarded_options
+        available = 0
+        for i, (option, count) in enumerate(self.selection.items()):
+            if count < limit and option not in discarded:
+                available |= 1 << i
+        self.available = available
+
+    def copy(self):
+        '''
+        Returns a copy of this input state with its own selection counts and
+        discarded options. The callback is shared.
+        '''
+        other = Input.__new__(Input)
+        vars(other).update(vars(self))
+        other.selection = dict(self.selection)
+        other.discarded_options = set(self.discarded_options)
+        return other
+
+
+class Decision:
+    '''
+    The pending decision of a stage in the rollout mode of Game.playout, which
+    stands in for an Input. A game makes one for each playout and sets it
+    again for every decision, so no Input, selection dict or discarded_options
+    set is made per decision. The policy of the playout sees the legal moves as
+    an int array of ActionSpace ids.
+
+    Stage callbacks run against it as against an Input: it has the attributes
+    of an Input which callbacks read and write, and remove_option,
+    change_max_per_option, the selection counts and the available options.
+    Picked options are counted in counts, and removed options are kept as the
+    bitset discarded, with bit i for options[i]. The option_index of an Input
+    is only built for a decision whose options are looked up by name.
+    '''
+
+    __slots__ = ('side', 'state', 'callback', 'options', 'prompt', 'reps',
+                 'reps_unit', 'max_per_option', 'option_stop_early',
+                 'distribution', 'rng_stream', 'available', 'discarded', 'counts',
+                 '_option_index')
+
+    def set(self, side: Side, state: InputType, callback: Callable[[str], bool],
+            options: Iterable[str], prompt: str = '',
+            reps: int = 1, reps_unit: str = '', max_per_option: int = -1,
+            option_stop_early='', distribution: Tuple[tuple, tuple] = None,
+            rng_stream: str = ''):
+        '''
+        Sets the decision to a new input, with the arguments of Input. The
+        options should be distinct. Returns self.
+        '''
+        options = tuple(options)
+        max_per_option = reps if max_per_option == -1 else max_per_option
+        self.side = side
+        self.state = state
+        self.callback = callback
+        self.options = options
+        self.prompt = prompt
+        self.reps = reps
+        self.reps_unit = reps_unit
+        self.max_per_option = max_per_option
+        self.option_stop_early = option_stop_early
+        self.distribution = distribution
+        self.rng_stream = rng_stream
+        self.available = (1 << len(options)) - 1 if max_per_option > 0 else 0
+        self.discarded = 0
+        self.counts = [0] * len(options)
+        self._option_index = None
+        return self
+
+    def load(self, input_state: Input):
+        '''
+        Sets the decision to the state of input_state, which is left unchanged.
+        Returns self.
+        '''
+        for name in ('side', 'state', 'callback', 'options', 'prompt', 'reps',
+                     'reps_unit', 'max_per_option', 'option_stop_early',
+                     'distribution', 'rng_stream', 'available'):
+            setattr(self, name, getattr(input_state, name))
+        index = self._option_index = input_state.option_index
+        self.discarded = sum(1 << index[o] for o in input_state.discarded_options)
+        self.counts = list(input_state.selection.values())
+        return self
+
+    @property
+    def option_index(self):
+        '''The index of each option, as for an Input. Built on first use.'''
+        if self._option_index is None:
+            options = self.options
+            self._option_index = dict(zip(options, range(len(options))))
+        return self._option_index
+
+    def to_input(self):
+        '''
+        Returns an Input in the state of the decision, for a game which leaves
+        the rollout mode with a decision pending.
+        '''
+        options = self.options
+        discarded = self.discarded
+        input_state = Input.__new__(Input)
+        vars(input_state).update(
+            side=self.side,
+            state=self.state,
+            callback=self.callback,
+            prompt=self.prompt,
+            reps=self.reps,
+            reps_unit=self.reps_unit,
+            max_per_option=self.max_per_option,
+            option_stop_early=self.option_stop_early,
+            distribution=self.distribution,
+            rng_stream=self.rng_stream,
+            options=options,
+            option_index=self.option_index,
+            available=self.available,
+            selection=dict(zip(options, self.counts)),
+            discarded_options={o for i, o in enumerate(options) if discarded >> i & 1})
+        return input_state
+
+    def pick(self, i: int):
+        '''
+        Selects options[i], as Input.recv does. Returns True if the selection
+        was accepted, False otherwise.
+        '''
+        bit = 1 << i
+        counts = self.counts
+        if not self.available & bit or not self.callback(self.options[i]):
+            return False
+        # unless the callback has already set the decision to the next input
+        if self.counts is counts:
+            counts[i] += 1
+            # the callback may have changed max_per_option, so test afterwards
+            if counts[i] >= self.max_per_option:
+                self.available &= ~bit
+        return True
+
+    def recv(self, input_str):
+        '''
+        Selects an option, or the early stopping option, by name, as Input.recv
+        does.
+        '''
+        if self.option_stop_early and input_str == self.option_stop_early:
+            self.callback(input_str)
+            return True
+        i = self.option_index.get(input_str)
+        return i is not None and self.pick(i)
+
+    def remove_option(self, option):
+        '''
+        Removes an option before reps has been exhausted, as for an Input.
+        '''
+        i = self.option_index.get(option)
+        if i is None:
+            raise KeyError('Option was never present!')
+        bit = 1 << i
+        self.discarded |= bit
+        self.available &= ~bit
+
+    def change_max_per_option(self, n: int):
+        self.max_per_option += n
+        limit = self.max_per_option
+        discarded = self.discarded
+        available = 0
+        for i, count in enumerate(self.counts):
+            if count < limit and not discarded >> i & 1:
+                available |= 1 << i
+        self.available = available
+
+    @property
+    def selection(self):
+        '''Returns the number of times each option has been selected, as a dict.'''
+        return dict(zip(self.options, self.counts))
+
+    @property
+    def complete(self):
+        '''
+        Returns True if no more input is required, False if input is not
+        complete.
+        '''
+        return not self.reps or self.discarded == (1 << len(self.options)) - 1
+
+    is_available = Input.is_available
+    available_indices = Input.available_indices
+    available_options = Input.available_options
+    legal_moves = Input.legal_moves
+
+
+class PrintSink:
+    '''
+    Event sink which prints each message of the game engine to stdout.
+    '''
+
+    def emit(self, msg: str, *args):
+        '''
+        Receives a message from the game engine.
+
+        Parameters
+        ----------
+        msg : str
+            The message, as a str.format template if args are given.
+        args
+            Values to format into msg. Formatting is left to the sink, so sinks
+            which discard messages never pay for it.
+        '''
+        print(msg.format(*args) if args else msg)
+
+
+class NullSink:
+    '''
+    Event sink which discards all messages, for headless runs.
+    '''
+
+    def emit(self, msg: str, *args):
+        pass
 
 
 class Output:
@@ -0,0 +1,193 @@
+_MISSING = object()
+
+
+class Journal:
+
+    def __init__(self):
+        '''
+        Records how to reverse each change made to the game state, so that the
+        changes can later be rolled back in reverse order.
+
+        Nothing is recorded until a mark is taken with begin. Every begin must be
+        matched by a rollback, or the journal discarded with clear.
+        '''
+        self.active = False
+        self.entries = []
+        self.marks = []
+
+    def record(self, undo, *args):
+        '''
+        Records a change. undo(*args) is called on rollback to reverse it, and is
+        not itself recorded.
+        '''
+        self.entries.append((undo, args))
+
+    def begin(self):
+        '''Takes a mark which rollback returns to, and starts recording.'''
+        self.marks.append(len(self.entries))
+        self.active = True
+
+    def rollback(self):
+        '''Reverses every change recorded since the most recent mark.'''
+        mark = self.marks.pop()
+        entries = self.entries
+        self.active = False
+        while len(entries) > mark:
+            undo, args = entries.pop()
+            undo(*args)
+        self.active = bool(self.marks)
+
+    def clear(self):
+        '''Discards all marks and recorded changes, and stops recording.'''
+        self.entries.clear()
+        self.marks.clear()
+        self.active = False
+
+    @property
+    def depth(self):
+        return len(self.marks)
+
+
+class Journaled:
+    '''
+    Mixin which records attribute assignments to self.journal while it is active.
+    '''
+
+    journal = None
+
+    def __setattr__(self, name, value):
+        journal = self.journal
+        if journal is not None and journal.active:
+            journal.record(self._restore_attribute, name,
+                           self.__dict__.get(name, _MISSING))
+        object.__setattr__(self, name, value)
+
+    def _restore_attribute(self, name, value):
+        if value is _MISSING:
+            del self.__dict__[name]
+        else:
+            object.__setattr__(self, name, value)
+
+
+class Pile(list):
+    '''
+    A list which records its changes to a Journal. Used for every list which
+    forms part of the game state: piles, hands, baskets, tracks and stage lists.
+
+    Only lists that are modified in place can be reversed, so game code should
+    change the contents of a Pile rather than assign a new list in its place.
+
+    If zobrist is set to a PileHash, the pile's membership is also hashed as
+    items enter and leave it.
+    '''
+
+    __slots__ = ('journal', 'zobrist')
+
+    def __init__(self, journal: Journal = None, iterable=(), zobrist=None):
+        super().__init__(iterable)
+        self.journal = journal
+        # the contents are taken to be hashed already
+        self.zobrist = zobrist
+
+    def __reduce_ex__(self, protocol):
+        return Pile, (self.journal, list(self), self.zobrist)
+
+    def _recording(self):
+        return self.journal is not None and self.journal.active
+
+    def append(self, item):
+        if self._recording():
+            self.journal.record(self.pop)
+        if self.zobrist is not None:
+            self.zobrist.toggle(item)
+        super().append(item)
+
+    def extend(self, iterable):
+        recording = self._recording()
+        if recording or self.zobrist is not None:
+            iterable = list(iterable)
+        if recording:
+            self.journal.record(self.__delitem__, slice(len(self), None))
+        if self.zobrist is not None:
+            self.zobrist.toggle_all(iterable)
+        super().extend(iterable)
+
+    def __iadd__(self, iterable):
+        self.extend(iterable)
+        return self
+
+    def insert(self, index, item):
+        if self._recording():
+            n = len(self)
+            index = min(max(index + n if index < 0 else index, 0), n)
+            self.journal.record(self.pop, index)
+        if self.zobrist is not None:
+            self.zobrist.toggle(item)
+        super().insert(index, item)
+
+    def pop(self, index=-1):
+        item = super().pop(index)
+        if self._recording():
+            self.journal.record(self.insert, index + len(self) + 1
+                                if index < 0 else index, item)
+        if self.zobrist is not None:
+            self.zobrist.toggle(item)
+        return item
+
+    def remove(self, item):
+        index = self.index(item)
+        super().__delitem__(index)
+        if self._recording():
+            self.journal.record(self.insert, index, item)
+        if self.zobrist is not None:
+            self.zobrist.toggle(item)
+
+    def clear(self):
+        if self._recording() and self:
+            self.journal.record(self.extend, tuple(self))
+        if self.zobrist is not None:
+            self.zobrist.toggle_all(self)
+        super().clear()
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            if self._recording() or self.zobrist is not None:
+                value = list(value)
+            if self._recording():
+                start, stop, step = key.indices(len(self))
+                old = self[key]
+                self.journal.record(self.__setitem__, slice(start, start + len(value))
+                                    if step == 1 else key, old)
+            if self.zobrist is not None:
+                self.zobrist.toggle_all(self[key])
+                self.zobrist.toggle_all(value)
+        else:
+            if self._recording():
+                self.journal.record(self.__setitem__, key, self[key])
+            if self.zobrist is not None:
+                self.zobrist.toggle(self[key])
+                self.zobrist.toggle(value)
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        if self._recording():
+            if isinstance(key, slice):
+                start, stop, step = key.indices(len(self))
+                if step != 1:
+                    raise ValueError('Extended slices of a Pile cannot be deleted.')
+                self.journal.record(
+                    self.__setitem__, slice(start, start), self[key])
+            else:
+                n = len(self)
+                self.journal.record(self.insert, key + n if key < 0 else key,
+                                    self[key])
+        if self.zobrist is not None:
+            self.zobrist.toggle_all(self[key] if isinstance(key, slice)
+                                    else (self[key],))
+        super().__delitem__(key)
+
+    def sort(self, *args, **kwargs):
+        self[:] = sorted(self, *args, **kwargs)
+
+    def reverse(self):
+        self[:] = self[::-1]
@@ -1,11 +1,34 @@
+import numpy as np
+
+from copy import deepcopy
 from itertools import chain
 from twilight_enums import Side, MapRegion, InputType, CardAction
+from twilight_zobrist import Zobrist
 
 
 class CountryInfo:
 
     ALL = dict()
-    REGION_ALL = [set() for r in MapRegion]
+    INDEX = dict()
+    # dicts rather than sets, so that countries are iterated in the order they
+    # are defined, whatever PYTHONHASHSEED is
+    REGION_ALL = [dict() for r in MapRegion]
+
+    '''
+    Static arrays parallel to the influence board, indexed by country_index.
+    These are filled in by build_arrays once every country has been created.
+    Row 0 is unused padding since country indices start from 1.
+    '''
+    SIZE = 0
+    NAMES = []
+    VALID = None
+    STABILITY = None
+    BATTLEGROUND = None
+    SUPERPOWER = None
+    REGION = None
+    ADJACENCY = None
+    DEFCON_RESTRICTED = None
+    CONTROL_COUNTS = None
 
     def __init__(self, name='', country_index='', adjacent_countries=None,
                  region='', stability=0, battleground=False, superpower=False,
@@ -20,6 +43,7 @@ class CountryInfo:
         self.chinese_civil_war = chinese_civil_war
 
         CountryInfo.ALL[name] = self
+        CountryInfo.INDEX[country_index] = self
         if region == 'Europe':
             self.regions = [MapRegion.EUROPE,
                             MapRegion.EASTERN_EUROPE, MapRegion.WESTERN_EUROPE]
@@ -46,37 +70,312 @@ class CountryInfo:
             self.regions = []
 
         for r in self.regions:
-            CountryInfo.REGION_ALL[r].add(name)
+            CountryInfo.REGION_ALL[r][name] = self
 
     def __deepcopy__(self, memo):
         return self
 
+    @classmethod
+    def build_arrays(cls):
+        '''
+        Builds the static arrays used by the influence board. Must be called
+        after all CountryInfo objects have been created.
+        '''
+        cls.SIZE = max(cls.INDEX) + 1
+        cls.NAMES = [''] * cls.SIZE
+        cls.VALID = np.zeros(cls.SIZE, dtype=bool)
+        # padding rows get superpower stability so that they are never controlled
+        cls.STABILITY = np.full(cls.SIZE, 999, dtype=np.int32)
+        cls.BATTLEGROUND = np.zeros(cls.SIZE, dtype=bool)
+        cls.SUPERPOWER = np.zeros(cls.SIZE, dtype=bool)
+        cls.REGION = np.zeros((len(MapRegion), cls.SIZE), dtype=bool)
+        # ADJACENCY[i, j] is True if country j is adjacent to country i
+        cls.ADJACENCY = np.zeros((cls.SIZE, cls.SIZE), dtype=bool)
+        # DEFCON_RESTRICTED[d] is True for countries closed to coups and
+        # realignments at DEFCON level d, for d from 0 to 5
+        cls.DEFCON_RESTRICTED = np.zeros((6, cls.SIZE), dtype=bool)
+        # CONTROL_COUNTS[i, c] is the contribution of country i to
+        # GameMap.region_counts while it is controlled by c, a Side
+        cls.CONTROL_COUNTS = np.zeros(
+            (cls.SIZE, len(Side), len(MapRegion), len(Side), 3), dtype=np.int32)
+        # ZOBRIST[i, s, n] is the key of side s having n influence in country i,
+        # with n clipped to Zobrist.MAX_INFLUENCE; no influence has key 0
+        cls.ZOBRIST = np.zeros((cls.SIZE, 2, Zobrist.MAX_INFLUENCE + 1),
+                               dtype=np.uint64)
+
+        for i, info in cls.INDEX.items():
+            cls.NAMES[i] = info.name
+            cls.VALID[i] = True
+            cls.STABILITY[i] = info.stability
+            cls.BATTLEGROUND[i] = info.battleground
+            cls.SUPERPOWER[i] = info.superpower
+            cls.REGION[info.regions, i] = True
+            for c in Side:
+                adjacent = c != Side.NEUTRAL and c.opp.name in info.adjacent_countries
+                cls.CONTROL_COUNTS[i, c, info.regions, c] = (
+                    1, info.battleground, adjacent)
+            for adjacent in info.adjacent_countries:
+                # skips names which are not on the map, e.g. Chinese_Civil_War
+                if adjacent in cls.ALL:
+                    cls.ADJACENCY[i, cls.ALL[adjacent].country_index] = True
+            for side in (Side.USSR, Side.US):
+                for n in range(1, Zobrist.MAX_INFLUENCE + 1):
+                    cls.ZOBRIST[i, side, n] = Zobrist.key(
+                        'influence', info.name, side.name, n)
+        # as ints, which are faster to look up and combine one at a time
+        cls.ZOBRIST_KEYS = cls.ZOBRIST.tolist()
+
+        cls.DEFCON_RESTRICTED[4] = cls.REGION[MapRegion.EUROPE]
+        cls.DEFCON_RESTRICTED[3] = cls.DEFCON_RESTRICTED[4] | cls.REGION[MapRegion.ASIA]
+        cls.DEFCON_RESTRICTED[2] = (cls.DEFCON_RESTRICTED[3]
+                                    | cls.REGION[MapRegion.MIDDLE_EAST])
+
 
 class GameMap:
 
-    def __init__(self):
-        self.ALL = dict()
-        # Create mapping of (k,v) = (country_index, name)
-        for name in CountryInfo.ALL.keys():
-            self.ALL[name] = Country(name)
+    # The Chernobyl basket entries, in the order can_place_influence checks them,
+    # and the region each one closes to influence placement.
+    CHERNOBYL_REGIONS = (
+        ('Chernobyl_Europe', MapRegion.EUROPE),
+        ('Chernobyl_Middle_East', MapRegion.MIDDLE_EAST),
+        ('Chernobyl_Asia', MapRegion.ASIA),
+        ('Chernobyl_Africa', MapRegion.AFRICA),
+        ('Chernobyl_Central_America', MapRegion.CENTRAL_AMERICA),
+        ('Chernobyl_South_America', MapRegion.SOUTH_AMERICA),
+    )
+
+    # NATO-protected masks keyed by whether De_Gaulle_Leads_France and
+    # Willy_Brandt cancel NATO, filled in by nato_mask on first use
+    _NATO_MASKS = dict()
+
+    def __init__(self, journal=None):
+        '''
+        The map holds a single influence board of shape (CountryInfo.SIZE, 2),
+        indexed by country_index, with USSR influence in column 0 and US
+        influence in column 1. Country objects are thin views over a row of
+        the board and are created on first access.
+
+        Parameters
+        ----------
+        journal : Journal, optional
+            If given, changes to influence are recorded to it.
+
+        Attributes
+        ----------
+        control : np.ndarray
+            The controlling side of every row of the board, as control_array.
+        region_counts : np.ndarray
+            Array of shape (len(MapRegion), len(Side), 3). For each region and
+            controlling side (NEUTRAL for uncontrolled), the number of countries,
+            the number of battlegrounds, and the number of countries adjacent to
+            the opposing superpower.
+
+        Both are kept up to date by Country.set_influence, which adjusts them
+        only when a country changes control. After writing to self.influence
+        directly, call recount.
+
+        zobrist : int
+            The Zobrist hash of the board, the xor of CountryInfo.ZOBRIST over
+            the influence of every country, also kept up to date by
+            Country.set_influence and recount.
+        '''
+        self.influence = np.zeros((CountryInfo.SIZE, 2), dtype=np.int32)
+        self.journal = journal
+        self._views = dict()
+        self.recount()
 
     def __getitem__(self, item):
-        return self.ALL[item]
+        try:
+            return self._views[item]
+        except KeyError:
+            country = self._views[item] = Country(item, self)
+            return country
+
+    def __deepcopy__(self, memo):
+        other = self.copy()
+        other.journal = deepcopy(self.journal, memo)
+        return other
+
+    def copy(self):
+        '''Returns an independent copy of the map. Only the board is copied.'''
+        other = GameMap.__new__(GameMap)
+        other.influence = self.influence.copy()
+        other.control = self.control.copy()
+        other.region_counts = self.region_counts.copy()
+        other.zobrist = self.zobrist
+        other.journal = None
+        other._views = dict()
+        return other
+
+    def get_state(self):
+        '''Returns a copy of the board and its counts, for set_state.'''
+        return (self.influence.copy(), self.control.copy(),
+                self.region_counts.copy(), self.zobrist)
+
+    def set_state(self, state):
+        '''Writes a state returned by get_state back into the map in place.'''
+        influence, control, region_counts, self.zobrist = state
+        self.influence[:] = influence
+        self.control[:] = control
+        self.region_counts[:] = region_counts
+
+    def recount(self):
+        '''Recomputes control, region_counts and zobrist from the board.'''
+        self.control = self.control_array()
+        self.region_counts = CountryInfo.CONTROL_COUNTS[
+            np.arange(CountryInfo.SIZE), self.control].sum(axis=0)
+        levels = np.minimum(self.influence, Zobrist.MAX_INFLUENCE)
+        rows = np.arange(CountryInfo.SIZE)[:, None]
+        self.zobrist = int(np.bitwise_xor.reduce(
+            CountryInfo.ZOBRIST[rows, (Side.USSR, Side.US), levels], axis=None))
+
+    def update_control(self, info, ussr_influence: int, us_influence: int):
+        '''
+        Updates control and region_counts after the influence of the country
+        with CountryInfo info has been set. Called by Country.set_influence.
+        '''
+        if us_influence - ussr_influence >= info.stability:
+            control = Side.US
+        elif ussr_influence - us_influence >= info.stability:
+            control = Side.USSR
+        else:
+            control = Side.NEUTRAL
+
+        index = info.country_index
+        previous = self.control[index]
+        if control != previous:
+            self.control[index] = control
+            counts = CountryInfo.CONTROL_COUNTS[index]
+            self.region_counts += counts[control] - counts[previous]
+
+    def update_hash(self, info, previous: tuple, ussr_influence: int,
+                    us_influence: int):
+        '''
+        Updates zobrist after the influence of the country with CountryInfo info
+        has been set from previous, a (USSR, US) pair. Called by
+        Country.set_influence.
+        '''
+        keys = CountryInfo.ZOBRIST_KEYS[info.country_index]
+        m = Zobrist.MAX_INFLUENCE
+        ussr_keys, us_keys = keys
+        self.zobrist ^= (ussr_keys[min(previous[0], m)] ^ ussr_keys[min(ussr_influence, m)]
+                         ^ us_keys[min(previous[1], m)] ^ us_keys[min(us_influence, m)])
+
+    def names(self, mask):
+        '''Returns the list of country names for rows of the board where mask is True.'''
+        return [CountryInfo.NAMES[i] for i in np.flatnonzero(mask)]
+
+    def control_array(self):
+        '''
+        Returns the controlling side of every row of the board as an int array,
+        using the same values as Side. Padding rows are NEUTRAL.
+        '''
+        ussr = self.influence[:, Side.USSR]
+        us = self.influence[:, Side.US]
+        control = np.full(CountryInfo.SIZE, Side.NEUTRAL, dtype=np.int8)
+        control[us - ussr >= CountryInfo.STABILITY] = Side.US
+        control[ussr - us >= CountryInfo.STABILITY] = Side.USSR
+        return control
 
     def has_influence(self, side: Side):
         '''Returns list of names that have influence from side, less superpowers..'''
-        return (n for n, c in self.ALL.items()
-                if c.has_influence(side) and not c.info.superpower)
+        return iter(self.names((self.influence[:, side] > 0) & ~CountryInfo.SUPERPOWER))
 
     @property
     def has_us_influence(self):
         '''Returns list of names that have US influence, less superpowers..'''
-        return [country.info.name for country in self.ALL.values() if country.influence[Side.US] > 0 and country.info.superpower == False]
+        return self.names((self.influence[:, Side.US] > 0) & ~CountryInfo.SUPERPOWER)
 
     @property
     def has_ussr_influence(self):
         '''Returns list of names that have USSR influence, less superpowers..'''
-        return [country.info.name for country in self.ALL.values() if country.influence[Side.USSR] > 0 and country.info.superpower == False]
+        return self.names((self.influence[:, Side.USSR] > 0) & ~CountryInfo.SUPERPOWER)
+
+    def nato_mask(self, game_instance):
+        '''
+        Returns the countries of calculate_nato_countries as a boolean array over
+        the rows of the board. The array is cached, and shared between games, for
+        each combination of De_Gaulle_Leads_France and Willy_Brandt cancelling
+        NATO, so it must not be modified.
+        '''
+        nato = 'NATO' in game_instance.basket[Side.US]
+        key = (nato and 'De_Gaulle_Leads_France' in game_instance.basket[Side.USSR],
+               nato and 'Willy_Brandt' in game_instance.basket[Side.USSR])
+        try:
+            return GameMap._NATO_MASKS[key]
+        except KeyError:
+            mask = CountryInfo.REGION[MapRegion.EUROPE].copy()
+            if key[0]:
+                mask[CountryInfo.ALL['France'].country_index] = False
+            if key[1]:
+                mask[CountryInfo.ALL['West_Germany'].country_index] = False
+            mask.flags.writeable = False
+            GameMap._NATO_MASKS[key] = mask
+            return mask
+
+    @staticmethod
+    def defcon_restricted(game_instance):
+        '''
+        Returns the countries closed to coups and realignments at the current
+        DEFCON level as a boolean array over the rows of the board, which must not
+        be modified.
+        '''
+        return CountryInfo.DEFCON_RESTRICTED[
+            min(max(game_instance.defcon_track, 0), 5)]
+
+    def _restricted_mask(self, game_instance, reformer: bool):
+        '''
+        Returns the countries where coups (reformer=True) or realignments
+        (reformer=False) are forbidden by DEFCON, NATO,
+        US_Japan_Mutual_Defense_Pact and, for coups, The_Reformer.
+        '''
+        mask = self.defcon_restricted(game_instance).copy()
+        if 'NATO' in game_instance.basket[Side.US]:
+            mask |= self.nato_mask(game_instance)
+        if 'US_Japan_Mutual_Defense_Pact' in game_instance.basket[Side.US]:
+            mask[CountryInfo.ALL['Japan'].country_index] = True
+        if reformer and 'The_Reformer' in game_instance.basket[Side.USSR]:
+            mask |= CountryInfo.DEFCON_RESTRICTED[4]
+        return mask
+
+    def coupable_mask(self, game_instance, side: Side, free=False):
+        '''
+        Returns a boolean array over the rows of the board, True for every country
+        where can_coup would return True.
+
+        Parameters
+        ----------
+        game_instance : Game object
+            The game object the map resides within.
+        side : Side
+            Player side which we are checking. Can be Side.US or Side.USSR.
+        free : bool
+            Whether the coup is free, which lifts all restrictions.
+        '''
+        mask = (self.influence[:, side.opp] > 0) & CountryInfo.VALID & ~CountryInfo.SUPERPOWER
+        if not free:
+            mask &= ~self._restricted_mask(game_instance, reformer=True)
+        return mask
+
+    def realignable_mask(self, game_instance, side: Side, free=False):
+        '''
+        Returns a boolean array over the rows of the board, True for every country
+        where can_realignment would return True.
+
+        Parameters
+        ----------
+        game_instance : Game object
+            The game object the map resides within.
+        side : Side
+            Player side which we are checking. Can be Side.US or Side.USSR.
+        free : bool
+            Whether the realignment is free, which lifts all restrictions.
+        '''
+        # as for coups, realignment needs opposing influence in the country
+        mask = (self.influence[:, side.opp] > 0) & CountryInfo.VALID & ~CountryInfo.SUPERPOWER
+        if not free:
+            mask &= ~self._restricted_mask(game_instance, reformer=False)
+        return mask
 
     def can_coup(self, game_instance, name: str, side: Side, free=False) -> bool:
         '''
@@ -100,24 +399,17 @@ class GameMap:
         if country.info.superpower:
             return False
 
-        d4 = list(CountryInfo.REGION_ALL[MapRegion.EUROPE])
-        d3 = d4 + list(CountryInfo.REGION_ALL[MapRegion.ASIA])
-        d2 = d3 + list(CountryInfo.REGION_ALL[MapRegion.MIDDLE_EAST])
-
+        index = country.info.country_index
         if free:
             return not (side == Side.US and country.influence[Side.USSR] == 0 or
                         side == Side.USSR and country.influence[Side.US] == 0)
-        elif 'NATO' in game_instance.basket[Side.US] and name in game_instance.calculate_nato_countries():
+        elif 'NATO' in game_instance.basket[Side.US] and self.nato_mask(game_instance)[index]:
             return False
         elif 'US_Japan_Mutual_Defense_Pact' in game_instance.basket[Side.US] and name == 'Japan':
             return False
-        elif 'The_Reformer' in game_instance.basket[Side.USSR] and name in d4:
-            return False
-        elif game_instance.defcon_track == 4 and name in d4:
-            return False
-        elif game_instance.defcon_track == 3 and name in d3:
+        elif 'The_Reformer' in game_instance.basket[Side.USSR] and CountryInfo.DEFCON_RESTRICTED[4, index]:
             return False
-        elif game_instance.defcon_track == 2 and name in d2:
+        elif self.defcon_restricted(game_instance)[index]:
             return False
 
         return not (side == Side.US and country.influence[Side.USSR] == 0 or
@@ -180,8 +472,8 @@ class GameMap:
             if side == Side.US:
                 country.change_influence(-min(difference, country.influence[Side.USSR]), max(
                     0, difference - country.influence[Side.USSR]))
-        print(
-            f'Coup {outcome} with roll of {die_roll}. Difference: {difference}')
+        game_instance.sink.emit('Coup {} with roll of {}. Difference: {}',
+                                outcome, die_roll, difference)
 
         # Cuban Missile Crisis overrides Nuclear Subs
         if 'Cuban_Missile_Crisis' in game_instance.basket[side.opp]:
@@ -218,22 +510,15 @@ class GameMap:
         if country.info.superpower:
             return False
 
-        d4 = list(CountryInfo.REGION_ALL[MapRegion.EUROPE])
-        d3 = d4 + list(CountryInfo.REGION_ALL[MapRegion.ASIA])
-        d2 = d3 + list(CountryInfo.REGION_ALL[MapRegion.MIDDLE_EAST])
-
+        index = country.info.country_index
         if free:
             return not (side == Side.US and country.influence[Side.USSR] == 0 or
                         side == Side.USSR and country.influence[Side.US] == 0)
-        elif 'NATO' in game_instance.basket[Side.US] and name in game_instance.calculate_nato_countries():
+        elif 'NATO' in game_instance.basket[Side.US] and self.nato_mask(game_instance)[index]:
             return False
         elif 'US_Japan_Mutual_Defense_Pact' in game_instance.basket[Side.US] and name == 'Japan':
             return False
-        elif game_instance.defcon_track == 4 and name in d4:
-            return False
-        elif game_instance.defcon_track == 3 and name in d3:
-            return False
-        elif game_instance.defcon_track == 2 and name in d2:
+        elif self.defcon_restricted(game_instance)[index]:
             return False
 
         if side == Side.USSR and country.ussr_influence_only:
@@ -278,8 +563,9 @@ class GameMap:
             country.change_influence(0, -difference)
         elif difference < 0:
             country.change_influence(difference, 0)
-        print(
-            f'USSR rolled: {ussr_roll}, US rolled: {us_roll}, ussr_advantage = {ussr_advantage}, Difference = {difference}')
+        game_instance.sink.emit(
+            'USSR rolled: {}, US rolled: {}, ussr_advantage = {}, Difference = {}',
+            ussr_roll, us_roll, ussr_advantage, difference)
 
 
 
@@ -338,6 +624,37 @@ class GameMap:
 
         return has_influence_around(country) and sufficient_ops(effective_ops) and is_chernobyl()
 
+    def placeable_mask(self, game_instance, side: Side, effective_ops: int):
+        '''
+        Returns a boolean array over the rows of the board, True for every country
+        where can_place_influence would return True. All countries are checked at
+        once from the board and CountryInfo.ADJACENCY. Pass the result to names,
+        or to np.flatnonzero for the country indices.
+
+        Parameters
+        ----------
+        game_instance : Game object
+            The game object the map resides within.
+        side : Side
+            Player side which we are checking. Can be Side.US or Side.USSR.
+        effective_ops : int
+            The number of effective operations used to place influence.
+        '''
+        own = self.influence[:, side]
+        present = own > 0
+        mask = present | CountryInfo.ADJACENCY[:, present].any(axis=1)
+        mask &= CountryInfo.VALID & ~CountryInfo.SUPERPOWER
+
+        if effective_ops < 2:
+            # not controlled by the opponent
+            mask &= self.influence[:, side.opp] - own < CountryInfo.STABILITY
+
+        for card_name, region in GameMap.CHERNOBYL_REGIONS:
+            if card_name in game_instance.basket[Side.US]:
+                mask &= ~CountryInfo.REGION[region]
+                break
+        return mask
+
     def place_influence(self, name: str, side: Side, effective_ops: int):
         '''
         The action of placing influence into a country.
@@ -507,9 +824,18 @@ class GameMap:
 
 class Country:
 
-    def __init__(self, name: str):
+    __slots__ = ('info', 'influence', 'journal', 'game_map')
+
+    def __init__(self, name: str, game_map: GameMap = None):
         self.info = CountryInfo.ALL[name]
-        self.influence = [0, 0]  # ussr, then us influence
+        self.game_map = game_map
+        if game_map is None:
+            self.influence = np.zeros(2, dtype=np.int32)  # ussr, then us influence
+            self.journal = None
+        else:
+            # view over this country's row of the board
+            self.influence = game_map.influence[self.info.country_index]
+            self.journal = game_map.journal
 
     def __repr__(self):
         if self.info.stability == 0:
@@ -538,20 +864,23 @@ class Country:
 
     @property
     def control(self):
-        if self.influence[Side.US] - self.influence[Side.USSR] >= self.info.stability:
+        ussr, us = self.influence.tolist()
+        if us - ussr >= self.info.stability:
             return Side.US
-        elif self.influence[Side.USSR] - self.influence[Side.US] >= self.info.stability:
+        elif ussr - us >= self.info.stability:
             return Side.USSR
         else:
             return Side.NEUTRAL
 
     @property
     def us_influence_only(self):
-        return self.influence[Side.US] > 0 and self.influence[Side.USSR] == 0
+        ussr, us = self.influence.tolist()
+        return us > 0 and ussr == 0
 
     @property
     def ussr_influence_only(self):
-        return self.influence[Side.USSR] > 0 and self.influence[Side.US] == 0
+        ussr, us = self.influence.tolist()
+        return ussr > 0 and us == 0
 
     def has_influence(self, side):
         return self.influence[side]
@@ -565,39 +894,51 @@ class Country:
         return self.influence[Side.USSR] > 0
 
     def set_influence(self, ussr_influence, us_influence):
-        self.influence[Side.US] = us_influence
+        '''
+        Writes both influence values of this country. All other methods that
+        modify influence go through this method.
+        '''
+        previous = self.influence.tolist()
+        if self.journal is not None and self.journal.active:
+            self.journal.record(self.set_influence, *previous)
         self.influence[Side.USSR] = ussr_influence
+        self.influence[Side.US] = us_influence
+        if self.game_map is not None:
+            self.game_map.update_control(self.info, ussr_influence, us_influence)
+            self.game_map.update_hash(self.info, previous, ussr_influence,
+                                      us_influence)
+
+    def _set_side_influence(self, side, influence):
+        inf = self.influence.tolist()
+        inf[side] = influence
+        self.set_influence(*inf)
 
     def reset_influence(self):
-        self.influence[Side.US] = 0
-        self.influence[Side.USSR] = 0
+        self.set_influence(0, 0)
 
     def change_influence(self, ussr_influence: int, us_influence: int):
-        self.influence[Side.US] += us_influence
-        self.influence[Side.USSR] += ussr_influence
-        if self.influence[Side.US] < 0:
-            self.influence[Side.US] = 0
-        if self.influence[Side.USSR] < 0:
-            self.influence[Side.USSR] = 0
+        ussr, us = self.influence.tolist()
+        self.set_influence(max(ussr + ussr_influence, 0),
+                           max(us + us_influence, 0))
 
     def remove_influence(self, side):
         if self.influence[side] == 0:
             return False
-        self.influence[side] = 0
+        self._set_side_influence(side, 0)
         return True
 
     def increment_influence(self, side, amt=1):
-        self.influence[side] += amt
+        self._set_side_influence(side, self.influence[side] + amt)
         return True
 
     def decrement_influence(self, side, amt=1):
         if self.influence[side] == 0:
             return False
-        self.influence[side] = max(self.influence[side] - amt, 0)
+        self._set_side_influence(side, max(self.influence[side] - amt, 0))
         return True
 
     def match_influence(self, side):
-        self.influence[side] = self.influence[side.opp]
+        self._set_side_influence(side, self.influence[side.opp])
         return True
 
     def coup_influence(self, side: Side, swing: int):
@@ -609,12 +950,14 @@ class Country:
         swing: int
             The coup value.
         '''
-        opp_inf = self.influence[side.opp] - swing
+        inf = self.influence.tolist()
+        opp_inf = inf[side.opp] - swing
         if opp_inf < 0:
-            self.influence[side.opp] = 0
-            self.influence[side] -= opp_inf
+            inf[side.opp] = 0
+            inf[side] -= opp_inf
         else:
-            self.influence[side.opp] = opp_inf
+            inf[side.opp] = opp_inf
+        self.set_influence(*inf)
 
 USSR = {
     'name': 'USSR',
@@ -1675,3 +2018,5 @@ Bolivia = CountryInfo(**Bolivia)
 Brazil = CountryInfo(**Brazil)
 Venezuela = CountryInfo(**Venezuela)
 # Chinese_Civil_War = CountryInfo(**Chinese_Civil_War)
+
+CountryInfo.build_arrays()
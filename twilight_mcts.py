@@ -0,0 +1,583 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+'''
+Monte Carlo Tree Search over the stage/Input state machine of Game. Usage:
+
+    python twilight_mcts.py [playouts] [seed]
+
+plays the first moves of a game with MCTS as both sides.
+'''
+
+import sys
+import math
+import random
+import threading
+import multiprocessing
+
+from collections import Counter
+from time import perf_counter
+from typing import Callable
+
+from game_mechanics import Game
+from twilight_enums import Side
+from twilight_input_output import NullSink
+from twilight_transposition import TranspositionTable
+
+
+def random_policy(game: Game, rng: random.Random):
+    '''Rollout policy which selects a legal move uniformly at random.'''
+    return rng.choice(game.input_state.legal_moves())
+
+
+def vp_evaluation(game: Game):
+    '''
+    Evaluates a game which has not ended by its VP track, from -1 (US
+    victory) to 1 (USSR victory).
+    '''
+    return max(-1.0, min(1.0, game.vp_track / 20))
+
+
+def game_value(game: Game):
+    '''Returns the result of an ended game: 1 for USSR, -1 for US, else 0.'''
+    if game.winner == Side.USSR:
+        return 1.0
+    if game.winner == Side.US:
+        return -1.0
+    return 0.0
+
+
+class Node:
+
+    # transposition tables hold nodes by weak reference
+    __slots__ = ('side', 'visits', 'value', 'result', 'children', 'untried',
+                 'outcomes', 'weights', 'key', '__weakref__')
+
+    def __init__(self, game: Game, rng: random.Random):
+        '''
+        A node of the search tree, for the position game is in.
+
+        A decision node has the side to move, and a child for each of its legal
+        moves that has been tried. A chance node (Side.NEUTRAL) has the outcomes
+        of the input and their probabilities, and a child for each outcome that
+        has been sampled. A terminal node, for a game with a winner or without
+        input, has side None, and the result of the game in result.
+
+        value is the sum of the results of the playouts through the node, from
+        the USSR's point of view, so its mean is in [-1, 1]. key is the
+        position's Game.zobrist_hash, if the search has a transposition table.
+        '''
+        self.key = None
+        self.visits = 0
+        self.value = 0.0
+        self.result = None
+        self.children = dict()
+        self.untried = None
+        self.outcomes = self.weights = None
+
+        input_state = game.input_state
+        # a winner may be declared with an input still pending
+        if game.winner is not None or input_state is None or input_state.complete:
+            self.side = None
+            self.result = game_value(game)
+        elif input_state.side == Side.NEUTRAL:
+            self.side = Side.NEUTRAL
+            self.outcomes, self.weights = game.chance_outcomes()
+        else:
+            self.side = input_state.side
+            self.untried = input_state.legal_moves()
+            rng.shuffle(self.untried)
+            if not self.untried:
+                # an input without legal moves ends the game as a draw
+                self.side = None
+                self.result = 0.0
+
+    @property
+    def moves(self):
+        '''Returns the moves of a decision node, tried or not.'''
+        return set(self.children).union(self.untried or ())
+
+    def matches(self, game: Game):
+        '''
+        Returns whether the node has the same kind and moves as the position
+        game is in, so that it can stand for it.
+        '''
+        input_state = game.input_state
+        ended = game.winner is not None or input_state is None or input_state.complete
+        if ended or self.side is None:
+            return self.side is None and ended
+        if input_state.side == Side.NEUTRAL:
+            return (self.side == Side.NEUTRAL
+                    and self.outcomes == game.chance_outcomes()[0])
+        return self.side == input_state.side and self.moves == set(input_state.legal_moves())
+
+
+class MCTS:
+
+    def __init__(self, policy: Callable[[Game, random.Random], str] = None,
+                 evaluate: Callable[[Game], float] = None, c: float = 1.4,
+                 max_rollout: int = 400, seed=None,
+                 table: TranspositionTable = None):
+        '''
+        Monte Carlo Tree Search with UCT selection and rollouts.
+
+        Side.NEUTRAL inputs (dice, shuffles and random discards) are chance nodes,
+        whose outcomes are sampled by their probabilities; Side.USSR and Side.US
+        inputs are decision nodes. During a search the game is put in manual_rng
+        mode, so that dice and shuffles are chance nodes too, rather than being
+        drawn from the game's RNG inside a move. Rollouts run in the rollout
+        mode of Game.playout instead, which draws them inside the moves.
+
+        Moves are made with Game.apply and reversed with Game.undo, so the
+        searched game is left unchanged. The search sees the whole game state,
+        including the opponent's hand.
+
+        Parameters
+        ----------
+        policy : Callable[[Game, random.Random], str], optional
+            Rollout policy, which returns one of the legal moves of the game's
+            decision input. By default random_policy.
+        evaluate : Callable[[Game], float], optional
+            Value of a rollout cut off after max_rollout moves, from -1 (US) to 1
+            (USSR). By default vp_evaluation.
+        c : float
+            UCT exploration constant, by default 1.4.
+        max_rollout : int
+            Number of decisions after which a rollout is evaluated, by default
+            400. Chance outcomes are not counted.
+        seed : optional
+            Seed of the search's own random source, for chance outcomes,
+            rollouts and move ordering.
+        table : TranspositionTable, optional
+            If given, positions reached by different orders of moves, e.g. the
+            same influence placed in another order, share one node, found by
+            Game.zobrist_hash. The statistics of each node are written to the
+            table as they are backed up.
+        '''
+        self.policy = random_policy if policy is None else policy
+        self.evaluate = vp_evaluation if evaluate is None else evaluate
+        self.c = c
+        self.max_rollout = max_rollout
+        self.rng = random.Random(seed)
+        self.table = table
+        self.root = None
+        self.nodes = 0
+        self.playouts = 0
+        self.errors = 0
+
+    def reset(self):
+        '''Discards the tree.'''
+        self.root = None
+
+    def advance(self, move: str):
+        '''
+        Moves the root of the tree to the child reached by move, keeping its
+        subtree for the next search. Call this for every move sent to the game,
+        including chance outcomes; the tree is discarded if the child has not
+        been visited.
+        '''
+        if self.root is not None:
+            self.root = self.root.children.get(move)
+
+    def search(self, game: Game, nodes: int = None, seconds: float = None,
+               playouts: int = None):
+        '''
+        Searches from the current position of game, and returns the most
+        visited move. The game must be at a decision input.
+
+        At least one budget must be given. The search stops when any is spent,
+        or when every move from the root has been found to raise an engine
+        error.
+
+        Parameters
+        ----------
+        nodes : int, optional
+            Number of nodes to add to the tree.
+        seconds : float, optional
+            Wall-clock time to search for.
+        playouts : int, optional
+            Number of playouts to run.
+        '''
+        if nodes is None and seconds is None and playouts is None:
+            raise ValueError('A node, time or playout budget is required.')
+        if not game.advance():
+            raise ValueError('The game has ended.')
+        if game.input_state.side == Side.NEUTRAL:
+            raise ValueError('The current input is a chance node.')
+
+        if self.root is None or not self.root.matches(game):
+            self.root = self._expand(game, [])[0]
+        root = self.root
+
+        budget = (None if nodes is None else self.nodes + nodes,
+                  None if playouts is None else self.playouts + playouts,
+                  None if seconds is None else perf_counter() + seconds)
+        manual_rng = game.manual_rng
+        game.manual_rng = True
+        try:
+            self._run(game, budget)
+        finally:
+            game.manual_rng = manual_rng
+
+        move = self.best_move()
+        if self.table is not None and root.key is not None:
+            self.table.store(root.key, root.visits, root.value, root.visits,
+                             move, root)
+        return move
+
+    def _run(self, game: Game, budget):
+        while not self._spent(budget):
+            self.playout(game)
+
+    def _spent(self, budget):
+        nodes, playouts, deadline = budget
+        root = self.root
+        return (not (root.untried or root.children)
+                or nodes is not None and self.nodes >= nodes
+                or playouts is not None and self.playouts >= playouts
+                or deadline is not None and perf_counter() >= deadline)
+
+    def best_move(self):
+        '''Returns the most visited move of the root.'''
+        if self.root is None or not self.root.children:
+            return None
+        return max(self.root.children.items(), key=lambda kv: kv[1].visits)[0]
+
+    def visits(self):
+        '''Returns the visit count of each move of the root.'''
+        if self.root is None:
+            return dict()
+        return {move: child.visits for move, child in self.root.children.items()}
+
+    def playout(self, game: Game):
+        '''
+        Runs one selection, expansion, rollout and backup from the root, and
+        restores game.
+        '''
+        depth = len(game.undo_tokens)
+        path = [self.root]
+        try:
+            value = self._descend(game, path)
+            if value is None:
+                value = self.rollout(game)
+        finally:
+            while len(game.undo_tokens) > depth:
+                game.undo(game.undo_tokens[-1])
+
+        self._backup(path, value)
+
+    def _backup(self, path: list, value: float):
+        self.playouts += 1
+        table = self.table
+        for node in path:
+            node.visits += 1
+            node.value += value
+            if table is not None and node.key is not None:
+                table.store(node.key, node.visits, node.value, node.visits,
+                            payload=node)
+
+    def _expand(self, game: Game, path: list):
+        '''
+        Returns the node for the position game is in, and whether it is new.
+        With a transposition table, the node of the same position reached by
+        other moves is returned if it is still in the table and is not on path.
+        '''
+        table = self.table
+        if table is not None:
+            key = game.zobrist_hash()
+            node = table.payload(key)
+            if (node is not None and node.matches(game)
+                    and all(node is not n for n in path)):
+                return node, False
+
+        node = Node(game, self.rng)
+        self.nodes += 1
+        if table is not None:
+            node.key = key
+            table.store(key, payload=node)
+        return node, True
+
+    def _descend(self, game: Game, path: list):
+        '''
+        Selects and applies moves from path[-1], appending the nodes reached to
+        path, until a node is added or a terminal node is reached. Returns the
+        value of the playout, or None if the new node must be rolled out.
+        '''
+        node = path[-1]
+        while node.side is not None:
+            move = self._select(node)
+            try:
+                game.apply(move)
+            except Exception:
+                # prune the move, and score the playout as a draw
+                self.errors += 1
+                self._prune(node, move)
+                return 0.0
+
+            child = node.children.get(move)
+            if child is None:
+                child, new = self._expand(game, path)
+                node.children[move] = child
+                if new:
+                    path.append(child)
+                    return child.result
+            elif self.table is not None and any(child is n for n in path):
+                # shared nodes can close a cycle, so roll out from here instead
+                return None
+            node = child
+            path.append(node)
+        return node.result
+
+    def _select(self, node: Node):
+        if node.side == Side.NEUTRAL:
+            return self.rng.choices(node.outcomes, node.weights)[0]
+        if node.untried:
+            return node.untried.pop()
+
+        sign = 1.0 if node.side == Side.USSR else -1.0
+        log_n = math.log(node.visits)
+        c = self.c
+
+        def uct(kv):
+            child = kv[1]
+            if not child.visits:
+                return math.inf
+            return (sign * child.value / child.visits
+                    + c * math.sqrt(log_n / child.visits))
+        return max(node.children.items(), key=uct)[0]
+
+    @staticmethod
+    def _prune(node: Node, move: str):
+        node.children.pop(move, None)
+        if node.side == Side.NEUTRAL:
+            outcomes = [(o, w) for o, w in zip(node.outcomes, node.weights) if o != move]
+            node.outcomes = tuple(o for o, _ in outcomes)
+            node.weights = tuple(w for _, w in outcomes)
+            if node.outcomes:
+                return
+        elif node.children or node.untried:
+            return
+        # nothing is left to play, so the node ends the game as a draw
+        node.side = None
+        node.result = 0.0
+
+    def rollout(self, game: Game, rng: random.Random = None):
+        '''
+        Plays game on with the rollout policy in the rollout mode of
+        Game.playout, and returns the result from the USSR's point of view.
+        Dice and shuffles are drawn inside the moves, from the game's RNG
+        reseeded from rng. The playout is left for the caller to undo. rng is
+        the random source of the rollout, by default self.rng.
+        '''
+        rng = self.rng if rng is None else rng
+        if self.policy is random_policy:
+            def policy(game, moves):
+                return rng.randrange(len(moves))
+        else:
+            def policy(game, moves):
+                # the decision lists its legal moves in the order of moves
+                return game.input_state.legal_moves().index(self.policy(game, rng))
+
+        try:
+            game.playout(policy, self.max_rollout, seed=rng.getrandbits(64))
+        except Exception:
+            # an engine error, or an input without legal moves
+            self.errors += 1
+            return self.evaluate(game)
+        if game.winner is not None or not game.advance():
+            return game_value(game)
+        return self.evaluate(game)
+
+
+def clone(game: Game):
+    '''
+    Returns an independent copy of game, by a Game.to_bytes round trip. The
+    copy shares the game's sink.
+    '''
+    return Game.from_bytes(game.to_bytes(), sink=game.sink)
+
+
+class TreeParallelMCTS(MCTS):
+
+    def __init__(self, threads: int, virtual_loss: float = 1.0, **kwargs):
+        '''
+        MCTS with one tree shared by several threads. Each thread plays out on
+        its own clone of the game. Selection and backup hold a lock, while
+        rollouts run in parallel.
+
+        Each node on the path of a playout in progress is given a virtual loss
+        for the side which chose it, so that other threads are steered to other
+        branches until the playout is backed up.
+
+        Threads share the GIL, so this only gains when rollouts release it, e.g.
+        a policy which runs a model.
+
+        Parameters
+        ----------
+        threads : int
+            Number of threads.
+        virtual_loss : float
+            Loss added to each node on the path of a playout in progress, by
+            default 1.0 (a lost game).
+        **kwargs
+            As for MCTS.
+        '''
+        super().__init__(**kwargs)
+        self.threads = threads
+        self.virtual_loss = virtual_loss
+        self.lock = threading.Lock()
+
+    def _run(self, game: Game, budget):
+        clones = [clone(game) for _ in range(self.threads)]
+        rngs = [random.Random(self.rng.getrandbits(64)) for _ in clones]
+        errors = []
+
+        def work(game, rng):
+            try:
+                while True:
+                    with self.lock:
+                        if self._spent(budget):
+                            return
+                    self._parallel_playout(game, rng)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=args)
+                   for args in zip(clones, rngs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+
+    def _parallel_playout(self, game: Game, rng: random.Random):
+        depth = len(game.undo_tokens)
+        path = [self.root]
+        try:
+            with self.lock:
+                value = self._descend(game, path)
+                self._add_virtual_loss(path, 1)
+            if value is None:
+                value = self.rollout(game, rng)
+        finally:
+            while len(game.undo_tokens) > depth:
+                game.undo(game.undo_tokens[-1])
+
+        with self.lock:
+            self._add_virtual_loss(path, -1)
+            self._backup(path, value)
+
+    def _add_virtual_loss(self, path: list, n: int):
+        loss = n * self.virtual_loss
+        path[0].visits += n
+        for parent, node in zip(path, path[1:]):
+            node.visits += n
+            if parent.side == Side.USSR:
+                node.value -= loss
+            elif parent.side == Side.US:
+                node.value += loss
+
+
+class RootParallelMCTS:
+
+    def __init__(self, workers: int, seed=None, context: str = None, **kwargs):
+        '''
+        Runs an independent MCTS in each of a pool of worker processes, and
+        merges the visit counts of their root moves.
+
+        Each search sends the game to the workers as Game.to_bytes, so trees are
+        not kept between searches. Call close, or use as a context manager, to
+        stop the pool.
+
+        Parameters
+        ----------
+        workers : int
+            Number of worker processes.
+        seed : optional
+            Seed from which the seed of each worker's search is drawn.
+        context : str, optional
+            multiprocessing start method, by default the platform default.
+        **kwargs
+            As for MCTS. policy and evaluate must be picklable.
+        '''
+        self.workers = workers
+        self.kwargs = kwargs
+        self.rng = random.Random(seed)
+        self.pool = multiprocessing.get_context(context).Pool(workers)
+        self.counts = Counter()
+        self.nodes = 0
+        self.playouts = 0
+        self.errors = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        '''Stops the worker processes.'''
+        self.pool.close()
+        self.pool.join()
+
+    def search(self, game: Game, nodes: int = None, seconds: float = None,
+               playouts: int = None):
+        '''
+        As MCTS.search, with the node and playout budgets split between the
+        workers, and the time budget given to each.
+        '''
+        if nodes is None and seconds is None and playouts is None:
+            raise ValueError('A node, time or playout budget is required.')
+        data = game.to_bytes()
+        nodes, playouts = (None if n is None else -(-n // self.workers)
+                           for n in (nodes, playouts))
+        jobs = [(data, self.kwargs, self.rng.getrandbits(64), nodes, seconds,
+                 playouts) for _ in range(self.workers)]
+
+        self.counts = Counter()
+        for visits, nodes, playouts, errors in self.pool.map(_root_search, jobs):
+            self.counts.update(visits)
+            self.nodes += nodes
+            self.playouts += playouts
+            self.errors += errors
+        return self.best_move()
+
+    def best_move(self):
+        '''Returns the move with the most visits over all workers.'''
+        return max(self.counts, key=self.counts.get) if self.counts else None
+
+    def visits(self):
+        '''Returns the visit count of each root move, summed over the workers.'''
+        return dict(self.counts)
+
+
+def _root_search(job):
+    '''Runs the search of one RootParallelMCTS worker.'''
+    data, kwargs, seed, nodes, seconds, playouts = job
+    search = MCTS(seed=seed, **kwargs)
+    search.search(Game.from_bytes(data), nodes, seconds, playouts)
+    return search.visits(), search.nodes, search.playouts, search.errors
+
+
+if __name__ == '__main__':
+    playouts = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    game = Game(NullSink(), seed=seed, manual_rng=True)
+    game.start()
+    search = MCTS(seed=seed)
+    for _ in range(12):
+        if not game.advance():
+            break
+        if game.input_state.side == Side.NEUTRAL:
+            move = game.sample_chance()
+        else:
+            start = perf_counter()
+            move = search.search(game, nodes=playouts)
+            elapsed = perf_counter() - start
+            print(f'{game.input_state.side.toStr():<5}{move:<32}'
+                  f'{search.playouts / elapsed:8.0f} playouts/s')
+            search.playouts = 0
+        game.input_state.recv(move)
+        search.advance(move)
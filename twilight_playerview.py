@@ -1,3 +1,4 @@
+from twilight_cards import Card
 from twilight_enums import Side, InputType, CardAction
 from twilight_map import MapRegion, CountryInfo
 
@@ -35,10 +36,20 @@ class PlayerView:
         For instance, the draw pile can contain revealed information from Our_Man_In_Tehran.
         However, we may also want for a player to maintain probabilistic distributions over
         what the draw pile contains, based on what cards have been played.
+
+        Beliefs about the hidden cards, i.e. those in the opponent's hand and
+        headline and in the draw pile, are kept as card names: opp_hand is the
+        set of cards known to be in the opponent's hand, not_opp_hand the set
+        of those known not to be there, and draw_pile the list of those known
+        to be in the draw pile. They are narrowed by reveals and exchanges,
+        known cards are dropped from opp_hand as they are seen to leave it, and
+        the rest is forgotten as cards are dealt. sample and determinize draw a
+        full assignment of the hidden cards which is consistent with them.
         '''
         self.draw_pile = []
         self.hand = []
-        self.opp_hand = []
+        self.opp_hand = frozenset()
+        self.not_opp_hand = frozenset()
         self.opp_headline = None  # contains only opposite headline
 
     def update(self, game, side):
@@ -61,17 +72,138 @@ class PlayerView:
         self.basket = game.basket
 
         self.hand = game.hand[self.side]
+        self.opp_hand = self.opp_hand.intersection(self.hidden_cards(game))
 
-    def update_opp_hand(self, opp_hand: list):
-        '''Opponent's hand consists of a list of card strings for known cards.'''
-        self.opp_hand = opp_hand
+    def update_opp_hand(self, opp_hand: list, among=None):
+        '''
+        Opponent's hand consists of a list of card strings for known cards.
+
+        Parameters
+        ----------
+        opp_hand : list
+            Cards revealed to be in the opponent's hand.
+        among : optional
+            Cards which the reveal covers, so that any of them not in opp_hand is
+            not in the opponent's hand either. By default the whole hand was
+            revealed. Pass () for cards seen to enter the opponent's hand, e.g.
+            by an exchange.
+        '''
+        cards = frozenset(opp_hand)
+        if among is None:
+            self.opp_hand = cards
+            self.not_opp_hand = frozenset(Card.ALL).difference(cards)
+        else:
+            self.opp_hand = self.opp_hand.union(cards)
+            self.not_opp_hand = self.not_opp_hand.union(among).difference(cards)
+
+    def update_opp_removed(self, cards: list):
+        '''
+        Cards seen to leave the opponent's hand, as it plays or discards them or
+        they are taken from it, are no longer in it.
+        '''
+        self.opp_hand = self.opp_hand.difference(cards)
 
     def update_headline(self, opp_headline):
         self.opp_headline = opp_headline
+        self.opp_hand = self.opp_hand.difference((opp_headline,))
+
+    def update_deal(self, game):
+        '''
+        Called before cards are dealt. The cards dealt are unknown, so the cards
+        known not to be in the opponent's hand or to be in the draw pile are
+        forgotten. Known cards which have left the opponent's hand are dropped
+        before the discard pile can be reshuffled into the draw pile.
+        '''
+        self.opp_hand = self.opp_hand.intersection(self.hidden_cards(game))
+        self.not_opp_hand = frozenset()
+        self.opp_headline = None
+        self.reset_draw_pile()
+
+    def hidden_headline(self, game):
+        '''Returns the opponent's headline if it has not been shown, else None.'''
+        headline = game.headline_bin[self.side.opp]
+        return headline if headline and headline != self.opp_headline else None
+
+    def hidden_cards(self, game):
+        '''
+        Returns the cards whose place is hidden from this side: the opponent's
+        hand other than The_China_Card, its headline if not shown, and the draw
+        pile.
+        '''
+        hidden = [c for c in game.hand[self.side.opp] if c != 'The_China_Card']
+        headline = self.hidden_headline(game)
+        if headline:
+            hidden.append(headline)
+        hidden.extend(game.draw_pile)
+        return hidden
+
+    def sample(self, game, rng):
+        '''
+        Samples a placement of the hidden cards which is consistent with this
+        side's beliefs, uniformly among those placements.
+
+        Returns the opponent's hand, in which The_China_Card is kept if held, the
+        draw pile, and the opponent's headline (None if not hidden).
+
+        Parameters
+        ----------
+        game : Game
+            The game this view is of, which gives the number of cards in each
+            hidden place.
+        rng : random.Random
+            Random source of the sample.
+        '''
+        opp = self.side.opp
+        hand = game.hand[opp]
+        headline = self.hidden_headline(game)
+        china = [c for c in hand if c == 'The_China_Card']
+        slots = len(hand) - len(china) + (headline is not None)
+
+        known, free, forced = [], [], []
+        opp_hand, not_opp_hand = self.opp_hand, self.not_opp_hand
+        draw_pile = self.draw_pile
+        for c in self.hidden_cards(game):
+            if c in opp_hand:
+                known.append(c)
+            elif c in not_opp_hand or c in draw_pile:
+                forced.append(c)
+            else:
+                free.append(c)
+
+        # beliefs which cannot be met, e.g. from a missed update, are relaxed
+        if len(known) > slots:
+            free.extend(known[slots:])
+            del known[slots:]
+        if len(known) + len(free) < slots:
+            free.extend(forced)
+            forced = []
+
+        rng.shuffle(free)
+        n = slots - len(known)
+        held = known + free[:n]
+        rest = free[n:] + forced
+        rng.shuffle(held)
+        rng.shuffle(rest)
+        if headline is not None:
+            headline = held.pop()
+        return held + china, rest, headline
+
+    def determinize(self, game, rng):
+        '''
+        Replaces the hidden cards of game with a sample from this side's
+        beliefs, so that game is one of the worlds this side cannot tell apart
+        from the real one. Use on a copy of the game.
+        '''
+        hand, draw_pile, headline = self.sample(game, rng)
+        opp = self.side.opp
+        game.hand[opp][:] = hand
+        game.draw_pile[:] = draw_pile
+        if headline is not None:
+            game.headline_bin[opp] = headline
 
     def update_draw_pile(self, known_cards: list):
         '''Contains additional information about the draw pile from events.'''
-        self.draw_pile += known_cards
+        self.draw_pile = self.draw_pile + list(known_cards)
 
     def reset_draw_pile(self):
         '''Reverting to no additional information about the contents of the draw pile.'''
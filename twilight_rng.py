@@ -0,0 +1,72 @@
+import random
+import secrets
+
+from hashlib import blake2b
+
+
+class GameRNG:
+
+    STREAMS = ('shuffle', 'dice', 'discard')
+
+    def __init__(self, seed=None):
+        '''
+        The random number generator of a game, split into an independent
+        random.Random stream for each kind of chance event.
+
+        Each stream is seeded from the root seed and the stream's name, so a game
+        is reproducible from its seed alone, and drawing more from one stream
+        (e.g. an extra reroll) does not change the outcomes of the others.
+
+        Parameters
+        ----------
+        seed : optional
+            Root seed, an int or str. By default a random 64-bit seed is chosen,
+            which is kept in self.seed so that the game can still be replayed.
+
+        Attributes
+        ----------
+        shuffle : random.Random
+            Shuffles the draw pile.
+        dice : random.Random
+            Rolls dice.
+        discard : random.Random
+            Selects the cards of random discards, e.g. Five_Year_Plan.
+        '''
+        self.seed = secrets.randbits(64) if seed is None else seed
+        for name in GameRNG.STREAMS:
+            setattr(self, name, random.Random(GameRNG.derive(self.seed, name)))
+
+    @staticmethod
+    def derive(seed, *path):
+        '''
+        Returns a 64-bit seed derived from seed and path by hashing. Unlike
+        hash(), the result does not depend on PYTHONHASHSEED.
+
+        Use this to split a root seed into child seeds, e.g. the seed of game i of
+        a batch as GameRNG.derive(root, i).
+        '''
+        key = repr((seed,) + path).encode()
+        return int.from_bytes(blake2b(key, digest_size=8).digest(), 'little')
+
+    def reseed(self, seed):
+        '''
+        Reseeds every stream from seed as the constructor would, but keeps
+        self.seed, e.g. so that playouts from a restored snapshot differ.
+        '''
+        for name in GameRNG.STREAMS:
+            getattr(self, name).seed(GameRNG.derive(seed, name))
+
+    def stream(self, name: str) -> random.Random:
+        '''Returns the stream named name, one of GameRNG.STREAMS.'''
+        if name not in GameRNG.STREAMS:
+            raise KeyError(f'Unknown RNG stream: {name}')
+        return getattr(self, name)
+
+    def getstate(self):
+        '''Returns the states of all streams, for setstate.'''
+        return tuple(getattr(self, name).getstate() for name in GameRNG.STREAMS)
+
+    def setstate(self, state):
+        '''Restores the states of all streams, as returned by getstate.'''
+        for name, s in zip(GameRNG.STREAMS, state):
+            getattr(self, name).setstate(s)
@@ -0,0 +1,179 @@
+import enum
+import importlib
+
+from functools import partial
+from types import BuiltinMethodType, FunctionType, MethodType
+from typing import Any, NamedTuple
+
+import numpy as np
+
+from twilight_cards import Card
+from twilight_journal import Pile
+from twilight_map import Country
+
+
+class Ref(NamedTuple):
+    '''
+    A reference to an object of the game, by kind and key:
+
+    - ('game', None), ('map', None), ('cards', None): the game, its map and its
+      cards.
+    - ('card', name): the card named name.
+    - ('country', name): the view of the country named name.
+    - ('list', i): the i-th list of Game._snapshot_lists, e.g. a hand or basket.
+    - ('function', 'module:qualname'): a function defined at module or class
+      level, e.g. Country.remove_influence.
+    '''
+    kind: str
+    key: Any
+
+
+class StageOp(NamedTuple):
+    '''
+    The data-only form of a stage, effect or callback: calls the method name of
+    owner, a Ref, with args and keywords. For a plain function, owner is None
+    and name is its Ref.
+    '''
+    owner: Any
+    name: Any
+    args: tuple
+    keywords: dict
+
+
+# data which stands for itself
+_SCALARS = frozenset((str, int, float, bool, type(None), bytes))
+_DATA = (enum.Enum, np.generic, np.ndarray)
+
+
+class StageEncoder:
+
+    def __init__(self, game):
+        '''
+        Encodes the stages of game, and anything held alongside them, into their
+        data-only form: partials and bound methods become StageOps, and objects
+        of the game become Refs. Raises TypeError for anything else, e.g. a
+        closure, which cannot be rebuilt in another process.
+        '''
+        self.game = game
+        self.lists = {id(l): i for i, l in enumerate(game._snapshot_lists())}
+
+    def __call__(self, value):
+        kind = type(value)
+        if kind in _SCALARS:
+            return value
+        if kind is tuple or kind is list:
+            if _SCALARS.issuperset(map(type, value)):
+                return kind(value)
+            return kind(map(self, value))
+        if kind is dict:
+            return {k: self(v) for k, v in value.items()}
+        if kind is set or kind is frozenset or isinstance(value, _DATA):
+            return value
+        if kind is partial:
+            owner, name = self._target(value.func)
+            return StageOp(owner, name, tuple(map(self, value.args)),
+                           {k: self(v) for k, v in value.keywords.items()})
+        if kind is MethodType or kind is BuiltinMethodType or kind is FunctionType:
+            owner, name = self._target(value)
+            return name if owner is None else StageOp(owner, name, (), {})
+        return self._ref(value)
+
+    def _target(self, func):
+        if type(func) is FunctionType:
+            if '<locals>' in func.__qualname__:
+                raise TypeError(f'{func.__qualname__} is a closure and has no data-only form.')
+            return None, Ref('function', f'{func.__module__}:{func.__qualname__}')
+        return self._ref(func.__self__), func.__name__
+
+    def _ref(self, obj):
+        game = self.game
+        if obj is game:
+            return Ref('game', None)
+        if isinstance(obj, Card):
+            return Ref('card', obj.name)
+        if isinstance(obj, Country):
+            return Ref('country', obj.info.name)
+        if isinstance(obj, Pile):
+            i = self.lists.get(id(obj))
+            return list(map(self, obj)) if i is None else Ref('list', i)
+        if obj is game.map:
+            return Ref('map', None)
+        if obj is game.cards:
+            return Ref('cards', None)
+        raise TypeError(f'{obj!r} has no data-only form.')
+
+    def attributes(self, obj):
+        '''Returns the encoded attributes of obj, except its journal.'''
+        state = vars(obj).copy()
+        state.pop('journal', None)
+        if not _SCALARS.issuperset(map(type, state.values())):
+            state = {k: self(v) for k, v in state.items()}
+        return state
+
+
+class StageDecoder:
+
+    def __init__(self, game):
+        '''
+        Rebuilds the values encoded by a StageEncoder against game, which must
+        have the same lists as the encoded game, e.g. after Game.start.
+        '''
+        self.game = game
+        self.lists = game._snapshot_lists()
+
+    def __call__(self, value):
+        kind = type(value)
+        if kind in _SCALARS:
+            return value
+        if kind is StageOp:
+            if value.owner is None:
+                func = self._ref(value.name)
+            else:
+                func = getattr(self._ref(value.owner), value.name)
+            if not value.args and not value.keywords:
+                return func
+            return partial(func, *map(self, value.args),
+                           **{k: self(v) for k, v in value.keywords.items()})
+        if kind is Ref:
+            return self._ref(value)
+        if kind is tuple or kind is list:
+            if _SCALARS.issuperset(map(type, value)):
+                return value
+            return kind(map(self, value))
+        if kind is dict:
+            return {k: self(v) for k, v in value.items()}
+        return value
+
+    def _ref(self, ref: Ref):
+        kind, key = ref
+        game = self.game
+        if kind == 'list':
+            return self.lists[key]
+        if kind == 'card':
+            return game.cards[key]
+        if kind == 'country':
+            return game.map[key]
+        if kind == 'game':
+            return game
+        if kind == 'map':
+            return game.map
+        if kind == 'cards':
+            return game.cards
+        if kind == 'function':
+            module, qualname = key.split(':')
+            obj = importlib.import_module(module)
+            for name in qualname.split('.'):
+                obj = getattr(obj, name)
+            return obj
+        raise ValueError(f'Unknown reference: {ref}')
+
+    def attributes(self, obj, state: dict):
+        '''Replaces the attributes of obj, except its journal, by those encoded in state.'''
+        if not _SCALARS.issuperset(map(type, state.values())):
+            state = {k: self(v) for k, v in state.items()}
+        obj_vars = vars(obj)
+        journal = obj_vars.get('journal')
+        obj_vars.clear()
+        obj_vars.update(state)
+        if journal is not None:
+            obj_vars['journal'] = journal
@@ -0,0 +1,190 @@
+import weakref
+
+import numpy as np
+
+
+class TranspositionTable:
+
+    POLICIES = ('depth', 'always')
+
+    # bytes per entry: key, visits, value, depth, move id, payload slot and
+    # its weak reference, and used flag
+    ENTRY_BYTES = 8 + 4 + 4 + 4 + 2 + 8 + 80 + 1
+
+    # distinct moves the table can name, the range of its int16 move ids
+    MAX_MOVES = 1 << 15
+
+    def __init__(self, megabytes: float = 64, policy: str = 'depth', ways: int = 4):
+        '''
+        A fixed-size hash table of search results, keyed by Game.zobrist_hash.
+
+        Entries are grouped into buckets of ways slots, and a key may only be
+        stored in the bucket given by its low bits. When its bucket is full, a
+        new key evicts an entry according to policy:
+
+        - 'depth': the entry with the least depth, i.e. the least search below
+          it, so that the most valuable results are kept.
+        - 'always': the entry in the slot picked by the key's high bits, whatever
+          its depth.
+
+        Each entry holds the visit count, value, depth and best move of a
+        position, and may hold a payload object, e.g. the search tree node of
+        the position, so that transpositions can share one node.
+
+        The memory budget covers the entries, which are allocated up front and
+        never grow. Payloads are held by weak reference, so they stay owned by
+        whoever created them, e.g. the search tree, and an entry does not keep
+        a discarded subtree alive. Moves are interned into ids, of which there
+        are at most MAX_MOVES, a few hundred kilobytes of names at most; once
+        they are spent, new moves are stored as None.
+
+        Parameters
+        ----------
+        megabytes : float
+            Memory for the entries, by default 64. The number of buckets is the
+            largest power of two that fits.
+        policy : str
+            Replacement policy, 'depth' (default) or 'always'.
+        ways : int
+            Number of entries per bucket, by default 4.
+
+        Attributes
+        ----------
+        hits, misses : int
+            Lookups which found and did not find their key.
+        stores, evictions : int
+            Entries written, and entries of other keys they replaced.
+        '''
+        if policy not in TranspositionTable.POLICIES:
+            raise ValueError(f'Unknown replacement policy: {policy}')
+        self.policy = policy
+        self.ways = ways
+
+        buckets = max(int(megabytes * 2 ** 20 / (self.ENTRY_BYTES * ways)), 1)
+        buckets = 1 << (buckets.bit_length() - 1)
+        self.mask = buckets - 1
+        self.capacity = buckets * ways
+
+        self.keys = np.zeros(self.capacity, dtype=np.uint64)
+        self.visits = np.zeros(self.capacity, dtype=np.uint32)
+        self.values = np.zeros(self.capacity, dtype=np.float32)
+        self.depths = np.zeros(self.capacity, dtype=np.uint32)
+        # move ids index self.moves, in which None is 0
+        self.move_ids = np.zeros(self.capacity, dtype=np.int16)
+        self.payloads = [None] * self.capacity
+        self.used = np.zeros(self.capacity, dtype=bool)
+
+        self.moves = [None]
+        self._move_ids = {None: 0}
+        self.clear_stats()
+
+    def clear(self):
+        '''Empties the table.'''
+        self.used[:] = False
+        self.move_ids[:] = 0
+        self.payloads = [None] * self.capacity
+        self.moves = [None]
+        self._move_ids = {None: 0}
+        self.clear_stats()
+
+    def clear_stats(self):
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    def stats(self):
+        '''Returns the lookup and store counts, the hit rate and how full the table is.'''
+        lookups = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses, stores=self.stores,
+                    evictions=self.evictions,
+                    hit_rate=self.hits / lookups if lookups else 0.0,
+                    entries=int(self.used.sum()), capacity=self.capacity)
+
+    def _slot(self, key: int):
+        start = (key & self.mask) * self.ways
+        for slot in range(start, start + self.ways):
+            if self.used[slot] and self.keys[slot] == key:
+                return slot
+        return -1
+
+    def probe(self, key: int):
+        '''
+        Returns the entry for key as a tuple (visits, value, depth, move,
+        payload), or None if it is not in the table.
+        '''
+        slot = self._slot(key)
+        if slot < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return (int(self.visits[slot]), float(self.values[slot]),
+                int(self.depths[slot]), self.moves[self.move_ids[slot]],
+                self._payload(slot))
+
+    def payload(self, key: int):
+        '''
+        Returns the payload stored for key, or None if key is not in the table
+        or its payload has since been freed.
+        '''
+        slot = self._slot(key)
+        if slot < 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._payload(slot)
+
+    def _payload(self, slot: int):
+        ref = self.payloads[slot]
+        return None if ref is None else ref()
+
+    def store(self, key: int, visits: int = 0, value: float = 0.0, depth: int = 0,
+              move: str = None, payload=None):
+        '''
+        Writes the entry for key, replacing its previous entry if it has one, or
+        else an entry chosen by the replacement policy. Without a move, the best
+        move already stored for key is kept. The payload, if any, must support
+        weak references. Returns False if the entry was not stored: under the
+        'depth' policy, a full bucket keeps entries deeper than the new one.
+        '''
+        slot = self._slot(key)
+        if slot >= 0:
+            move_id = self.move_ids[slot] if move is None else self._move_id(move)
+        else:
+            slot = self._victim(key, depth)
+            if slot < 0:
+                return False
+            if self.used[slot]:
+                self.evictions += 1
+            move_id = self._move_id(move)
+
+        self.keys[slot] = key
+        self.visits[slot] = visits
+        self.values[slot] = value
+        self.depths[slot] = depth
+        self.move_ids[slot] = move_id
+        ref = self.payloads[slot]
+        if ref is None or ref() is not payload:
+            self.payloads[slot] = None if payload is None else weakref.ref(payload)
+        self.used[slot] = True
+        self.stores += 1
+        return True
+
+    def _move_id(self, move: str):
+        move_id = self._move_ids.get(move)
+        if move_id is None:
+            if len(self.moves) == self.MAX_MOVES:
+                return 0
+            move_id = self._move_ids[move] = len(self.moves)
+            self.moves.append(move)
+        return move_id
+
+    def _victim(self, key: int, depth: int):
+        start = (key & self.mask) * self.ways
+        bucket = slice(start, start + self.ways)
+        used = self.used[bucket]
+        if not used.all():
+            return start + int(np.argmin(used))
+        if self.policy == 'always':
+            return start + (key >> 48) % self.ways
+        shallowest = int(np.argmin(self.depths[bucket]))
+        if self.depths[start + shallowest] > depth:
+            return -1
+        return start + shallowest
@@ -1,7 +1,4 @@
-import random
-
 from os import path
-from copy import deepcopy
 from datetime import datetime
 from textwrap import wrap
 
@@ -72,13 +69,22 @@ quit            Exit the game.
             f.write(out)
         self.temp_log.clear()
 
-    def new_game(self):
+    def new_game(self, manual_rng=False):
         if self.logging:
             self.log_generate_filepath()
         self.game_in_progress = True
+        self.update_rng_mode(manual_rng)
         self.game.start()
         self.advance_game()
 
+    def update_rng_mode(self, manual_rng=False):
+        '''
+        Shuffles and dice are resolved through the UI when they need to be
+        logged or replayed, or when rng is off. Otherwise the game resolves
+        them itself.
+        '''
+        self.game.manual_rng = manual_rng or self.logging or not self.auto_rng
+
     def advance_game(self):
         if self.auto_commit and self.logging:
             self.log_write_out()
@@ -91,15 +97,14 @@ quit            Exit the game.
             self.log_write_out()
         self.game_lookahead = None
         self.advance_game()
-        self.game_rollback = deepcopy(self.game)
+        self.game_rollback = self.game.snapshot()
         self.game_state_changed()
 
     def revert(self):
         if self.logging:
             self.temp_log.clear()
-        self.game = self.game_rollback
+        self.game.restore(self.game_rollback)
         self.game_lookahead = None
-        self.game_rollback = deepcopy(self.game)
         self.game_state_changed()
 
     def move(self, move):
@@ -139,12 +144,10 @@ quit            Exit the game.
                     if self.game.input_state.complete:
                         # done with the rng, continue on to the next stage
                         self.advance_game()
-                        self.game_rollback = deepcopy(self.game)
+                        self.game_rollback = self.game.snapshot()
                     else:
-                        choices = list(self.game.input_state.available_options)
-                        c = random.choice(choices)
-                        # process the input
-                        self.move(c)
+                        # draw from the game's own rng, so it can be replayed
+                        self.move(self.game.sample_chance())
                     continue
 
             # see if this stage is done
@@ -155,13 +158,16 @@ quit            Exit the game.
                     continue
 
                 else:
-                    # We will see what the next input required is.
-                    self.game_lookahead = deepcopy(self.game)
-                    self.game_lookahead.stage_complete()
-                    while not self.game_lookahead.input_state:
-                        self.game_lookahead.stage_complete()
-
-                    if self.game.input_state.side == self.game_lookahead.input_state.side:
+                    # We will see what the next input required is, then return
+                    # to the current state.
+                    current = self.game.snapshot()
+                    self.game.stage_complete()
+                    while not self.game.input_state:
+                        self.game.stage_complete()
+                    self.game_lookahead = self.game.input_state
+                    self.game.restore(current)
+
+                    if self.game.input_state.side == self.game_lookahead.side:
                         # The same player is up for input again. Don't ask for commit.
                         self.game_lookahead = None
                         self.advance_game()
@@ -241,7 +247,7 @@ quit            Exit the game.
                     continue
                 print('Starting new game.')
                 self.new_game()
-                self.game_rollback = deepcopy(self.game)
+                self.game_rollback = self.game.snapshot()
                 self.game_state_changed()
 
             elif user_choice[0].lower() == 'dbg':
@@ -254,6 +260,7 @@ quit            Exit the game.
                     self.auto_rng = False
                 else:
                     print('Invalid command. Enter ? for help.')
+                self.update_rng_mode()
 
             elif user_choice[0].lower() == 'commit':
                 if user_choice[1].lower() == 'on':
@@ -475,8 +482,7 @@ dbg rollback                        Restores the state before debugging started.
 
         if not comd:
             print('Debugging mode started.')
-            self.debug_save = (deepcopy(self.game),
-                               deepcopy(self.game_rollback))
+            self.debug_save = (self.game.snapshot(), self.game_rollback)
             return
         elif comd == '?':
             print(UI.help_debug)
@@ -507,7 +513,7 @@ dbg rollback                        Restores the state before debugging started.
             elif user_choice[2].lower() not in ['us', 'ussr']:
                 print('Invalid side.')
             else:
-                input_state_rollback = deepcopy(self.game.input_state)
+                input_state_rollback = self.game.input_state.copy()
 
                 def end_of_event():
                     self.game.input_state = input_state_rollback
@@ -518,7 +524,7 @@ dbg rollback                        Restores the state before debugging started.
                 self.game_state_changed()
         elif user_choice[0] == 'rollback':
             print('Restoring pre-debugging state.')
-            self.game = self.debug_save[0]
+            self.game.restore(self.debug_save[0])
             self.game_rollback = self.debug_save[1]
             self.game_state_changed()
         else:
@@ -548,15 +554,17 @@ dbg rollback                        Restores the state before debugging started.
             print('Cannot open file.')
             return
 
-        self.new_game()
+        # logged shuffles and dice rolls are replayed as moves
+        self.new_game(manual_rng=True)
         for i, line in enumerate(f):
             line = line.strip()
-            if line not in self.input_state.available_options:
+            if not self.input_state.is_available(line):
                 print(f'Invalid move on line {i}:{line}')
                 break
             self.move(line)
             if self.game.input_state.complete:
                 self.advance_game()
         print('Game loaded.')
+        self.update_rng_mode()
         self.game_state_changed()
         f.close()
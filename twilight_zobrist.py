@@ -0,0 +1,84 @@
+from twilight_rng import GameRNG
+
+
+class Zobrist:
+
+    # influence levels above this share the key of this level
+    MAX_INFLUENCE = 20
+
+    # KeyTable of each name, shared by every game
+    TABLES = dict()
+
+    @staticmethod
+    def key(*path) -> int:
+        '''
+        Returns the 64-bit key of path. Keys are derived by hashing, so hashes
+        are stable between runs and do not depend on the order keys are made in.
+        '''
+        return GameRNG.derive('zobrist', *path)
+
+    @staticmethod
+    def table(name: str):
+        '''Returns the KeyTable named name.'''
+        try:
+            return Zobrist.TABLES[name]
+        except KeyError:
+            table = Zobrist.TABLES[name] = KeyTable(name)
+            return table
+
+
+class KeyTable(dict):
+
+    def __init__(self, name: str):
+        '''
+        Maps items to their Zobrist keys, Zobrist.key(name, item), which are
+        made on first use.
+        '''
+        super().__init__()
+        self.name = name
+
+    def __missing__(self, item):
+        key = self[item] = Zobrist.key(self.name, item)
+        return key
+
+
+class ZobristHash:
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: int = 0):
+        '''
+        A running Zobrist hash, shared by the PileHashes which update it.
+        '''
+        self.value = value
+
+    def __reduce__(self):
+        return ZobristHash, (self.value,)
+
+
+class PileHash:
+
+    __slots__ = ('accumulator', 'name', 'keys')
+
+    def __init__(self, accumulator: ZobristHash, name: str):
+        '''
+        Hashes the membership of a Pile into accumulator: each item in the pile
+        contributes the key of (name, item). Set as Pile.zobrist, and the pile
+        calls toggle for each item that enters or leaves it.
+        '''
+        self.accumulator = accumulator
+        self.name = name
+        self.keys = Zobrist.table(name)
+
+    def __reduce__(self):
+        return PileHash, (self.accumulator, self.name)
+
+    def toggle(self, item):
+        self.accumulator.value ^= self.keys[item]
+
+    def toggle_all(self, items):
+        keys = self.keys
+        value = self.accumulator.value
+        for item in items:
+            value ^= keys[item]
+        self.accumulator.value = value